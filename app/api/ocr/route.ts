@@ -1,15 +1,58 @@
+import { createHmac } from 'crypto'
 import { NextRequest, NextResponse } from 'next/server'
 import { rateLimit } from '@/lib/rateLimit'
+import { getCurrentUser } from '@/lib/auth'
 
 // Rate limit: 10 requests per minute per IP
 const RATE_LIMIT_REQUESTS = 10
 const RATE_LIMIT_WINDOW = 60 // 1 minute
 
+// Lifetime of the per-request token sent to the OCR service
+const OCR_TOKEN_TTL_SECONDS = 60
+
+function base64url(data: string | Buffer): string {
+  return Buffer.from(data).toString('base64url')
+}
+
+/**
+ * Short-lived HS256 token naming the signed-in user, so the OCR service
+ * rate limits and schedules each user on their own instead of charging
+ * every request to this proxy. Needs OCR_SERVICE_JWT_SECRET (the OCR
+ * service's JWT_SECRET); without it users are told apart by IP only.
+ */
+function ocrServiceToken(userId: string): string | null {
+  const secret = process.env.OCR_SERVICE_JWT_SECRET
+  if (!secret) return null
+
+  const now = Math.floor(Date.now() / 1000)
+  const header = base64url(JSON.stringify({ alg: 'HS256', typ: 'JWT' }))
+  const payload = base64url(
+    JSON.stringify({ sub: userId, iat: now, exp: now + OCR_TOKEN_TTL_SECONDS })
+  )
+  const signature = createHmac('sha256', secret)
+    .update(`${header}.${payload}`)
+    .digest('base64url')
+  return `${header}.${payload}.${signature}`
+}
+
+/**
+ * The browser's address as this app's own edge sees it: the platform's
+ * req.ip, else the hop the nearest reverse proxy appended to
+ * X-Forwarded-For (right-most; entries further left are whatever the
+ * browser chose to send), else X-Real-IP.
+ */
+function clientIp(req: NextRequest): string | null {
+  if (req.ip) return req.ip
+  const hops = (req.headers.get('x-forwarded-for') || '')
+    .split(',')
+    .map((hop) => hop.trim())
+    .filter(Boolean)
+  return hops[hops.length - 1] || req.headers.get('x-real-ip')
+}
+
 export async function POST(req: NextRequest) {
   // Get client IP for rate limiting
-  const ip = req.headers.get('x-forwarded-for')?.split(',')[0] || 
-             req.headers.get('x-real-ip') || 
-             'unknown'
+  const ip = clientIp(req) || 'unknown'
 
   // Rate limiting
   const rateLimitResult = await rateLimit(
@@ -27,8 +70,23 @@ export async function POST(req: NextRequest) {
 
   const formData = await req.formData()
 
+  // Tell the OCR service who the request is for: the browser's address
+  // (it trusts X-Forwarded-For from this host, so never pass on the
+  // browser's own header) and the signed-in user
+  const headers: Record<string, string> = {}
+  if (ip !== 'unknown') {
+    headers['X-Forwarded-For'] = ip
+  }
+
+  const { user } = await getCurrentUser()
+  const token = user ? ocrServiceToken(user.id) : null
+  if (token) {
+    headers['Authorization'] = `Bearer ${token}`
+  }
+
   const res = await fetch('http://localhost:8000/ocr', {
     method: 'POST',
+    headers,
     body: formData,
   })
 
@@ -7,7 +7,138 @@ API_KEY = os.getenv("OCR_API_KEY", "dev-secret-key")
 MAX_FILE_SIZE_MB = 5
 ALLOWED_TYPES = ["image/png", "image/jpeg"]
 
-CONFIDENCE_THRESHOLD = 0.90
-JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret")
+# Uploads whose header declares more pixels are refused before decoding
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", "50000000"))
+
+# Parser confidence a cheap cascade tier needs to answer (see OCR_CASCADE_TIERS)
+CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.90"))
+# Tokens signed with the default secret carry no identity (see core/auth.py)
+DEFAULT_JWT_SECRET = "dev-secret"
+JWT_SECRET = os.getenv("JWT_SECRET", DEFAULT_JWT_SECRET)
 JWT_ALGORITHM = "HS256"
-JWT_EXPIRE_SECONDS = 60 * 60 * 24  
\ No newline at end of file
+JWT_EXPIRE_SECONDS = 60 * 60 * 24
+
+# OCR execution pool
+# "thread" shares one engine per worker; "process" gives each pool
+# process its own engine (more RAM, real parallel inference).
+OCR_EXECUTOR_MODE = os.getenv("OCR_EXECUTOR_MODE", "thread")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", OCR_WORKERS * 4))
+OCR_JOB_TIMEOUT_SECONDS = float(os.getenv("OCR_JOB_TIMEOUT_SECONDS", "30"))
+
+# Admission control in front of the OCR pass (cache hits never reach it).
+# A new job's latency is predicted from the OCR jobs already admitted and
+# a moving average of recent service times; when it would exceed
+# OCR_LATENCY_TARGET_SECONDS the request is shed with 503 OVERLOADED and
+# Retry-After instead of queueing until the client gives up.
+OCR_ADMISSION_ENABLED = os.getenv("OCR_ADMISSION_ENABLED", "true").lower() == "true"
+OCR_LATENCY_TARGET_SECONDS = float(os.getenv("OCR_LATENCY_TARGET_SECONDS", "10"))
+
+# OCR backend (app/services/engines).
+# paddle: PaddleOCR. onnx: PP-OCR det/rec models on ONNX Runtime's CPU
+# provider; OCR_ONNX_MODEL_DIR holds det.onnx, rec.onnx and dict.txt, plus
+# det.int8.onnx / rec.int8.onnx used when OCR_ONNX_QUANTIZED is true.
+OCR_ENGINE_BACKEND = os.getenv("OCR_ENGINE_BACKEND", "paddle")
+OCR_ONNX_MODEL_DIR = os.getenv("OCR_ONNX_MODEL_DIR", "/models/ppocr-onnx")
+OCR_ONNX_QUANTIZED = os.getenv("OCR_ONNX_QUANTIZED", "false").lower() == "true"
+OCR_ONNX_THREADS = int(os.getenv("OCR_ONNX_THREADS", "0"))
+
+# Where inference runs.
+# local: every API worker process loads its own PaddleOCR weights.
+# server: one inference server process (python -m app.services.inference_server)
+# holds the only copy; workers send it images through shared memory.
+OCR_INFERENCE_MODE = os.getenv("OCR_INFERENCE_MODE", "local")
+OCR_INFERENCE_SOCKET = os.getenv("OCR_INFERENCE_SOCKET", "/tmp/ocr-inference.sock")
+OCR_INFERENCE_AUTHKEY = os.getenv("OCR_INFERENCE_AUTHKEY", "").encode()
+OCR_INFERENCE_TIMEOUT_SECONDS = float(os.getenv("OCR_INFERENCE_TIMEOUT_SECONDS", "60"))
+
+# Micro-batching of concurrent OCR calls (thread mode only: in process
+# mode each pool process serves one request at a time).
+# A request waits at most OCR_MICROBATCH_MAX_LATENCY_MS for others to join.
+OCR_MICROBATCH_ENABLED = os.getenv("OCR_MICROBATCH_ENABLED", "false").lower() == "true"
+OCR_MICROBATCH_MAX_SIZE = int(os.getenv("OCR_MICROBATCH_MAX_SIZE", "8"))
+OCR_MICROBATCH_MAX_LATENCY_MS = float(os.getenv("OCR_MICROBATCH_MAX_LATENCY_MS", "10"))
+
+# POST /ocr/batch
+OCR_UPLOAD_BATCH_MAX_FILES = int(os.getenv("OCR_UPLOAD_BATCH_MAX_FILES", "20"))
+
+# Perceptual near-duplicate cache (re-captured screenshots)
+PHASH_ENABLED = os.getenv("PHASH_ENABLED", "false").lower() == "true"
+PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "4"))
+PHASH_MAX_CHANGED_TILES = int(os.getenv("PHASH_MAX_CHANGED_TILES", "8"))
+PHASH_MAX_CANDIDATES = int(os.getenv("PHASH_MAX_CANDIDATES", "4"))
+PHASH_MAX_ENTRIES = int(os.getenv("PHASH_MAX_ENTRIES", "2000"))
+
+# OCR result cache
+# memory: per-process only; sqlite: shared by workers on one host;
+# redis: shared across hosts. sqlite/redis sit behind an in-memory L1.
+OCR_CACHE_BACKEND = os.getenv("OCR_CACHE_BACKEND", "memory")
+OCR_CACHE_TTL_SECONDS = int(os.getenv("OCR_CACHE_TTL_SECONDS", 60 * 60))
+OCR_CACHE_MAXSIZE = int(os.getenv("OCR_CACHE_MAXSIZE", "5000"))
+OCR_CACHE_SQLITE_PATH = os.getenv("OCR_CACHE_SQLITE_PATH", "/tmp/ocr-cache.sqlite3")
+OCR_CACHE_SQLITE_MAXSIZE = int(os.getenv("OCR_CACHE_SQLITE_MAXSIZE", "100000"))
+OCR_CACHE_REDIS_URL = os.getenv("OCR_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Per-client rate limiting (token bucket) on /ocr and /ocr/batch. A client
+# is its API key, its JWT `sub` or, when anonymous, its IP. Each image
+# costs one token; up to RATE_LIMIT_BURST tokens refill at
+# RATE_LIMIT_PER_MINUTE. memory: buckets per worker process; redis: one
+# bucket per client across all workers and hosts.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "20"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", OCR_CACHE_REDIS_URL)
+
+# Reverse proxies (addresses or CIDR ranges) whose X-Forwarded-For is
+# believed when telling anonymous clients apart, e.g. the Next.js app on
+# the same host. Requests from anywhere else are charged to their peer IP.
+OCR_TRUSTED_PROXIES = os.getenv("OCR_TRUSTED_PROXIES", "127.0.0.1,::1")
+
+# Fair scheduling: OCR jobs waiting for a worker are served round-robin
+# across clients, each client getting up to its weight in jobs per turn.
+# Weights by client kind: key (API key), sub (JWT user), ip (anonymous).
+OCR_CLIENT_WEIGHTS = os.getenv("OCR_CLIENT_WEIGHTS", "key=2,sub=1,ip=1")
+
+# Region-of-interest OCR: only the detected text panels are OCR'd, as the
+# "roi" tier of the cascade below. ROI_ENABLED=true alone means
+# OCR_CASCADE_TIERS=roi.
+ROI_ENABLED = os.getenv("ROI_ENABLED", "false").lower() == "true"
+ROI_MAX_COVERAGE = float(os.getenv("ROI_MAX_COVERAGE", "0.8"))
+
+# Confidence cascade: cheap OCR passes first, cheapest first, comma
+# separated. A tier answers when its parse reaches CONFIDENCE_THRESHOLD and
+# has every OCR_CASCADE_REQUIRED_FIELDS field; otherwise the request moves
+# on, ending with the full-resolution frame. Empty = full frame only.
+#   roi:       text panels only
+#   downscale: whole frame at OCR_CASCADE_DOWNSCALE_WIDTH
+# Tune with: python -m benchmarks.cascade
+OCR_CASCADE_TIERS = os.getenv("OCR_CASCADE_TIERS", "roi" if ROI_ENABLED else "")
+OCR_CASCADE_DOWNSCALE_WIDTH = int(os.getenv("OCR_CASCADE_DOWNSCALE_WIDTH", "640"))
+OCR_CASCADE_REQUIRED_FIELDS = os.getenv("OCR_CASCADE_REQUIRED_FIELDS", "available_slots")
+
+# Image preprocessing before OCR, comma separated and applied in order.
+# Stages: grayscale, scale, binarize, deskew, denoise. Empty = none.
+# Pick a setting with: python -m benchmarks.preprocess_matrix
+PREPROCESS_STAGES = os.getenv("PREPROCESS_STAGES", "")
+PREPROCESS_TEXT_HEIGHT = int(os.getenv("PREPROCESS_TEXT_HEIGHT", "24"))
+
+# Pre-OCR rejection of non-visa uploads (see services/fast_reject.py).
+# FAST_REJECT_TOP_K = 0 keeps only the OpenCV layout check.
+FAST_REJECT_ENABLED = os.getenv("FAST_REJECT_ENABLED", "false").lower() == "true"
+FAST_REJECT_TOP_K = int(os.getenv("FAST_REJECT_TOP_K", "3"))
+FAST_REJECT_PROBE_WIDTH = int(os.getenv("FAST_REJECT_PROBE_WIDTH", "512"))
+
+# Where uploaded screenshots are archived.
+# supabase: SUPABASE_URL / SUPABASE_SERVICE_KEY bucket; local: files under
+# SCREENSHOT_STORAGE_DIR (development and load tests, no network).
+SCREENSHOT_STORAGE_BACKEND = os.getenv("SCREENSHOT_STORAGE_BACKEND", "supabase")
+SCREENSHOT_STORAGE_DIR = os.getenv("SCREENSHOT_STORAGE_DIR", "/tmp/ocr-screenshots")
+
+# Uploads are spooled to disk first and sent in the background; the
+# spool survives restarts (see services/uploads.py)
+SCREENSHOT_SPOOL_DIR = os.getenv("SCREENSHOT_SPOOL_DIR", "/tmp/ocr-upload-spool")
+SCREENSHOT_SPOOL_MAX_MB = int(os.getenv("SCREENSHOT_SPOOL_MAX_MB", "1024"))
+SCREENSHOT_UPLOAD_QUEUE_SIZE = int(os.getenv("SCREENSHOT_UPLOAD_QUEUE_SIZE", "1000"))
+SCREENSHOT_UPLOAD_BATCH_SIZE = int(os.getenv("SCREENSHOT_UPLOAD_BATCH_SIZE", "8"))
+SCREENSHOT_UPLOAD_MAX_RETRIES = int(os.getenv("SCREENSHOT_UPLOAD_MAX_RETRIES", "5"))
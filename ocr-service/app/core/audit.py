@@ -1,6 +1,13 @@
+import json
+import logging
 import uuid
 from datetime import datetime
 
+from app.core.metrics import AUDIT_EVENTS
+
+logger = logging.getLogger("ocr.audit")
+
+
 def audit_log(status: str, confidence: float | None = None):
     log = {
         "request_id": str(uuid.uuid4()),
@@ -8,4 +15,5 @@ def audit_log(status: str, confidence: float | None = None):
         "status": status,
         "confidence": confidence,
     }
-    print(log)  # replace with proper logger later
+    AUDIT_EVENTS.labels(status).inc()
+    logger.info(json.dumps(log))
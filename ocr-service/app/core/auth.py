@@ -1,6 +1,129 @@
-from fastapi import Header, HTTPException
-from app.config import API_KEY
+import hashlib
+import ipaddress
+from typing import NamedTuple
+
+import jwt
+from fastapi import Header, HTTPException, Request
+
+from app.config import (
+    API_KEY,
+    DEFAULT_JWT_SECRET,
+    JWT_ALGORITHM,
+    JWT_SECRET,
+    OCR_CLIENT_WEIGHTS,
+    OCR_TRUSTED_PROXIES,
+)
+from app.core.errors import OCRServiceError
+
 
 def verify_api_key(x_api_key: str = Header(...)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+# -------------------
+# Client identity
+# -------------------
+# Rate limits and fair scheduling are per client: "key:<digest>" for an
+# API key, "sub:<subject>" for a JWT from /auth/oauth-login (or minted
+# by the web app's proxy for its signed-in user), else "ip:<address>".
+# While JWT_SECRET is the public default anyone can mint a token, so
+# tokens are then ignored and the caller is charged by IP.
+
+class Client(NamedTuple):
+    id: str
+    weight: int = 1
+
+
+def _parse_weights(spec: str) -> dict[str, int]:
+    """
+    "key=2,sub=1,ip=1" -> {"key": 2, "sub": 1, "ip": 1}
+    """
+    weights = {}
+    for item in spec.split(","):
+        if item.strip():
+            kind, _, weight = item.partition("=")
+            weights[kind.strip()] = max(1, int(weight))
+    return weights
+
+
+def _parse_networks(spec: str) -> list[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    """
+    "127.0.0.1,10.0.0.0/8" -> networks; a bare address is a /32 (/128).
+    """
+    return [
+        ipaddress.ip_network(item.strip(), strict=False)
+        for item in spec.split(",") if item.strip()
+    ]
+
+
+CLIENT_WEIGHTS = _parse_weights(OCR_CLIENT_WEIGHTS)
+TRUSTED_PROXIES = _parse_networks(OCR_TRUSTED_PROXIES)
+
+ANONYMOUS = Client("ip:unknown", CLIENT_WEIGHTS.get("ip", 1))
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request: Request) -> str | None:
+    """
+    The caller's address. From a trusted proxy, the right-most
+    X-Forwarded-For entry that is not itself a trusted proxy (entries
+    further left are whatever the client chose to send); otherwise the
+    peer address.
+    """
+    if request.client is None:
+        return None
+    address = request.client.host
+    if not _is_trusted_proxy(address):
+        return address
+
+    forwarded = request.headers.get("x-forwarded-for", "")
+    for hop in reversed(forwarded.split(",")):
+        hop = hop.strip()
+        if not hop:
+            continue
+        address = hop
+        if not _is_trusted_proxy(hop):
+            break
+    return address
+
+
+def _unauthorized(message: str) -> HTTPException:
+    return OCRServiceError("UNAUTHORIZED", message, status_code=401).to_http()
+
+
+def get_client(
+    request: Request,
+    x_api_key: str | None = Header(None),
+    authorization: str | None = Header(None),
+) -> Client:
+    """
+    FastAPI dependency: who this request is charged to. Credentials are
+    optional, but wrong ones are refused rather than treated as anonymous.
+    """
+    if x_api_key is not None:
+        if x_api_key != API_KEY:
+            raise _unauthorized("Invalid API key")
+        digest = hashlib.sha256(x_api_key.encode()).hexdigest()[:16]
+        return Client(f"key:{digest}", CLIENT_WEIGHTS.get("key", 1))
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token and JWT_SECRET != DEFAULT_JWT_SECRET:
+        try:
+            claims = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        except jwt.PyJWTError:
+            raise _unauthorized("Invalid or expired token")
+        if claims.get("sub"):
+            return Client(f"sub:{claims['sub']}", CLIENT_WEIGHTS.get("sub", 1))
+
+    address = client_ip(request)
+    if address is None:
+        return ANONYMOUS
+    return Client(f"ip:{address}", CLIENT_WEIGHTS.get("ip", 1))
@@ -0,0 +1,100 @@
+# app/core/body_limit.py
+import json
+
+from app.core.errors import OCRServiceError
+
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects request bodies over a per-path limit with 413 FILE_TOO_LARGE
+    while they stream in, before the multipart parser has spooled the
+    whole upload. Requests with a Content-Length over the limit are
+    refused without reading the body at all.
+
+    `limits` maps path prefixes to byte limits; the longest matching
+    prefix wins and paths without a match are not limited.
+    """
+
+    def __init__(self, app, limits: dict[str, int]):
+        self.app = app
+        self.limits = sorted(limits.items(), key=lambda item: -len(item[0]))
+
+    def _limit_for(self, path: str) -> int | None:
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = self._limit_for(scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        error = OCRServiceError(
+            "FILE_TOO_LARGE",
+            f"Upload is larger than {limit // (1024 * 1024)} MB",
+            status_code=413,
+        )
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            return await _send_error(send, error)
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            # The app may turn the aborted read into its own error
+            # response (FastAPI answers 400 for unparseable bodies);
+            # replace it with the 413.
+            if exceeded:
+                if not started:
+                    started = True
+                    await _send_error(send, error)
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            if not started:
+                await _send_error(send, error)
+
+
+async def _send_error(send, error: OCRServiceError) -> None:
+    # Same body as HTTPException(detail=...) responses
+    body = json.dumps({"detail": error.to_response()}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": error.status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
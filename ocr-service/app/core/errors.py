@@ -0,0 +1,35 @@
+from fastapi import HTTPException
+
+
+class OCRServiceError(Exception):
+    """
+    Error raised inside the OCR pipeline or its execution layer.
+    Kept free of FastAPI types so it can cross a process pool.
+    """
+
+    def __init__(
+        self,
+        error_code: str,
+        message: str,
+        status_code: int = 400,
+        headers: dict | None = None,
+    ):
+        super().__init__(error_code, message, status_code, headers)
+        self.error_code = error_code
+        self.message = message
+        self.status_code = status_code
+        self.headers = headers
+
+    def to_response(self) -> dict:
+        return {
+            "success": False,
+            "error_code": self.error_code,
+            "message": self.message,
+        }
+
+    def to_http(self) -> HTTPException:
+        return HTTPException(
+            status_code=self.status_code,
+            detail=self.to_response(),
+            headers=self.headers,
+        )
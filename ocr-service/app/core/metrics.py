@@ -0,0 +1,125 @@
+# app/core/metrics.py
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Prometheus metrics for /metrics.
+#
+# Each uvicorn worker and each OCR pool process (OCR_EXECUTOR_MODE=process)
+# records into its own registry. Set PROMETHEUS_MULTIPROC_DIR to an empty,
+# writable directory before starting the server: every process then
+# writes its samples there and /metrics aggregates all of them. Without
+# it, /metrics only shows the worker that answered the scrape.
+
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+STAGE_SECONDS = Histogram(
+    "ocr_stage_seconds",
+    "Time spent in each stage of an /ocr request",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+CACHE_LOOKUPS = Counter(
+    "ocr_cache_lookups_total",
+    "OCR cache lookups by key tier (raw, pixel, near) and result (hit, miss)",
+    ["tier", "result"],
+)
+
+CACHE_EVICTIONS = Counter(
+    "ocr_cache_evictions_total",
+    "Entries dropped from the OCR cache, by reason (size, expired)",
+    ["reason"],
+)
+
+REJECTIONS = Counter(
+    "ocr_rejections_total",
+    "Uploads answered with an error, by error_code",
+    ["error_code"],
+)
+
+ADMISSION_DECISIONS = Counter(
+    "ocr_admission_decisions_total",
+    "OCR passes admitted or shed by admission control",
+    ["decision"],
+)
+
+ADMISSION_PREDICTED_SECONDS = Histogram(
+    "ocr_admission_predicted_seconds",
+    "Predicted latency (queue wait + service time) of an OCR pass at admission",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 60),
+)
+
+CASCADE_TIERS = Counter(
+    "ocr_cascade_tier_total",
+    "Cascade tier outcomes: accepted (answered the request), escalated "
+    "(parse not confident enough) or skipped (tier not applicable)",
+    ["tier", "outcome"],
+)
+
+PARSER_CONFIDENCE = Histogram(
+    "ocr_parser_confidence",
+    "Parser confidence of successful OCR responses",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0),
+)
+
+EXECUTOR_PENDING = Gauge(
+    "ocr_executor_pending",
+    "OCR jobs queued or running on the executor",
+    multiprocess_mode="livesum",
+)
+
+SCREENSHOT_UPLOADS = Counter(
+    "ocr_screenshot_uploads_total",
+    "Screenshot archive uploads by result (stored, duplicate, retried, failed, dropped)",
+    ["result"],
+)
+
+AUDIT_EVENTS = Counter(
+    "ocr_audit_events_total",
+    "Audit log entries by status",
+    ["status"],
+)
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    with timed("decode"): ...  records the block in ocr_stage_seconds.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Exposition body and content type for GET /metrics.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """
+    Drop this process's live gauges on shutdown (multiprocess mode).
+    """
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,2 +1,179 @@
-def rate_limit():
-    return True
+# app/core/rate_limit.py
+import asyncio
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from cachetools import LRUCache
+
+from app.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_PER_MINUTE,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_REDIS_URL,
+)
+from app.core.errors import OCRServiceError
+
+logger = logging.getLogger(__name__)
+
+# Token bucket per client: `burst` tokens, refilled at `rate` per second.
+# A request costing more than is left waits; one costing more than the
+# whole bucket (a big batch) is let through when the bucket is full and
+# leaves it in debt, so the client waits that much longer afterwards.
+# Every check is one O(1) read-modify-write of the client's bucket.
+
+
+def take_tokens(
+    tokens: float, stamp: float, now: float, cost: float, rate: float, burst: float
+) -> tuple[float, float, float]:
+    """
+    Refill a bucket holding `tokens` at `stamp` up to `now` and take
+    `cost` from it. Returns (tokens, stamp, seconds to wait); a wait of 0
+    means the tokens were taken.
+    """
+    tokens = min(burst, tokens + max(0.0, now - stamp) * rate)
+    needed = min(cost, burst)
+    if tokens >= needed:
+        return tokens - cost, now, 0.0
+    return tokens, now, (needed - tokens) / rate
+
+
+class RateLimitStore(ABC):
+    @abstractmethod
+    def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        """
+        Take `cost` tokens from the bucket `key`; 0 if they were taken,
+        else the seconds until they would be.
+        """
+
+    async def atake(self, key: str, cost: float, rate: float, burst: float) -> float:
+        # Event-loop access; shared stores do network I/O, so off the loop
+        return await asyncio.to_thread(self.take, key, cost, rate, burst)
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Buckets in this worker process. Idle clients are dropped least
+    recently used first, which simply hands them a full bucket again.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self._buckets: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.get(key, (burst, now))
+            tokens, stamp, wait = take_tokens(tokens, stamp, now, cost, rate, burst)
+            self._buckets[key] = (tokens, stamp)
+        return wait
+
+    async def atake(self, key: str, cost: float, rate: float, burst: float) -> float:
+        return self.take(key, cost, rate, burst)
+
+
+# Same arithmetic as take_tokens(), atomically on the server. The result
+# is returned as a string: Lua numbers are truncated to integers.
+_TAKE_SCRIPT = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local cost, now = tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens = tonumber(bucket[1]) or burst
+local stamp = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - stamp) * rate)
+local needed = math.min(cost, burst)
+local wait = 0
+if tokens >= needed then
+    tokens = tokens - cost
+else
+    wait = (needed - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Buckets on a Redis-protocol server, shared by every worker and host.
+    Pass `client` to use an existing client or a local stand-in (e.g.
+    fakeredis) instead of `url`.
+    """
+
+    def __init__(self, url: str | None = None, prefix: str = "ratelimit:", client=None):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        # Wall clock, not monotonic: the stamp is compared across hosts
+        wait = self._take(keys=[self.prefix + key], args=[rate, burst, cost, time.time()])
+        return float(wait)
+
+    def close(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        store: RateLimitStore,
+        per_minute: float,
+        burst: float,
+        enabled: bool = True,
+    ):
+        self.store = store
+        self.rate = per_minute / 60
+        self.burst = max(1.0, burst)
+        self.enabled = enabled
+
+    async def check(self, client_id: str, cost: float = 1) -> None:
+        """
+        Charge `cost` to the client, raising RATE_LIMITED (429 with
+        Retry-After) when its bucket cannot cover it. An unreachable
+        shared store lets the request through.
+        """
+        if not self.enabled:
+            return
+        try:
+            wait = await self.store.atake(client_id, cost, self.rate, self.burst)
+        except Exception:
+            logger.warning("Rate limit store failed", exc_info=True)
+            return
+        if wait > 0:
+            raise OCRServiceError(
+                "RATE_LIMITED",
+                "Too many requests, please retry later",
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def build_rate_limiter(backend: str = RATE_LIMIT_BACKEND) -> RateLimiter:
+    if backend == "memory":
+        store = MemoryRateLimitStore()
+    elif backend == "redis":
+        store = RedisRateLimitStore(RATE_LIMIT_REDIS_URL)
+    else:
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+    return RateLimiter(store, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, enabled=RATE_LIMIT_ENABLED)
+
+
+RATE_LIMITER = build_rate_limiter()
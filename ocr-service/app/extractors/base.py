@@ -1,10 +1,14 @@
 # app/extractors/base.py
 from abc import ABC, abstractmethod
 
+from app.utils.line_index import LineIndex
+
+
 class BaseExtractor(ABC):
     @abstractmethod
-    def extract(self, lines: list[str]) -> dict | None:
+    def extract(self, index: LineIndex) -> dict | None:
         """
-        Return structured data or None if not applicable
+        Return structured data or None if not applicable.
+        `index` is the pre-classified OCR lines (see utils/line_index.py).
         """
         pass
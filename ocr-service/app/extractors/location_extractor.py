@@ -1,14 +1,13 @@
 # app/extractors/location_extractor.py
 from app.extractors.base import BaseExtractor
+from app.utils.line_index import LineIndex
 
 class LocationExtractor(BaseExtractor):
-    def extract(self, lines: list[str]) -> dict | None:
-        for i, line in enumerate(lines):
-            l = line.lower()
-            if "location" in l or "iocation" in l:
-                if i + 1 < len(lines):
-                    return {
-                        "location": lines[i + 1].strip(),
-                        "confidence": 0.9
-                    }
+    def extract(self, index: LineIndex) -> dict | None:
+        for i in index.lines_with("location"):
+            if i + 1 < len(index):
+                return {
+                    "location": index.lines[i + 1],
+                    "confidence": 0.9
+                }
         return None
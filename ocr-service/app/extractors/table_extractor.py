@@ -1,87 +1,151 @@
 # app/extractors/table_extractor.py
-import re
+import numpy as np
+
 from app.extractors.base import BaseExtractor
 from app.utils.date_utils import normalize_date, clean_display_date
-
-TIME_RE = re.compile(r"^\d{1,2}:\d{2}$")
-COUNT_RE = re.compile(r"^\d+$")
+from app.utils.line_index import LineIndex, TIME_RE, COUNT_RE
+from app.utils.table_layout import TableLayout
 
 MIN_VALID_COUNT = 20  # avoids calendar noise
 
 class TableAvailabilityExtractor(BaseExtractor):
-    def extract(self, lines: list[str]) -> dict | None:
+    def extract(self, index: LineIndex) -> dict | None:
+        # Prefer real table cells when the OCR boxes are available
         slots = []
-        used_indices = set()
+        if index.layout is not None:
+            slots = self._slots_from_layout(index.layout)
+        if not slots:
+            slots = self._slots_from_lines(index)
 
-        # -------------------------------
-        # FORMAT A & B: Time → Date → (Count)
-        # -------------------------------
-        for i in range(len(lines) - 1):
-            time = lines[i].strip()
-            date_line = lines[i + 1].strip()
-
-            if TIME_RE.match(time):
-                date = normalize_date(date_line)
-                if not date:
-                    continue
-
-                count = 1
-                if i + 2 < len(lines) and COUNT_RE.match(lines[i + 2].strip()):
-                    count_val = int(lines[i + 2].strip())
-                    if count_val >= MIN_VALID_COUNT:
-                        count = count_val
-                        used_indices.update({i, i + 1, i + 2})
-                        next_i = i + 3
-                    else:
-                        used_indices.update({i, i + 1})
-                        next_i = i + 2
-                else:
-                    used_indices.update({i, i + 1})
-                    next_i = i + 2
+        if not slots:
+            return None
+
+        return {
+            "slots": slots,
+            "source": "table",
+            "confidence": (
+                0.95 if any(s["time"] for s in slots)
+                else 0.9
+            )
+        }
+
+    # -------------------
+    # Layout: Time | Date | Count cells of one row
+    # -------------------
+
+    def _slots_from_layout(self, layout: TableLayout) -> list[dict]:
+        n = len(layout.texts)
+        kinds = np.zeros(n, dtype=np.int8)     # 0 other, 1 time, 2 date, 3 count
+        dates: list[str | None] = [None] * n
+        for i, text in enumerate(layout.texts):
+            text = text.strip()
+            if TIME_RE.match(text):
+                kinds[i] = 1
+            elif COUNT_RE.match(text):
+                kinds[i] = 3
+            else:
+                dates[i] = normalize_date(text)
+                if dates[i]:
+                    kinds[i] = 2
+
+        # Column role = the column holding most cells of that kind
+        roles = {}
+        for kind in (1, 2, 3):
+            per_col = np.bincount(layout.col_of[kinds == kind], minlength=layout.n_cols)
+            if per_col.size and per_col.max() > 0:
+                roles[kind] = int(per_col.argmax())
+        if 2 not in roles:
+            return []
+
+        slots = []
+        for row in layout.rows:
+            cells = {}
+            for i in row:
+                col = int(layout.col_of[i])
+                if kinds[i] and roles.get(int(kinds[i])) == col:
+                    cells.setdefault(int(kinds[i]), i)
+
+            date_i = cells.get(2)
+            if date_i is None:
+                continue
+
+            time = layout.texts[cells[1]].strip() if 1 in cells else None
+            count = int(layout.texts[cells[3]].strip()) if 3 in cells else None
+            date_line = layout.texts[date_i].strip()
 
+            if time:
                 slots.append({
-                    "date": date,
+                    "date": dates[date_i],
                     "time": time,
-                    "count": count,
+                    "count": count if count is not None and count >= MIN_VALID_COUNT else 1,
                     "display": f"{clean_display_date(date_line)} {time}",
                     "source": "table_time"
                 })
+            elif count is not None and count >= MIN_VALID_COUNT:
+                slots.append({
+                    "date": dates[date_i],
+                    "time": None,
+                    "count": count,
+                    "display": clean_display_date(date_line),
+                    "source": "table_date"
+                })
+
+        return slots
+
+    # -------------------
+    # Lines: adjacency in reading order (no boxes available)
+    # -------------------
+
+    def _slots_from_lines(self, index: LineIndex) -> list[dict]:
+        lines = index.lines
+        slots = []
+        used_indices = set()
 
         # -------------------------------
-        # FORMAT C: Date → Count (no time)
+        # FORMAT A & B: Time → Date → (Count)
         # -------------------------------
-        for i in range(len(lines) - 1):
-            if i in used_indices:
+        for i in index.lines_with("time"):
+            if i + 1 >= len(index):
                 continue
 
-            date_line = lines[i].strip()
-            count_line = lines[i + 1].strip()
-
-            date = normalize_date(date_line)
+            time = lines[i]
+            date = index.dates[i + 1]
             if not date:
                 continue
 
-            if COUNT_RE.match(count_line):
-                count = int(count_line)
-                if count < MIN_VALID_COUNT:
-                    continue
+            count = 1
+            count_val = index.counts[i + 2] if i + 2 < len(index) else None
+            if count_val is not None and count_val >= MIN_VALID_COUNT:
+                count = count_val
+                used_indices.update({i, i + 1, i + 2})
+            else:
+                used_indices.update({i, i + 1})
 
-                slots.append({
-                    "date": date,
-                    "time": None,
-                    "count": count,
-                    "display": clean_display_date(date_line),
-                    "source": "table_date"
-                })
+            slots.append({
+                "date": date,
+                "time": time,
+                "count": count,
+                "display": f"{clean_display_date(lines[i + 1])} {time}",
+                "source": "table_time"
+            })
 
-        if not slots:
-            return None
+        # -------------------------------
+        # FORMAT C: Date → Count (no time)
+        # -------------------------------
+        for i in index.lines_with("date"):
+            if i in used_indices or i + 1 >= len(index):
+                continue
 
-        return {
-            "slots": slots,
-            "source": "table",
-            "confidence": (
-                0.95 if any(s["time"] for s in slots)
-                else 0.9
-            )
-        }
+            count = index.counts[i + 1]
+            if count is None or count < MIN_VALID_COUNT:
+                continue
+
+            slots.append({
+                "date": index.dates[i],
+                "time": None,
+                "count": count,
+                "display": clean_display_date(lines[i]),
+                "source": "table_date"
+            })
+
+        return slots
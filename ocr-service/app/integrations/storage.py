@@ -0,0 +1,64 @@
+# app/integrations/storage.py
+import os
+import tempfile
+from abc import ABC, abstractmethod
+
+from app.config import SCREENSHOT_STORAGE_BACKEND, SCREENSHOT_STORAGE_DIR
+
+
+class ObjectStore(ABC):
+    """
+    Where archived screenshots end up. Keys are content addressed
+    (see services/uploads.py), so put() of an existing key is a no-op
+    in effect and exists() lets callers skip the transfer.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class LocalStore(ObjectStore):
+    """
+    Stand-in for the Supabase bucket: same key layout, on local disk.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename, so a reader never sees half a file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def build_object_store(backend: str = SCREENSHOT_STORAGE_BACKEND) -> ObjectStore:
+    if backend == "local":
+        return LocalStore(SCREENSHOT_STORAGE_DIR)
+    if backend == "supabase":
+        from app.integrations.supabase.storage import SupabaseStore
+
+        return SupabaseStore()
+    raise ValueError(f"Unknown screenshot storage backend: {backend}")
@@ -1,10 +1,26 @@
-from supabase import create_client
 import os
+import threading
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    raise RuntimeError("Supabase env vars not set")
+_supabase = None
+_supabase_lock = threading.Lock()
 
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+def get_supabase():
+    """
+    Supabase client, created on first use so the app starts (and runs
+    with SCREENSHOT_STORAGE_BACKEND=local) without Supabase configured.
+    """
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+                    raise RuntimeError("Supabase env vars not set")
+
+                from supabase import create_client
+
+                _supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    return _supabase
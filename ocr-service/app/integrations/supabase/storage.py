@@ -1,25 +1,37 @@
+from app.integrations.storage import ObjectStore
+from .client import get_supabase
 
-from datetime import datetime
-from fastapi import UploadFile
-from .client import supabase 
-from uuid import uuid4
+BUCKET = "visa-screenshots"
 
-def save_image_to_supabase(*, file_bytes: bytes, content_type: str):
-    filename = f"screenshots/{uuid4()}.png"
 
-    response = supabase.storage.from_("visa-screenshots").upload(
-        path=filename,
-        file=file_bytes,
-        file_options={
-            "contentType": content_type,  # must be str
-        },
-    )
+class SupabaseStore(ObjectStore):
+    """
+    Supabase storage bucket. The client (and its HTTP connection pool)
+    is created once and shared by every upload.
+    """
 
-    if isinstance(response, dict) and response.get("error"):
-        raise RuntimeError(response["error"])
+    def __init__(self, bucket: str = BUCKET):
+        self.bucket = bucket
 
-    return {
-        "bucket": "visa-screenshots",
-        "path": filename,
-    }
+    def _bucket(self):
+        return get_supabase().storage.from_(self.bucket)
 
+    def exists(self, key: str) -> bool:
+        folder, _, name = key.rpartition("/")
+        files = self._bucket().list(folder, {"search": name, "limit": 1})
+        return any(f.get("name") == name for f in files or [])
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        response = self._bucket().upload(
+            path=key,
+            file=data,
+            file_options={
+                "contentType": content_type,  # must be str
+                # Same key = same bytes, so overwriting a concurrent
+                # upload of the same screenshot is harmless
+                "upsert": "true",
+            },
+        )
+
+        if isinstance(response, dict) and response.get("error"):
+            raise RuntimeError(response["error"])
@@ -1,21 +1,40 @@
+import time
+
+_import_started = time.perf_counter()
+
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.ocr import router as ocr_router
-from paddleocr import PaddleOCR
 from app.api.auth import router as auth_router
+from app.services.ocr_engine import shutdown_ocr_engine
+from app.services.executor import OCR_EXECUTOR
+from app.services.cache import OCR_CACHE
+from app.services.uploads import SCREENSHOT_UPLOADER
+from app.core.metrics import render_metrics, mark_process_dead
+from app.core.body_limit import BodySizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
+from app.api.ocr import MAX_FILE_BYTES, MAX_ZIP_BYTES
+
+# Reported by /ready; python -m benchmarks.startup_profile breaks it down
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret")
 JWT_ALG = "HS256"
-paddle_ocr = PaddleOCR(
-    lang="en",
-    use_angle_cls=False,
-)
 app = FastAPI(title="Visa-Grade OCR Backend")
 
+# Stop oversized uploads while they stream in, not after they are spooled
+# (added first so it runs inside CORS and its 413s get CORS headers)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        "/ocr/batch": MAX_ZIP_BYTES + MULTIPART_OVERHEAD_BYTES,
+        "/ocr": MAX_FILE_BYTES + MULTIPART_OVERHEAD_BYTES,
+    },
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,15 +48,61 @@ app.include_router(ocr_router, prefix="/ocr", tags=["OCR"])
 # app.include_router(ocr_router)
 @app.get("/health")
 def health():
+    """
+    Liveness: the process is up and serving. Says nothing about the model.
+    """
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready(response: Response):
+    """
+    Readiness: 200 once the OCR engine is loaded and warmed, 503 before
+    (or if loading failed). Route traffic on this, not on /health.
+    """
+    engine = OCR_EXECUTOR.engine_status()
+    is_ready = engine["state"] == "ready"
+    if not is_ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if is_ready else "not_ready",
+        "engine": engine,
+        "import_seconds": IMPORT_SECONDS,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.on_event("startup")
 def warm_ocr():
-    import numpy as np
+    # Model loading and warm-up run in the background so the server
+    # accepts connections (and answers /health) at once; /ready turns
+    # 200 when the engine that serves /ocr is warm. In process mode each
+    # pool process builds and warms its own engine.
+    OCR_EXECUTOR.warm_up()
+
+
+@app.on_event("startup")
+async def start_uploads():
+    # Also resumes uploads spooled before a restart
+    SCREENSHOT_UPLOADER.start()
+
+
+@app.on_event("shutdown")
+async def drain_uploads():
+    await SCREENSHOT_UPLOADER.stop()
+
 
-    dummy = np.zeros((200, 200, 3), dtype="uint8")
-    paddle_ocr.ocr(dummy)
+@app.on_event("shutdown")
+def release_ocr():
+    OCR_EXECUTOR.shutdown()
+    shutdown_ocr_engine()
+    OCR_CACHE.close()
+    mark_process_dead()
 
 
 # app = FastAPI(title="Auth Service")
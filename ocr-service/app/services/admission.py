@@ -0,0 +1,101 @@
+# app/services/admission.py
+import math
+
+from app.config import OCR_ADMISSION_ENABLED, OCR_LATENCY_TARGET_SECONDS, OCR_WORKERS
+from app.core.errors import OCRServiceError
+from app.core.metrics import ADMISSION_DECISIONS, ADMISSION_PREDICTED_SECONDS
+
+# Weight of the newest service time in the moving average
+SERVICE_TIME_ALPHA = 0.2
+
+
+class AdmittedJob:
+    """
+    One OCR pass counted against the backlog from admission until it
+    finishes (see OCRExecutor.run).
+    """
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self.started = False
+        self._finished = False
+
+    def finish(self, service_seconds: float | None = None) -> None:
+        """
+        Take the job off the backlog; `service_seconds` is how long it ran
+        (None if it never ran). Safe to call more than once.
+        """
+        if self._finished:
+            return
+        self._finished = True
+        self._controller.in_flight -= 1
+        if service_seconds is not None:
+            self._controller.observe(service_seconds)
+
+    def abandon(self) -> None:
+        """
+        Take the job off the backlog if it never reached the pool. A
+        started job stays counted until the pool is done with it.
+        """
+        if not self.started:
+            self.finish()
+
+
+class AdmissionController:
+    """
+    Predicts how long a new OCR pass would take: the passes already
+    admitted (queued or running), `workers` at a time, each taking the
+    moving average of recent service times, plus its own. Passes
+    predicted to miss `target` are shed up front.
+
+    Event-loop only; the executor reports service times back onto the
+    loop.
+    """
+
+    def __init__(self, target: float, workers: int, enabled: bool = True):
+        self.target = target
+        self.workers = max(1, workers)
+        self.enabled = enabled
+        self.in_flight = 0
+        # Unknown until the first pass finishes: admit everything till then
+        self.service_time: float | None = None
+
+    def observe(self, seconds: float) -> None:
+        if self.service_time is None:
+            self.service_time = seconds
+        else:
+            self.service_time += SERVICE_TIME_ALPHA * (seconds - self.service_time)
+
+    def predicted_latency(self) -> float | None:
+        if self.service_time is None:
+            return None
+        return (self.in_flight // self.workers + 1) * self.service_time
+
+    def admit(self) -> AdmittedJob:
+        """
+        Raise OVERLOADED (503 with Retry-After) if a new pass would miss
+        the latency target, else count it into the backlog right away, so
+        that requests arriving before it reaches the executor see it.
+        Pass the job to OCRExecutor.run, or abandon() it.
+        """
+        predicted = self.predicted_latency()
+        if self.enabled and predicted is not None:
+            ADMISSION_PREDICTED_SECONDS.observe(predicted)
+            if predicted > self.target:
+                ADMISSION_DECISIONS.labels("shed").inc()
+                raise OCRServiceError(
+                    "OVERLOADED",
+                    "OCR service is overloaded, please retry shortly",
+                    status_code=503,
+                    headers={"Retry-After": str(max(1, math.ceil(predicted - self.target)))},
+                )
+        ADMISSION_DECISIONS.labels("admitted").inc()
+        self.in_flight += 1
+        return AdmittedJob(self)
+
+
+OCR_ADMISSION = AdmissionController(
+    target=OCR_LATENCY_TARGET_SECONDS,
+    workers=OCR_WORKERS,
+    enabled=OCR_ADMISSION_ENABLED,
+)
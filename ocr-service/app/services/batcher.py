@@ -0,0 +1,98 @@
+# app/services/batcher.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Collects concurrent inference requests into batches.
+
+    Callers block in submit(). A single scheduler thread waits for the
+    first request, keeps collecting until `max_batch_size` requests are
+    queued or `max_latency_ms` has passed since the first one arrived, then
+    runs `infer_batch(items)` once and hands each caller its own result.
+    """
+
+    def __init__(self, infer_batch, max_batch_size: int = 8, max_latency_ms: float = 10):
+        self.infer_batch = infer_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0.0, max_latency_ms) / 1000
+
+        self._queue: queue.Queue = queue.Queue()
+        self._stopped = threading.Event()
+        # Orders submit() against stop(): nothing is queued after the
+        # stop sentinel
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="ocr-microbatch",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, item):
+        future = Future()
+        with self._lock:
+            if self._stopped.is_set():
+                raise RuntimeError("Micro-batcher is stopped")
+            self._queue.put((item, future))
+        return future.result()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped.set()
+            self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _loop(self) -> None:
+        while not self._stopped.is_set():
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._stopped.set()
+                    break
+                batch.append(nxt)
+
+            self._run(batch)
+
+        self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        # Fail anything still waiting so no caller blocks forever
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is not None:
+                pending[1].set_exception(RuntimeError("Micro-batcher is stopped"))
+
+    def _run(self, batch: list) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = self.infer_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch returned {len(results)} results for {len(items)} inputs"
+                )
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -1,6 +1,60 @@
-from cachetools import TTLCache
+from app.config import (
+    OCR_CACHE_BACKEND,
+    OCR_CACHE_TTL_SECONDS,
+    OCR_CACHE_MAXSIZE,
+    OCR_CACHE_SQLITE_PATH,
+    OCR_CACHE_SQLITE_MAXSIZE,
+    OCR_CACHE_REDIS_URL,
+    PHASH_MAX_DISTANCE,
+    PHASH_MAX_CHANGED_TILES,
+    PHASH_MAX_CANDIDATES,
+    PHASH_MAX_ENTRIES,
+)
+from app.services.cache_backends import (
+    CacheBackend,
+    MemoryCache,
+    SQLiteCache,
+    RedisCache,
+    TieredCache,
+)
+from app.services.phash_index import NearDuplicateIndex
+
+
+def build_cache(backend: str) -> CacheBackend:
+    l1 = MemoryCache(maxsize=OCR_CACHE_MAXSIZE, ttl=OCR_CACHE_TTL_SECONDS)
+    if backend == "memory":
+        return l1
+    if backend == "sqlite":
+        l2 = SQLiteCache(
+            OCR_CACHE_SQLITE_PATH,
+            maxsize=OCR_CACHE_SQLITE_MAXSIZE,
+            ttl=OCR_CACHE_TTL_SECONDS,
+        )
+        return TieredCache(l1, l2)
+    if backend == "redis":
+        return TieredCache(l1, RedisCache(OCR_CACHE_REDIS_URL, ttl=OCR_CACHE_TTL_SECONDS))
+    raise ValueError(f"Unknown OCR_CACHE_BACKEND: {backend}")
+
+
+OCR_CACHE = build_cache(OCR_CACHE_BACKEND)
 
-OCR_CACHE = TTLCache(
-    maxsize=5000,     # max images
-    ttl=60 * 60       # 1 hour
+# Fingerprints of processed images -> their pixel cache key. Entries whose
+# response has expired from OCR_CACHE simply miss.
+NEAR_DUPLICATES = NearDuplicateIndex(
+    max_distance=PHASH_MAX_DISTANCE,
+    max_changed_tiles=PHASH_MAX_CHANGED_TILES,
+    max_candidates=PHASH_MAX_CANDIDATES,
+    max_entries=PHASH_MAX_ENTRIES,
 )
+
+# Two key tiers point at the same cached response:
+#   raw:<hash>  exact upload bytes, checked before any decoding
+#   px:<hash>   decoded + resized pixels, catches re-encoded copies
+
+
+def raw_cache_key(upload_digest: str) -> str:
+    return f"raw:{upload_digest}"
+
+
+def pixel_cache_key(img_hash: str) -> str:
+    return f"px:{img_hash}"
@@ -0,0 +1,295 @@
+# app/services/cache_backends.py
+import asyncio
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from cachetools import TTLCache
+
+from app.core.metrics import CACHE_EVICTIONS
+
+logger = logging.getLogger(__name__)
+
+# Cached values are OCR responses: plain JSON-serialisable dicts.
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str, default=None):
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: dict) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    # Event-loop access. Backends that can block (disk, network) run on a
+    # worker thread; MemoryCache stays inline.
+    async def aget(self, key: str, default=None):
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def aset(self, key: str, value: dict) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    # dict-style access, so callers can keep using OCR_CACHE[key]
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.delete(key)
+
+
+class _CountingTTLCache(TTLCache):
+    """
+    TTLCache that reports what it drops to ocr_cache_evictions_total.
+    """
+
+    def popitem(self):
+        # Called by TTLCache only when full
+        item = super().popitem()
+        CACHE_EVICTIONS.labels("size").inc()
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        if expired:
+            CACHE_EVICTIONS.labels("expired").inc(len(expired))
+        return expired
+
+
+class MemoryCache(CacheBackend):
+    """
+    Per-process TTL cache (the original OCR_CACHE).
+    """
+
+    def __init__(self, maxsize: int = 5000, ttl: float = 60 * 60):
+        self._cache = _CountingTTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            return self._cache.get(key, default)
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    async def aget(self, key: str, default=None):
+        return self.get(key, default)
+
+    async def aset(self, key: str, value: dict) -> None:
+        self.set(key, value)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk cache shared by every worker on the host; survives restarts.
+    WAL mode lets readers in other processes proceed during writes.
+    """
+
+    PURGE_EVERY = 500   # writes between expiry/size sweeps
+
+    def __init__(self, path: str, maxsize: int = 50_000, ttl: float = 60 * 60):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        # Every thread's connection, so close() reaches them all
+        self._conns: list[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._writes = itertools.count(1)   # next() is atomic
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ocr_cache_expires ON ocr_cache (expires_at)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; only close() touches another
+        # thread's connection
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conns_lock:
+                self._conns.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default=None):
+        row = self._conn().execute(
+            "SELECT value FROM ocr_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: dict) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO ocr_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + self.ttl),
+        )
+        if next(self._writes) % self.PURGE_EVERY == 0:
+            self._purge(conn)
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        expired = conn.execute("DELETE FROM ocr_cache WHERE expires_at <= ?", (time.time(),))
+        CACHE_EVICTIONS.labels("expired").inc(max(0, expired.rowcount))
+        # Over capacity: drop the entries closest to expiry
+        evicted = conn.execute(
+            "DELETE FROM ocr_cache WHERE key IN ("
+            " SELECT key FROM ocr_cache ORDER BY expires_at"
+            " LIMIT max(0, (SELECT count(*) FROM ocr_cache) - ?))",
+            (self.maxsize,),
+        )
+        CACHE_EVICTIONS.labels("size").inc(max(0, evicted.rowcount))
+
+    def close(self) -> None:
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache on any Redis-protocol server. Pass `client` to use an existing
+    client or a local stand-in (e.g. fakeredis) instead of `url`.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        ttl: float = 60 * 60,
+        prefix: str = "ocr:",
+        client=None,
+    ):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.client = client
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def get(self, key: str, default=None):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else default
+
+    def set(self, key: str, value: dict) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def close(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
+
+
+class TieredCache(CacheBackend):
+    """
+    In-memory L1 in front of a shared L2. L2 failures are logged and
+    treated as misses, so an unreachable L2 degrades to L1-only.
+    """
+
+    def __init__(self, l1: CacheBackend, l2: CacheBackend):
+        self.l1 = l1
+        self.l2 = l2
+
+    def get(self, key: str, default=None):
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+
+        try:
+            value = self.l2.get(key)
+        except Exception:
+            logger.warning("L2 cache get failed", exc_info=True)
+            return default
+
+        if value is None:
+            return default
+        self.l1.set(key, value)
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        self.l1.set(key, value)
+        try:
+            self.l2.set(key, value)
+        except Exception:
+            logger.warning("L2 cache set failed", exc_info=True)
+
+    async def aget(self, key: str, default=None):
+        value = await self.l1.aget(key)
+        if value is not None:
+            return value
+
+        try:
+            value = await self.l2.aget(key)
+        except Exception:
+            logger.warning("L2 cache get failed", exc_info=True)
+            return default
+
+        if value is None:
+            return default
+        await self.l1.aset(key, value)
+        return value
+
+    async def aset(self, key: str, value: dict) -> None:
+        await self.l1.aset(key, value)
+        try:
+            await self.l2.aset(key, value)
+        except Exception:
+            logger.warning("L2 cache set failed", exc_info=True)
+
+    def delete(self, key: str) -> None:
+        self.l1.delete(key)
+        try:
+            self.l2.delete(key)
+        except Exception:
+            logger.warning("L2 cache delete failed", exc_info=True)
+
+    def close(self) -> None:
+        self.l1.close()
+        self.l2.close()
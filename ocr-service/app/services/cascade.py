@@ -0,0 +1,89 @@
+# app/services/cascade.py
+from PIL import Image
+
+from app.config import (
+    CONFIDENCE_THRESHOLD,
+    OCR_CASCADE_TIERS,
+    OCR_CASCADE_DOWNSCALE_WIDTH,
+    OCR_CASCADE_REQUIRED_FIELDS,
+    ROI_MAX_COVERAGE,
+)
+from app.core.metrics import timed
+from app.services.roi import crop_to_panels
+from app.utils.image import resize_image
+
+# Each tier turns the (already resized) upload into a cheaper frame to
+# OCR, or returns None when it cannot help with this image. The full
+# frame is the implicit last tier. The loop itself is
+# pipeline.run_cascade().
+
+FULL_TIER = "full"
+
+# Fields of form_data a tier may be asked to fill (OCR_CASCADE_REQUIRED_FIELDS)
+FORM_FIELDS = ("consulate", "earliest_available_date", "available_slots", "total_slots")
+
+
+def roi_frame(image: Image.Image) -> Image.Image | None:
+    with timed("roi"):
+        return crop_to_panels(image, max_coverage=ROI_MAX_COVERAGE)
+
+
+def downscaled_frame(image: Image.Image, width: int = OCR_CASCADE_DOWNSCALE_WIDTH) -> Image.Image | None:
+    if image.width <= width:
+        return None     # would be the full frame again
+    return resize_image(image, width)
+
+
+TIERS = {
+    "roi": roi_frame,
+    "downscale": downscaled_frame,
+}
+
+
+def is_confident(response: dict, threshold: float, required: tuple[str, ...] = ("available_slots",)) -> bool:
+    if not response.get("success"):
+        return False
+    form_data = response["form_data"]
+    return (
+        all(form_data.get(field) for field in required)
+        and form_data["meta"]["confidence"] >= threshold
+    )
+
+
+class Cascade:
+    def __init__(
+        self,
+        tiers: list[str],
+        threshold: float = CONFIDENCE_THRESHOLD,
+        required: list[str] | None = None,
+    ):
+        unknown = [t for t in tiers if t not in TIERS]
+        if unknown:
+            raise ValueError(f"Unknown cascade tiers: {unknown}")
+        required = ["available_slots"] if required is None else required
+        unknown = [f for f in required if f not in FORM_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown required fields: {unknown}")
+
+        self.tiers = list(tiers)
+        self.threshold = threshold
+        self.required = tuple(required)
+
+    @classmethod
+    def from_spec(cls, spec: str, **kwargs) -> "Cascade":
+        """
+        "roi,downscale" -> cascade trying those tiers in order
+        """
+        return cls([t.strip() for t in spec.split(",") if t.strip()], **kwargs)
+
+    def accepts(self, response: dict) -> bool:
+        """
+        True when a cheap tier's response is good enough to return.
+        """
+        return is_confident(response, self.threshold, self.required)
+
+
+CASCADE = Cascade.from_spec(
+    OCR_CASCADE_TIERS,
+    required=[f.strip() for f in OCR_CASCADE_REQUIRED_FIELDS.split(",") if f.strip()],
+)
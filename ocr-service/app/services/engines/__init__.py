@@ -0,0 +1,25 @@
+from app.config import (
+    OCR_ENGINE_BACKEND,
+    OCR_ONNX_MODEL_DIR,
+    OCR_ONNX_QUANTIZED,
+    OCR_ONNX_THREADS,
+)
+from app.services.engines.base import OCREngine, OCRResult
+
+__all__ = ["OCREngine", "OCRResult", "build_engine"]
+
+
+def build_engine(backend: str = OCR_ENGINE_BACKEND) -> OCREngine:
+    """
+    Build the configured OCR backend. Backend packages (paddleocr,
+    onnxruntime) are imported here, not when the app starts.
+    """
+    if backend == "paddle":
+        from app.services.engines.paddle_engine import PaddleEngine
+
+        return PaddleEngine()
+    if backend == "onnx":
+        from app.services.engines.onnx_engine import OnnxEngine
+
+        return OnnxEngine(OCR_ONNX_MODEL_DIR, quantized=OCR_ONNX_QUANTIZED, threads=OCR_ONNX_THREADS)
+    raise ValueError(f"Unknown OCR engine backend: {backend}")
@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+import numpy as np
+
+
+class OCRResult(NamedTuple):
+    """
+    Recognised text lines of one image, in reading order.
+      boxes:  (N, 4, 2) float32 corner points, clockwise from top-left
+      texts:  (N,) object array of stripped, non-empty strings
+      scores: (N,) float32 recognition confidences
+    """
+    boxes: np.ndarray
+    texts: np.ndarray
+    scores: np.ndarray
+
+    @classmethod
+    def from_lists(cls, boxes: list, texts: list[str], scores: list[float]) -> "OCRResult":
+        boxes_np = np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2)
+        texts_np = np.empty(len(texts), dtype=object)
+        texts_np[:] = texts
+        return cls(boxes_np, texts_np, np.asarray(scores, dtype=np.float32))
+
+    @classmethod
+    def empty(cls) -> "OCRResult":
+        return cls.from_lists([], [], [])
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+
+class OCREngine(ABC):
+    """
+    A text detection + recognition backend.
+    """
+
+    name: str
+
+    # False: callers must not run infer() from several threads at once
+    thread_safe: bool = False
+
+    @abstractmethod
+    def infer(self, images: list[np.ndarray]) -> list[OCRResult]:
+        """
+        OCR RGB uint8 images; one result per image, in input order.
+        Backends that can batch inference across images do so.
+        """
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,238 @@
+import math
+from pathlib import Path
+
+import numpy as np
+
+from app.services.engines.base import OCREngine, OCRResult
+from app.utils.image import _cv2
+
+# PP-OCR detection (DB) and recognition (CTC) models exported to ONNX with
+# paddle2onnx. The model directory holds:
+#
+#   det.onnx, rec.onnx            float32 models
+#   det.int8.onnx, rec.int8.onnx  written by `python -m app.services.engines.quantize`
+#   dict.txt                      the recogniser's character list, one per line
+#
+# Pre/post-processing follows PaddleOCR's defaults for these models so
+# both backends see the same text boxes.
+
+DET_LIMIT_SIDE = 960
+DET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+DET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+DET_THRESH = 0.3            # pixel is text
+DET_BOX_THRESH = 0.6        # mean probability inside a box to keep it
+DET_UNCLIP_RATIO = 1.5
+DET_MAX_CANDIDATES = 1000
+DET_MIN_SIZE = 3
+
+REC_HEIGHT = 48
+REC_WIDTH = 320
+REC_BATCH_SIZE = 6
+REC_MIN_SCORE = 0.5
+
+# Boxes whose tops are this close (px) are on the same line
+LINE_TOLERANCE = 10
+
+
+def det_preprocess(bgr: np.ndarray) -> tuple[np.ndarray, tuple[float, float]]:
+    """
+    (1, 3, H, W) detector input, longest side capped at DET_LIMIT_SIDE and
+    both sides multiples of 32, plus the (y, x) factors back to `bgr`.
+    """
+    cv2 = _cv2()
+
+    h, w = bgr.shape[:2]
+    scale = min(1.0, DET_LIMIT_SIDE / max(h, w))
+    rh = max(32, int(round(h * scale / 32)) * 32)
+    rw = max(32, int(round(w * scale / 32)) * 32)
+
+    resized = cv2.resize(bgr, (rw, rh))
+    x = (resized.astype(np.float32) / 255 - DET_MEAN) / DET_STD
+    return x.transpose(2, 0, 1)[None], (h / rh, w / rw)
+
+
+def _session(path: Path, threads: int):
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads > 0:
+        opts.intra_op_num_threads = threads
+    return ort.InferenceSession(str(path), sess_options=opts, providers=["CPUExecutionProvider"])
+
+
+def _order_points(pts: np.ndarray) -> np.ndarray:
+    # Clockwise from top-left, the OCRResult box convention
+    by_x = pts[np.argsort(pts[:, 0])]
+    left = by_x[:2][np.argsort(by_x[:2, 1])]
+    right = by_x[2:][np.argsort(by_x[2:, 1])]
+    return np.array([left[0], right[0], right[1], left[1]], dtype=np.float32)
+
+
+def _box_score(prob: np.ndarray, pts: np.ndarray) -> float:
+    cv2 = _cv2()
+
+    h, w = prob.shape
+    x0, y0 = np.clip(np.floor(pts.min(axis=0)).astype(int), 0, [w - 1, h - 1])
+    x1, y1 = np.clip(np.ceil(pts.max(axis=0)).astype(int), 0, [w - 1, h - 1])
+    mask = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=np.uint8)
+    cv2.fillPoly(mask, [(pts - [x0, y0]).astype(np.int32)], 1)
+    return cv2.mean(prob[y0:y1 + 1, x0:x1 + 1], mask)[0]
+
+
+def _reading_order(boxes: list[np.ndarray]) -> list[np.ndarray]:
+    boxes = sorted(boxes, key=lambda b: (b[0][1], b[0][0]))
+    # Top-left y jitters within a line; order each line left to right
+    for i in range(len(boxes) - 1):
+        for j in range(i, -1, -1):
+            same_line = abs(boxes[j + 1][0][1] - boxes[j][0][1]) < LINE_TOLERANCE
+            if same_line and boxes[j + 1][0][0] < boxes[j][0][0]:
+                boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+            else:
+                break
+    return boxes
+
+
+def _crop(bgr: np.ndarray, box: np.ndarray) -> np.ndarray:
+    cv2 = _cv2()
+
+    width = max(1, int(max(np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[2] - box[3]))))
+    height = max(1, int(max(np.linalg.norm(box[0] - box[3]), np.linalg.norm(box[1] - box[2]))))
+    dst = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32)
+    crop = cv2.warpPerspective(
+        bgr,
+        cv2.getPerspectiveTransform(box, dst),
+        (width, height),
+        borderMode=cv2.BORDER_REPLICATE,
+        flags=cv2.INTER_CUBIC,
+    )
+    # Vertical text: rotate so the recogniser reads it left to right
+    if height >= 1.5 * width:
+        crop = np.ascontiguousarray(np.rot90(crop))
+    return crop
+
+
+class OnnxEngine(OCREngine):
+    """
+    PP-OCR det + rec on ONNX Runtime's CPU provider, float32 or int8.
+    """
+
+    name = "onnx"
+
+    # InferenceSession.run may be called from several threads at once
+    thread_safe = True
+
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = 0):
+        root = Path(model_dir)
+        suffix = ".int8.onnx" if quantized else ".onnx"
+        self.quantized = quantized
+
+        self._det = _session(root / f"det{suffix}", threads)
+        self._rec = _session(root / f"rec{suffix}", threads)
+        self._det_input = self._det.get_inputs()[0].name
+        self._rec_input = self._rec.get_inputs()[0].name
+
+        # CTC class 0 is the blank; PP-OCR appends the space character
+        chars = (root / "dict.txt").read_text(encoding="utf-8").splitlines()
+        self._charset = ["", *chars, " "]
+
+        classes = self._rec.get_outputs()[0].shape[-1]
+        if isinstance(classes, int) and classes != len(self._charset):
+            raise ValueError(
+                f"dict.txt has {len(self._charset)} classes, rec model expects {classes}"
+            )
+
+    # -------------------
+    # Detection
+    # -------------------
+
+    def _detect(self, bgr: np.ndarray) -> list[np.ndarray]:
+        cv2 = _cv2()
+
+        x, (ratio_h, ratio_w) = det_preprocess(bgr)
+        prob = self._det.run(None, {self._det_input: x})[0][0, 0]
+
+        bitmap = (prob > DET_THRESH).astype(np.uint8) * 255
+        contours, _ = cv2.findContours(bitmap, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+        h, w = bgr.shape[:2]
+        boxes = []
+        for contour in contours[:DET_MAX_CANDIDATES]:
+            center, (bw, bh), angle = cv2.minAreaRect(contour)
+            if min(bw, bh) < DET_MIN_SIZE:
+                continue
+            if _box_score(prob, cv2.boxPoints((center, (bw, bh), angle))) < DET_BOX_THRESH:
+                continue
+
+            # DB predicts shrunken text kernels; grow each side back by
+            # area * ratio / perimeter (the offset it was trained with)
+            grow = bw * bh * DET_UNCLIP_RATIO / (2 * (bw + bh))
+            bw, bh = bw + 2 * grow, bh + 2 * grow
+            if min(bw, bh) < DET_MIN_SIZE + 2:
+                continue
+
+            pts = cv2.boxPoints((center, (bw, bh), angle))
+            pts[:, 0] = np.clip(pts[:, 0] * ratio_w, 0, w - 1)
+            pts[:, 1] = np.clip(pts[:, 1] * ratio_h, 0, h - 1)
+            boxes.append(_order_points(pts))
+
+        return _reading_order(boxes)
+
+    # -------------------
+    # Recognition
+    # -------------------
+
+    def _decode(self, probs: np.ndarray) -> tuple[str, float]:
+        ids = probs.argmax(axis=1)
+        keep = ids != 0
+        keep[1:] &= ids[1:] != ids[:-1]
+        if not keep.any():
+            return "", 0.0
+        text = "".join(self._charset[i] for i in ids[keep])
+        return text, float(probs.max(axis=1)[keep].mean())
+
+    def _recognize(self, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        cv2 = _cv2()
+
+        results: list[tuple[str, float]] = [("", 0.0)] * len(crops)
+
+        # Similar aspect ratios share a batch, so little of it is padding
+        order = np.argsort([c.shape[1] / c.shape[0] for c in crops])
+        for start in range(0, len(crops), REC_BATCH_SIZE):
+            idx = order[start:start + REC_BATCH_SIZE]
+            max_ratio = max(REC_WIDTH / REC_HEIGHT, *(crops[i].shape[1] / crops[i].shape[0] for i in idx))
+            width = int(REC_HEIGHT * max_ratio)
+
+            batch = np.zeros((len(idx), 3, REC_HEIGHT, width), dtype=np.float32)
+            for k, i in enumerate(idx):
+                crop = crops[i]
+                w = min(width, math.ceil(REC_HEIGHT * crop.shape[1] / crop.shape[0]))
+                resized = cv2.resize(crop, (w, REC_HEIGHT)).astype(np.float32)
+                batch[k, :, :, :w] = (resized.transpose(2, 0, 1) / 255 - 0.5) / 0.5
+
+            probs = self._rec.run(None, {self._rec_input: batch})[0]
+            for k, i in enumerate(idx):
+                results[i] = self._decode(probs[k])
+        return results
+
+    def infer(self, images: list[np.ndarray]) -> list[OCRResult]:
+        # The models were trained on BGR input
+        pages = [np.ascontiguousarray(img[:, :, ::-1]) for img in images]
+        page_boxes = [self._detect(bgr) for bgr in pages]
+
+        # Lines from every image are recognised together to fill batches
+        crops = [_crop(bgr, box) for bgr, boxes in zip(pages, page_boxes) for box in boxes]
+        recognized = iter(self._recognize(crops) if crops else [])
+
+        results = []
+        for boxes in page_boxes:
+            kept_boxes, texts, scores = [], [], []
+            for box in boxes:
+                text, score = next(recognized)
+                text = text.strip()
+                if text and score >= REC_MIN_SCORE:
+                    kept_boxes.append(box)
+                    texts.append(text)
+                    scores.append(score)
+            results.append(OCRResult.from_lists(kept_boxes, texts, scores))
+        return results
@@ -0,0 +1,86 @@
+import numpy as np
+
+from app.services.engines.base import OCREngine, OCRResult
+
+
+class PaddleEngine(OCREngine):
+    """
+    PaddleOCR pipeline; paddleocr is imported when the engine is built.
+    """
+
+    name = "paddle"
+
+    # PaddleOCR predictors are not safe to call from several threads at once
+    thread_safe = False
+
+    def __init__(self):
+        from paddleocr import PaddleOCR
+
+        self._ocr = PaddleOCR(
+            lang="en",
+            use_angle_cls=False,
+        )
+
+    def infer(self, images: list[np.ndarray]) -> list[OCRResult]:
+        # PaddleOCR 3.x (predict) batches detection/recognition across the
+        # inputs; older releases only take one image per call
+        if hasattr(self._ocr, "predict"):
+            pages = list(self._ocr.predict(images))
+        else:
+            pages = []
+            for img in images:
+                result = self._ocr.ocr(img)
+                pages.append(result[0] if result else None)
+        return [page_result(page) for page in pages]
+
+
+def _box_points(box) -> np.ndarray:
+    pts = np.asarray(box, dtype=np.float32)
+    if pts.shape == (4,):
+        # x1, y1, x2, y2 rectangle
+        x1, y1, x2, y2 = pts
+        pts = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+    return pts.reshape(4, 2)
+
+
+def page_result(page) -> OCRResult:
+    """
+    Normalise one raw PaddleOCR page to an OCRResult.
+    """
+    if not page:
+        return OCRResult.empty()
+
+    boxes, texts, scores = [], [], []
+
+    # PP-OCRv5 / PaddleX dict output
+    if isinstance(page, dict) and "rec_texts" in page:
+        polys = page.get("rec_polys")
+        if polys is None:
+            polys = page.get("rec_boxes")
+        page_scores = page.get("rec_scores")
+
+        for i, t in enumerate(page["rec_texts"]):
+            if not (isinstance(t, str) and t.strip()):
+                continue
+            try:
+                box = _box_points(polys[i])
+            except Exception:
+                box = np.zeros((4, 2), dtype=np.float32)
+            boxes.append(box)
+            texts.append(t.strip())
+            scores.append(float(page_scores[i]) if page_scores is not None else 1.0)
+
+        return OCRResult.from_lists(boxes, texts, scores)
+
+    # Legacy PaddleOCR output: [[box, (text, score)], ...]
+    for item in page:
+        try:
+            text = item[1][0]
+            if text.strip():
+                boxes.append(_box_points(item[0]))
+                texts.append(text.strip())
+                scores.append(float(item[1][1]))
+        except Exception:
+            continue
+
+    return OCRResult.from_lists(boxes, texts, scores)
@@ -0,0 +1,81 @@
+"""
+Write det.int8.onnx / rec.int8.onnx next to the float models for
+OCR_ONNX_QUANTIZED=true.
+
+  rec - dynamic int8 quantization (weights int8, activations quantized at
+        run time); no calibration data needed
+  det - static int8 QDQ quantization; its activation ranges are calibrated
+        on real screenshots, since dynamic quantization of a conv net is
+        slow on CPU
+
+Usage (from ocr-service/):
+    python -m app.services.engines.quantize --model-dir /models/ppocr-onnx \
+        --calibration path/to/screenshots --limit 50
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    QuantFormat,
+    QuantType,
+    quantize_dynamic,
+    quantize_static,
+)
+
+from app.services.engines.onnx_engine import det_preprocess
+from app.utils.image import resize_image
+
+
+class DetCalibration(CalibrationDataReader):
+    """
+    Detector inputs built exactly as at serving time.
+    """
+
+    def __init__(self, input_name: str, paths: list[Path]):
+        self._inputs = (
+            {input_name: det_preprocess(np.asarray(resize_image(Image.open(p).convert("RGB")))[:, :, ::-1])[0]}
+            for p in paths
+        )
+
+    def get_next(self):
+        return next(self._inputs, None)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model-dir", required=True)
+    ap.add_argument("--calibration", required=True, help="directory of screenshots")
+    ap.add_argument("--limit", type=int, default=50)
+    args = ap.parse_args()
+
+    import onnxruntime as ort
+
+    root = Path(args.model_dir)
+    paths = sorted(
+        p for p in Path(args.calibration).iterdir()
+        if p.suffix.lower() in (".png", ".jpg", ".jpeg")
+    )[:args.limit]
+    if not paths:
+        raise SystemExit("no calibration screenshots found")
+
+    quantize_dynamic(root / "rec.onnx", root / "rec.int8.onnx", weight_type=QuantType.QInt8)
+    print(f"wrote {root / 'rec.int8.onnx'}")
+
+    det_input = ort.InferenceSession(str(root / "det.onnx"), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    quantize_static(
+        root / "det.onnx",
+        root / "det.int8.onnx",
+        DetCalibration(det_input, paths),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8,
+    )
+    print(f"wrote {root / 'det.int8.onnx'} (calibrated on {len(paths)} screenshots)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# app/services/executor.py
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+from app.config import (
+    OCR_INFERENCE_MODE,
+    OCR_EXECUTOR_MODE,
+    OCR_WORKERS,
+    OCR_QUEUE_SIZE,
+    OCR_JOB_TIMEOUT_SECONDS,
+)
+from app.core.auth import ANONYMOUS, Client
+from app.core.errors import OCRServiceError
+from app.core.metrics import EXECUTOR_PENDING
+from app.services.admission import AdmittedJob
+from app.services.fair_queue import FairQueue
+from app.services.ocr_engine import (
+    warm_ocr_engine,
+    warm_ocr_engine_in_background,
+    warm_and_report,
+    ocr_engine_status,
+)
+
+DISCONNECT_POLL_SECONDS = 0.25
+
+
+class OCRExecutor:
+    """
+    Runs blocking OCR work off the event loop.
+
+    At most `workers` jobs are handed to the pool at once; up to
+    `queue_size` more wait here, where they can still be cancelled
+    cheaply. Anything beyond that is rejected with SERVER_BUSY. Waiting
+    jobs get a worker in weighted round-robin order across clients
+    (see FairQueue), not in arrival order.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 1,
+        queue_size: int = 0,
+        timeout: float | None = None,
+        inference: str = "local",
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown OCR executor mode: {mode}")
+        if inference not in ("local", "server"):
+            raise ValueError(f"Unknown OCR inference mode: {inference}")
+        if inference == "server":
+            # Fail at startup, not on the first request
+            from app.services.inference_server import require_authkey
+
+            require_authkey()
+        self.mode = mode
+        self.inference = inference
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+
+        self._pool: Executor | None = None
+        self._slots: FairQueue | None = None
+        self._pending = 0
+        self._warmup: Future | None = None
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.mode == "process"
+
+    @property
+    def owns_engine(self) -> bool:
+        """
+        True when this process builds the OCR engine used by its jobs
+        (not a pool process, not the shared inference server).
+        """
+        return self.mode == "thread" and self.inference == "local"
+
+    @property
+    def pending(self) -> int:
+        """
+        Jobs queued or running.
+        """
+        return self._pending
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.uses_processes:
+            # spawn, not fork: the parent may already hold Paddle threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_ocr_engine if self.inference == "local" else None,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="ocr",
+            )
+
+    def warm_up(self) -> None:
+        """
+        Load and warm the OCR engine without blocking startup.
+        Thread mode warms the shared engine on a background thread;
+        process mode has the pool start a process, whose initializer
+        builds and warms that process's engine. With the inference server
+        there is nothing to load here.
+        """
+        self.start()
+        if self.inference == "server":
+            return
+        if self.uses_processes:
+            if self._warmup is None:
+                self._warmup = self._pool.submit(warm_and_report)
+        else:
+            warm_ocr_engine_in_background()
+
+    def engine_status(self) -> dict:
+        """
+        OCR engine start-up state for /ready (see ocr_engine_status()).
+        """
+        if self.inference == "server":
+            from app.services.inference_server import remote_status
+
+            return remote_status()
+        if not self.uses_processes:
+            return ocr_engine_status()
+
+        status = {"state": "not_loaded", "load_seconds": None, "warmup_seconds": None, "error": None}
+        if self._warmup is None:
+            return status
+        if not self._warmup.done():
+            return {**status, "state": "loading"}
+        if self._warmup.exception() is not None:
+            return {**status, "state": "failed", "error": repr(self._warmup.exception())}
+        return self._warmup.result()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._slots = None
+        self._warmup = None
+
+    async def run(
+        self,
+        fn,
+        *args,
+        request=None,
+        timeout: float | None = None,
+        client: Client = ANONYMOUS,
+        job: AdmittedJob | None = None,
+    ):
+        """
+        Run fn(*args) in the pool for `client` and return its result.
+        `job` (from AdmissionController.admit) stays in the backlog until
+        the pool finishes it and reports its service time.
+
+        Raises OCRServiceError when the queue is full, the job exceeds
+        its timeout, or `request` (a Starlette Request) disconnects.
+        """
+        if self._pending >= self.workers + self.queue_size:
+            raise OCRServiceError(
+                "SERVER_BUSY",
+                "OCR service is busy, please retry shortly",
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+
+        self.start()
+        if self._slots is None:
+            self._slots = FairQueue(self.workers)
+
+        self._pending += 1
+        EXECUTOR_PENDING.set(self._pending)
+        try:
+            return await self.guard(
+                self._submit(client, fn, *args, job=job),
+                request=request,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+        finally:
+            self._pending -= 1
+            EXECUTOR_PENDING.set(self._pending)
+            if job is not None:
+                job.abandon()   # no-op unless it never reached the pool
+
+    async def _submit(self, client: Client, fn, *args, job: AdmittedJob | None = None):
+        slots = self._slots
+        await slots.acquire(client.id, client.weight)
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        started = time.perf_counter()
+        if job is not None:
+            job.started = True
+
+        # The slot is held until the pool really finishes the job, even if
+        # the caller already gave up on it; otherwise timeouts would let
+        # more jobs in than there are workers. An admitted job stays in
+        # the backlog just as long.
+        def finished(service: float | None):
+            slots.release()
+            if job is not None:
+                job.finish(service)
+
+        def release(future):
+            service = None if future.cancelled() else time.perf_counter() - started
+            try:
+                loop.call_soon_threadsafe(finished, service)
+            except RuntimeError:
+                pass  # loop already closed
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def guard(self, awaitable, request=None, timeout: float | None = None):
+        """
+        Await `awaitable`, cancelling it and raising OCRServiceError if
+        `request` disconnects or `timeout` passes first.
+        """
+        job = asyncio.ensure_future(awaitable)
+        watchers = {job}
+        disconnect = None
+        if request is not None:
+            disconnect = asyncio.ensure_future(self._wait_for_disconnect(request))
+            watchers.add(disconnect)
+
+        try:
+            done, _ = await asyncio.wait(
+                watchers,
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        except asyncio.CancelledError:
+            job.cancel()
+            raise
+        finally:
+            if disconnect is not None:
+                disconnect.cancel()
+
+        if job in done:
+            return job.result()
+
+        job.cancel()
+        if disconnect is not None and disconnect in done:
+            raise OCRServiceError(
+                "CLIENT_DISCONNECTED",
+                "Client closed the connection",
+                status_code=499,
+            )
+        raise OCRServiceError(
+            "OCR_TIMEOUT",
+            "OCR took too long, please retry",
+            status_code=504,
+        )
+
+    async def _wait_for_disconnect(self, request) -> None:
+        while not await request.is_disconnected():
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+
+OCR_EXECUTOR = OCRExecutor(
+    mode=OCR_EXECUTOR_MODE,
+    workers=OCR_WORKERS,
+    queue_size=OCR_QUEUE_SIZE,
+    timeout=OCR_JOB_TIMEOUT_SECONDS,
+    inference=OCR_INFERENCE_MODE,
+)
@@ -0,0 +1,89 @@
+# app/services/fair_queue.py
+import asyncio
+from collections import deque
+
+
+class FairQueue:
+    """
+    Async replacement for a Semaphore(slots) that hands freed slots to
+    waiting clients in weighted round-robin order instead of first come,
+    first served: a client with weight w gets up to w slots per turn, so
+    one client queueing a large batch cannot starve the others.
+
+    Event-loop only (not thread-safe), like asyncio.Semaphore.
+    """
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters: dict[str, deque[asyncio.Future]] = {}
+        self._weights: dict[str, int] = {}
+        # Clients with waiters, in turn order; the head is being served
+        self._turns: deque[str] = deque()
+        self._turns_left = 0
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    async def acquire(self, client: str, weight: int = 1) -> None:
+        if self._free > 0 and not self._turns:
+            self._free -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        if client not in self._waiters:
+            self._waiters[client] = deque()
+            self._turns.append(client)
+            if len(self._turns) == 1:
+                self._turns_left = max(1, weight)
+        self._waiters[client].append(future)
+        self._weights[client] = max(1, weight)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Handed a slot just as we were cancelled: pass it on
+                self.release()
+            else:
+                self._remove(client, future)
+            raise
+
+    def release(self) -> None:
+        future = self._next()
+        if future is None:
+            self._free += 1
+        else:
+            future.set_result(None)
+
+    def _next(self) -> asyncio.Future | None:
+        while self._turns:
+            client = self._turns[0]
+            queue = self._waiters[client]
+            future = queue.popleft()
+
+            self._turns_left -= 1
+            if not queue:
+                self._drop(client)
+            elif self._turns_left <= 0:
+                self._turns.rotate(-1)
+                self._turns_left = self._weights[self._turns[0]]
+
+            if not future.done():
+                return future
+        return None
+
+    def _remove(self, client: str, future: asyncio.Future) -> None:
+        queue = self._waiters.get(client)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            if not queue:
+                self._drop(client)
+
+    def _drop(self, client: str) -> None:
+        was_head = self._turns[0] == client
+        self._turns.remove(client)
+        del self._waiters[client]
+        del self._weights[client]
+        if was_head and self._turns:
+            self._turns_left = self._weights[self._turns[0]]
@@ -0,0 +1,55 @@
+# app/services/fast_reject.py
+import numpy as np
+from PIL import Image
+
+from app.services.ocr_engine import run_ocr
+from app.services.roi import find_panels, padded_crops, stack_crops
+from app.utils.image import _cv2
+from app.utils.keywords import MONTH_NAMES, VISA_KEYWORD_GROUPS
+
+# Pre-OCR screening. Two cheap checks, each only able to say "no":
+#   1. layout: OpenCV text-panel detection; no text panels, or almost no
+#      text area, means a photo/meme/blank page
+#   2. probe: OCR of only the largest few panels, downscaled; none of the
+#      visa keywords or month names means it is not an appointment page
+# Anything that passes goes on to the full OCR pass and the real validator.
+
+MIN_TEXT_AREA_RATIO = 0.01
+
+PROBE_KEYWORDS = tuple(
+    k for group in VISA_KEYWORD_GROUPS.values() for k in group
+) + tuple(MONTH_NAMES)
+
+
+def looks_like_visa_screenshot(
+    image: Image.Image,
+    engine=None,
+    top_k: int = 3,
+    probe_width: int = 512,
+) -> bool:
+    cv2 = _cv2()
+
+    rgb = np.asarray(image.convert("RGB"))
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    h, w = gray.shape
+
+    panels = find_panels(gray)
+    text_area = sum(bw * bh for _, _, bw, bh in panels)
+    if text_area < MIN_TEXT_AREA_RATIO * w * h:
+        return False
+
+    if top_k <= 0:
+        return True
+
+    # Largest panels, back in reading order
+    top = sorted(panels, key=lambda b: b[2] * b[3], reverse=True)[:top_k]
+    top.sort(key=lambda b: (b[1], b[0]))
+
+    probe = Image.fromarray(stack_crops(padded_crops(rgb, top)))
+    if probe.width > probe_width:
+        probe = probe.resize(
+            (probe_width, max(1, int(probe.height * probe_width / probe.width)))
+        )
+
+    text = run_ocr(probe, engine).text.lower()
+    return any(k in text for k in PROBE_KEYWORDS)
@@ -0,0 +1,264 @@
+# app/services/inference_server.py
+import atexit
+import logging
+import os
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Connection, Listener
+
+import numpy as np
+
+from app.config import (
+    OCR_INFERENCE_SOCKET,
+    OCR_INFERENCE_AUTHKEY,
+    OCR_INFERENCE_TIMEOUT_SECONDS,
+)
+from app.core.errors import OCRServiceError
+from app.services.ocr_engine import OCRResult, ocr_array, ocr_engine_status, warm_ocr_engine_in_background
+
+logger = logging.getLogger(__name__)
+
+# OCR_INFERENCE_MODE=server: one process owns the PaddleOCR weights and
+# every API worker on the node sends it images.
+#
+#   worker                                   server
+#   ------                                   ------
+#   copy pixels into its own shared-memory   attach (once per buffer) and
+#   buffer, send (name, shape) over a        run ocr_array() on a view of
+#   Unix socket                              the buffer: no pickling, no copy
+#                               <-------     send back boxes/texts/scores
+#
+# Each worker thread keeps one connection and one buffer, grown when an
+# image does not fit. The server answers every connection on its own
+# thread; with OCR_MICROBATCH_ENABLED those requests are batched across
+# all workers.
+
+
+def require_authkey() -> bytes:
+    """
+    The shared secret for the socket. Server and clients refuse to run
+    without one: the server unpickles whatever an authenticated
+    connection sends, so a well-known default key would let any local
+    user run code in it.
+    """
+    if not OCR_INFERENCE_AUTHKEY:
+        raise RuntimeError(
+            "OCR_INFERENCE_AUTHKEY must be set for the inference server and its "
+            "workers, e.g. to the output of: python -c \"import secrets; print(secrets.token_hex(32))\""
+        )
+    return OCR_INFERENCE_AUTHKEY
+
+
+# -------------------
+# Server
+# -------------------
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        # Python 3.13+: do not let this process's tracker own the segment
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # The client created the segment and unlinks it; without this the
+        # server's resource tracker would unlink it too when we exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _detach(shm: shared_memory.SharedMemory) -> None:
+    try:
+        shm.close()
+    except BufferError:
+        pass    # the engine still holds a view; unmapped once it is gone
+
+
+def _serve_connection(conn: Connection) -> None:
+    attached: shared_memory.SharedMemory | None = None
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                return
+
+            if request[0] == "status":
+                conn.send(ocr_engine_status())
+                continue
+
+            _, name, shape = request
+            try:
+                if attached is None or attached.name != name:
+                    if attached is not None:
+                        _detach(attached)
+                    attached = _attach(name)
+                img = np.ndarray(shape, dtype=np.uint8, buffer=attached.buf)
+                result = ocr_array(img)
+                del img
+                conn.send(("ok", result.boxes, list(result.texts), result.scores))
+            except Exception as e:
+                logger.exception("Inference failed")
+                conn.send(("error", repr(e)))
+    finally:
+        if attached is not None:
+            _detach(attached)
+        conn.close()
+
+
+def serve(address: str = OCR_INFERENCE_SOCKET) -> None:
+    """
+    Run the inference server until killed. The engine loads and warms in
+    the background; requests arriving before that wait for it.
+    """
+    authkey = require_authkey()
+    if os.path.exists(address):
+        os.unlink(address)
+
+    warm_ocr_engine_in_background()
+    with Listener(address, family="AF_UNIX", authkey=authkey) as listener:
+        os.chmod(address, 0o660)
+        logger.info("OCR inference server listening on %s", address)
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception:
+                logger.warning("Rejected inference connection", exc_info=True)
+                continue
+            threading.Thread(
+                target=_serve_connection, args=(conn,), name="ocr-inference", daemon=True
+            ).start()
+
+
+# -------------------
+# Client
+# -------------------
+
+def _unavailable() -> OCRServiceError:
+    return OCRServiceError(
+        "OCR_UNAVAILABLE",
+        "OCR inference server is not reachable",
+        status_code=503,
+        headers={"Retry-After": "5"},
+    )
+
+
+class InferenceClient:
+    """
+    Per-thread connection and shared-memory buffer to the inference server.
+    """
+
+    def __init__(self, address: str = OCR_INFERENCE_SOCKET, timeout: float = OCR_INFERENCE_TIMEOUT_SECONDS):
+        self.address = address
+        self.timeout = timeout
+        self.authkey = require_authkey()
+        self._local = threading.local()
+        self._buffers: set[shared_memory.SharedMemory] = set()
+        self._buffers_lock = threading.Lock()
+
+    def _conn(self) -> Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+            except (OSError, EOFError) as e:
+                raise _unavailable() from e
+            self._local.conn = conn
+        return conn
+
+    def _drop_conn(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _buffer(self, size: int) -> shared_memory.SharedMemory:
+        shm = getattr(self._local, "shm", None)
+        if shm is None or shm.size < size:
+            if shm is not None:
+                self._release(shm)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            with self._buffers_lock:
+                self._buffers.add(shm)
+            self._local.shm = shm
+        return shm
+
+    def _drop_buffer(self) -> None:
+        shm = getattr(self._local, "shm", None)
+        if shm is not None:
+            self._release(shm)
+            self._local.shm = None
+
+    def _release(self, shm: shared_memory.SharedMemory) -> None:
+        with self._buffers_lock:
+            self._buffers.discard(shm)
+        shm.close()
+        shm.unlink()
+
+    def close(self) -> None:
+        """
+        Unlink every buffer this process created.
+        """
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+        for shm in buffers:
+            self._release(shm)
+
+    def _call(self, request):
+        conn = self._conn()
+        try:
+            conn.send(request)
+            if not conn.poll(self.timeout):
+                raise TimeoutError("inference server did not answer")
+            return conn.recv()
+        except (OSError, EOFError, TimeoutError) as e:
+            # Server restarted or stuck: reconnect on the next call, and
+            # never refill a buffer the server may still be reading
+            self._drop_conn()
+            self._drop_buffer()
+            raise _unavailable() from e
+
+    def ocr(self, img: np.ndarray) -> OCRResult:
+        img = np.ascontiguousarray(img, dtype=np.uint8)
+        shm = self._buffer(img.nbytes)
+        np.ndarray(img.shape, dtype=np.uint8, buffer=shm.buf)[...] = img
+
+        reply = self._call(("ocr", shm.name, img.shape))
+        if reply[0] == "error":
+            raise RuntimeError(f"OCR inference failed: {reply[1]}")
+        _, boxes, texts, scores = reply
+        return OCRResult.from_lists(boxes, texts, scores)
+
+    def status(self) -> dict:
+        return self._call(("status",))
+
+
+_client: InferenceClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_inference_client() -> InferenceClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceClient()
+                atexit.register(_client.close)
+    return _client
+
+
+def remote_ocr(img: np.ndarray) -> OCRResult:
+    return get_inference_client().ocr(img)
+
+
+def remote_status() -> dict:
+    """
+    The server's engine status, or state "unreachable".
+    """
+    try:
+        return get_inference_client().status()
+    except OCRServiceError as e:
+        return {"state": "unreachable", "load_seconds": None, "warmup_seconds": None, "error": e.message}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve()
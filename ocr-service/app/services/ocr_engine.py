@@ -1,40 +1,193 @@
+from __future__ import annotations
+
+import gc
+import logging
+import threading
+import time
 import numpy as np
 from PIL import Image
-from paddleocr import PaddleOCR
 
-paddle_ocr = PaddleOCR(
-    lang="en",
-    use_angle_cls=False,
-    
+from app.config import (
+    OCR_ENGINE_BACKEND,
+    OCR_INFERENCE_MODE,
+    OCR_MICROBATCH_ENABLED,
+    OCR_MICROBATCH_MAX_SIZE,
+    OCR_MICROBATCH_MAX_LATENCY_MS,
 )
+from app.services.batcher import MicroBatcher
+from app.services.engines import OCREngine, OCRResult, build_engine
+
+logger = logging.getLogger(__name__)
+
+# -------------------
+# Engine lifecycle
+# -------------------
+# Exactly one OCREngine (OCR_ENGINE_BACKEND: paddle or onnx, see
+# app/services/engines) lives in each worker process. It is built on first
+# use (or by warm_ocr_engine(), run in the background at startup) and
+# shared by every request; shutdown_ocr_engine() drops it so the weights
+# can be freed. The backend package is only imported when the engine is
+# built, so importing the app stays fast.
+
+WARMUP_SHAPE = (200, 200, 3)
+
+_engine: OCREngine | None = None
+_engine_warm = False
+_engine_lock = threading.Lock()
+
+# Engines that are not thread_safe (PaddleOCR) get one inference call at a
+# time. Decode/resize/parse still run in parallel on the thread pool; only
+# the inference call itself is serialised (use OCR_EXECUTOR_MODE=process
+# for parallel inference).
+_infer_lock = threading.Lock()
+
+_batcher: MicroBatcher | None = None
+
+# Reported by /ready: not_loaded -> loading -> warming -> ready (or failed)
+_status = {
+    "state": "not_loaded",
+    "backend": OCR_ENGINE_BACKEND,
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "error": None,
+}
 
 
-def run_ocr(image: Image.Image) -> str:
-    image = image.convert("RGB")
+def get_ocr_engine() -> OCREngine:
+    """
+    Return the process-wide OCR engine, creating it on first use.
+    Also used as a FastAPI dependency.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _status.update(state="loading", error=None)
+                start = time.perf_counter()
+                try:
+                    _engine = build_engine()
+                except Exception as e:
+                    _status.update(state="failed", error=repr(e))
+                    raise
+                _status.update(state="warming", load_seconds=time.perf_counter() - start)
+    return _engine
 
-    img_np = np.array(image, dtype="uint8")
-    result = paddle_ocr.ocr(img_np)
 
-    if not result:
-        return ""
+def warm_ocr_engine() -> None:
+    """
+    Run one dummy inference so the first real request does not pay
+    for lazy model initialisation.
+    """
+    global _engine_warm
+    engine = get_ocr_engine()
+    if _engine_warm:
+        return
 
-    # PP-OCRv5 / PaddleX dict output
-    if isinstance(result[0], dict) and "rec_texts" in result[0]:
-        texts = [
-            t.strip()
-            for t in result[0]["rec_texts"]
-            if isinstance(t, str) and t.strip()
-        ]
-        return "\n".join(texts)
+    start = time.perf_counter()
+    infer_pages(engine, [np.zeros(WARMUP_SHAPE, dtype="uint8")])
+    _engine_warm = True
+    _status.update(state="ready", warmup_seconds=time.perf_counter() - start)
 
-    # Legacy PaddleOCR output
-    texts = []
-    for item in result[0]:
+
+def warm_ocr_engine_in_background() -> threading.Thread:
+    """
+    Build and warm the engine on a daemon thread so startup returns at
+    once; progress is visible through ocr_engine_status().
+    """
+    def run():
         try:
-            text = item[1][0]
-            if text.strip():
-                texts.append(text.strip())
-        except Exception:
-            continue
+            warm_ocr_engine()
+        except Exception as e:
+            _status.update(state="failed", error=repr(e))
+            logger.exception("OCR engine warm-up failed")
+            return
+        logger.info(
+            "OCR engine ready: load %.1fs, warm-up %.1fs",
+            _status["load_seconds"], _status["warmup_seconds"],
+        )
+
+    thread = threading.Thread(target=run, name="ocr-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def warm_and_report() -> dict:
+    """
+    Pool job for process mode: warm this process's engine (a no-op once
+    the pool initializer has done it) and return its status.
+    """
+    warm_ocr_engine()
+    return ocr_engine_status()
+
+
+def ocr_engine_status() -> dict:
+    return dict(_status)
+
+
+def shutdown_ocr_engine() -> None:
+    global _engine, _engine_warm, _batcher
+    with _engine_lock:
+        if _batcher is not None:
+            _batcher.stop()
+            _batcher = None
+        if _engine is not None:
+            _engine.close()
+        _engine = None
+        _engine_warm = False
+        _status.update(state="not_loaded", load_seconds=None, warmup_seconds=None, error=None)
+    gc.collect()
+
+
+# -------------------
+# Inference
+# -------------------
+
+def infer_pages(engine: OCREngine, images: list[np.ndarray]) -> list[OCRResult]:
+    """
+    Run OCR on several images, returning one result per image.
+    """
+    if engine.thread_safe:
+        return engine.infer(images)
+    with _infer_lock:
+        return engine.infer(images)
+
+
+def _get_batcher(engine: OCREngine) -> MicroBatcher:
+    global _batcher
+    if _batcher is None:
+        with _engine_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    lambda images: infer_pages(engine, images),
+                    max_batch_size=OCR_MICROBATCH_MAX_SIZE,
+                    max_latency_ms=OCR_MICROBATCH_MAX_LATENCY_MS,
+                )
+    return _batcher
+
+
+def run_ocr(image: Image.Image, engine: OCREngine | None = None) -> OCRResult:
+    img_np = np.array(image.convert("RGB"), dtype="uint8")
+
+    # One shared inference server for all workers: the pixels go through
+    # shared memory and `engine` is not used
+    if OCR_INFERENCE_MODE == "server":
+        from app.services.inference_server import remote_ocr
+
+        return remote_ocr(img_np)
+
+    return ocr_array(img_np, engine)
+
+
+def ocr_array(img_np: np.ndarray, engine: OCREngine | None = None) -> OCRResult:
+    """
+    OCR an RGB uint8 array in this process.
+    """
+    shared = engine is None or engine is _engine
+    if engine is None:
+        engine = get_ocr_engine()
+
+    # Concurrent callers on the shared engine are grouped into batches
+    if OCR_MICROBATCH_ENABLED and shared:
+        return _get_batcher(engine).submit(img_np)
 
-    return "\n".join(texts)
+    return infer_pages(engine, [img_np])[0]
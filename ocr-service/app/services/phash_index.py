@@ -0,0 +1,306 @@
+# app/services/phash_index.py
+import threading
+import zlib
+from collections import OrderedDict, deque
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+# Near-duplicate lookup for re-captured screenshots.
+#
+# Candidates are found by Hamming distance between 64-bit dHashes, kept in
+# a BK-tree. dHash (and any thumbnail small enough to be cheap) is blind
+# to the one thing that matters here: a single changed digit in a date or
+# slot count. The nearest few candidates are therefore compared with the
+# grey frame at the resolution OCR sees, tile by tile: a tile counts as
+# changed if any pixel in it moved by more than TILE_DIFF_THRESHOLD grey
+# levels. Re-encoding noise stays well below that, a changed glyph well
+# above. What a re-capture may differ by:
+#
+#   clock, status bar  the top and bottom CHROME_BAND of the frame are
+#                      not compared
+#   scroll offset      the body is aligned first (up to MAX_SCROLL whole
+#                      rows of the frame); rows only one of the two frames
+#                      shows must be blank. A scroll that lands between
+#                      frame rows after resizing moves every glyph edge
+#                      and does not match
+#   cursor, caret      up to max_changed_tiles changed tiles are allowed,
+#                      but a cursor and a changed digit look alike here,
+#                      so those regions come back with the match and are
+#                      only accepted if OCR reads the same text in both
+#                      (see pipeline.same_text_in_regions)
+#
+# Frames are kept at 16 grey levels and zlib-compressed (tens of KB per
+# screenshot instead of ~1 MB).
+
+HASH_SIZE = 8
+TILE_SIZE = 16
+QUANT_SHIFT = 4             # 256 -> 16 grey levels
+TILE_DIFF_THRESHOLD = 64    # grey levels
+ASPECT_TOLERANCE = 0.02
+CHROME_BAND = 0.05          # share of the height, top and bottom
+MAX_SCROLL = 64             # rows
+BLANK_LEVELS = 1            # max level spread of a blank row
+
+
+class Fingerprint(NamedTuple):
+    dhash: int
+    frame: bytes            # zlib-compressed, quantized grey frame
+    shape: tuple[int, int]
+    aspect: float
+
+    def pixels(self) -> np.ndarray:
+        return np.frombuffer(zlib.decompress(self.frame), dtype=np.uint8).reshape(self.shape)
+
+
+class NearMatch(NamedTuple):
+    key: str                # cache key of the matching image
+    cached: Fingerprint
+    # Boxes (x0, y0, x1, y1) of the new frame whose content changed; the
+    # cached frame shows the same spot `shift` rows higher. Empty when
+    # the frames agree everywhere that is compared.
+    regions: list[tuple[int, int, int, int]]
+    shift: int
+
+
+def dhash(gray: Image.Image, size: int = HASH_SIZE) -> int:
+    small = np.asarray(
+        gray.resize((size + 1, size), Image.Resampling.BOX),
+        dtype=np.int16,
+    )
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def fingerprint(image: Image.Image) -> Fingerprint:
+    gray = image.convert("L")
+    levels = np.asarray(gray, dtype=np.uint8) >> QUANT_SHIFT
+    return Fingerprint(
+        dhash(gray),
+        zlib.compress(levels.tobytes(), 1),
+        levels.shape,
+        image.width / image.height,
+    )
+
+
+def _body(height: int) -> tuple[int, int]:
+    band = int(height * CHROME_BAND)
+    return band, height - band
+
+
+def scroll_offset(a: np.ndarray, b: np.ndarray, max_shift: int = MAX_SCROLL) -> int:
+    """
+    Rows the body of `b` is shifted down against `a`, from the rows'
+    mean levels (0 wins ties).
+    """
+    top, bottom = _body(a.shape[0])
+    pa = a[top:bottom].mean(axis=1)
+    pb = b[top:bottom].mean(axis=1)
+    n = len(pa)
+    best, best_err = 0, None
+    for shift in sorted(range(-max_shift, max_shift + 1), key=abs):
+        if abs(shift) >= n // 2:
+            continue
+        if shift >= 0:
+            err = np.abs(pa[:n - shift] - pb[shift:]).mean()
+        else:
+            err = np.abs(pa[-shift:] - pb[:n + shift]).mean()
+        if best_err is None or err < best_err:
+            best, best_err = shift, err
+    return best
+
+
+def _blank(rows: np.ndarray) -> bool:
+    return rows.size == 0 or bool(np.all(rows.max(axis=1) - rows.min(axis=1) <= BLANK_LEVELS))
+
+
+def changed_tile_grid(a: np.ndarray, b: np.ndarray, tile: int = TILE_SIZE) -> np.ndarray:
+    """
+    Boolean grid of tile x tile blocks in which any pixel differs by more
+    than TILE_DIFF_THRESHOLD. `a` and `b` are quantized frames of one shape.
+    """
+    changed = np.abs(a.astype(np.int16) - b.astype(np.int16)) > (TILE_DIFF_THRESHOLD >> QUANT_SHIFT)
+    h, w = changed.shape
+    changed = np.pad(changed, ((0, -h % tile), (0, -w % tile)))
+    blocks = changed.reshape(changed.shape[0] // tile, tile, changed.shape[1] // tile, tile)
+    return blocks.any(axis=(1, 3))
+
+
+def _tile_regions(grid: np.ndarray) -> list[tuple[int, int, int, int]]:
+    """
+    Bounding boxes (in tiles, end exclusive) of 8-connected changed tiles.
+    """
+    seen = np.zeros_like(grid)
+    regions = []
+    for start in zip(*np.nonzero(grid)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        queue = deque([start])
+        r0 = r1 = start[0]
+        c0 = c1 = start[1]
+        while queue:
+            r, c = queue.popleft()
+            r0, r1, c0, c1 = min(r0, r), max(r1, r), min(c0, c), max(c1, c)
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr < grid.shape[0] and 0 <= nc < grid.shape[1] and grid[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        queue.append((nr, nc))
+        regions.append((c0, r0, c1 + 1, r1 + 1))
+    return regions
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Metric tree over Hamming distance. Each node is
+    [hash, keys, {distance: child}].
+    """
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, h: int, key) -> None:
+        if self.root is None:
+            self.root = [h, [key], {}]
+            return
+
+        node = self.root
+        while True:
+            d = hamming(h, node[0])
+            if d == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [h, [key], {}]
+                return
+            node = child
+
+    def search(self, h: int, max_distance: int) -> list[tuple[int, object]]:
+        if self.root is None:
+            return []
+
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            d = hamming(h, node[0])
+            if d <= max_distance:
+                found.extend((d, key) for key in node[1])
+            # Triangle inequality: only children in [d - max, d + max]
+            for dist, child in node[2].items():
+                if d - max_distance <= dist <= d + max_distance:
+                    stack.append(child)
+
+        found.sort(key=lambda item: item[0])
+        return found
+
+
+class NearDuplicateIndex:
+    """
+    Maps fingerprints of already-processed images to their cache keys.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = 4,
+        max_changed_tiles: int = 8,
+        max_candidates: int = 4,
+        max_entries: int = 2000,
+    ):
+        self.max_distance = max_distance
+        self.max_changed_tiles = max_changed_tiles
+        self.max_candidates = max_candidates
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict = OrderedDict()   # cache key -> Fingerprint
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, fp: Fingerprint, cache_key: str) -> None:
+        with self._lock:
+            if cache_key in self._entries:
+                return
+            self._entries[cache_key] = fp
+            self._tree.add(fp.dhash, cache_key)
+
+            # BK-trees cannot delete; rebuild from the newest half instead
+            if len(self._entries) > self.max_entries:
+                keep = list(self._entries.items())[len(self._entries) // 2:]
+                self._entries = OrderedDict(keep)
+                self._tree = BKTree()
+                for key, entry in keep:
+                    self._tree.add(entry.dhash, key)
+
+    def lookup(self, fp: Fingerprint) -> NearMatch | None:
+        """
+        The closest verified match among the nearest `max_candidates`
+        dHash candidates, or None. A match with regions still needs its
+        text confirmed. CPU-bound (a few ms per candidate): keep it off
+        the event loop.
+        """
+        with self._lock:
+            candidates = [
+                (key, self._entries[key])
+                for _, key in self._tree.search(fp.dhash, self.max_distance)
+                if key in self._entries
+            ][:self.max_candidates]
+
+        pixels = None
+        best = None
+        for key, entry in candidates:
+            if abs(fp.aspect - entry.aspect) > ASPECT_TOLERANCE * entry.aspect or fp.shape != entry.shape:
+                continue
+            if pixels is None:
+                pixels = fp.pixels()
+            match = self.compare(pixels, entry.pixels(), key, entry)
+            if match is not None and (best is None or len(match.regions) < len(best.regions)):
+                best = match
+                if not match.regions:
+                    break
+        return best
+
+    def compare(self, new: np.ndarray, old: np.ndarray, key: str, entry: Fingerprint) -> NearMatch | None:
+        """
+        Safety check: perceptually close is not enough, the frames must
+        agree glyph for glyph outside the chrome bands, up to a few
+        changed tiles that OCR has to confirm.
+        """
+        top, bottom = _body(new.shape[0])
+        shift = scroll_offset(old, new)
+
+        # Rows only one frame shows (scrolled in or out) must be blank
+        if shift >= 0:
+            if not (_blank(new[top:top + shift]) and _blank(old[bottom - shift:bottom])):
+                return None
+            new_rows, old_rows = (top + shift, bottom), (top, bottom - shift)
+        else:
+            if not (_blank(new[bottom + shift:bottom]) and _blank(old[top:top - shift])):
+                return None
+            new_rows, old_rows = (top, bottom + shift), (top - shift, bottom)
+
+        grid = changed_tile_grid(new[slice(*new_rows)], old[slice(*old_rows)])
+        if np.count_nonzero(grid) > self.max_changed_tiles:
+            return None
+
+        height, width = new.shape
+        regions = []
+        for c0, r0, c1, r1 in _tile_regions(grid):
+            # One tile of context around the change, in new-frame pixels
+            regions.append((
+                max(0, (c0 - 1) * TILE_SIZE),
+                max(new_rows[0], new_rows[0] + (r0 - 1) * TILE_SIZE),
+                min(width, (c1 + 1) * TILE_SIZE),
+                min(new_rows[1], new_rows[0] + (r1 + 1) * TILE_SIZE),
+            ))
+        return NearMatch(key, entry, regions, shift)
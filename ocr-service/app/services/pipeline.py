@@ -0,0 +1,188 @@
+# app/services/pipeline.py
+import io
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+from app.config import (
+    MAX_IMAGE_PIXELS,
+    FAST_REJECT_ENABLED,
+    FAST_REJECT_TOP_K,
+    FAST_REJECT_PROBE_WIDTH,
+    PHASH_ENABLED,
+)
+from app.core.errors import OCRServiceError
+from app.core.metrics import CASCADE_TIERS, PARSER_CONFIDENCE, timed
+from app.services.cascade import CASCADE, FULL_TIER, TIERS, Cascade
+from app.services.fast_reject import looks_like_visa_screenshot
+from app.services.ocr_engine import OCRResult, run_ocr
+from app.services.parser import clean_lines
+from app.services.preprocess import preprocess
+from app.services.phash_index import QUANT_SHIFT, Fingerprint, NearMatch, fingerprint
+from app.services.visa_parser import VisaParser
+from app.utils.helper import build_form_response
+from app.utils.image import MAX_WIDTH, resize_image, image_hash
+from app.utils.line_index import LineIndex
+from app.utils.table_layout import TableLayout
+from app.utils.validators import validate_visa_screenshot
+
+# Every function here is synchronous and free of request state so it can
+# run on a worker thread or in a pool process (see services/executor.py).
+
+parser = VisaParser()
+
+INVALID_SCREENSHOT = {
+    "success": False,
+    "error_code": "INVALID_SCREENSHOT",
+    "message": "Please upload a valid visa appointment screenshot",
+}
+
+
+def decode_image(image_bytes: bytes, target_width: int | None = MAX_WIDTH) -> Image.Image:
+    """
+    Decode an upload to RGB. Only the header is read before the pixel
+    limit is checked. With `target_width`, JPEGs are decoded straight to
+    1/2, 1/4 or 1/8 scale (never below the target); resize_image() does
+    the rest.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+    except UnidentifiedImageError:
+        raise OCRServiceError(
+            "INVALID_IMAGE", "Uploaded file is not a readable image"
+        )
+    except Image.DecompressionBombError:
+        raise _image_too_large()
+    except Exception as e:
+        raise OCRServiceError("IMAGE_PROCESSING_ERROR", str(e))
+
+    if image.width * image.height > MAX_IMAGE_PIXELS:
+        raise _image_too_large()
+
+    try:
+        if target_width and image.width > target_width:
+            target_height = max(1, round(image.height * target_width / image.width))
+            image.draft("RGB", (target_width, target_height))
+        return image.convert("RGB")
+    except Exception as e:
+        raise OCRServiceError("IMAGE_PROCESSING_ERROR", str(e))
+
+
+def _image_too_large() -> OCRServiceError:
+    return OCRServiceError(
+        "IMAGE_TOO_LARGE",
+        f"Image has more than {MAX_IMAGE_PIXELS:,} pixels",
+    )
+
+
+def prepare_image(image_bytes: bytes) -> tuple[Image.Image, str, Fingerprint | None]:
+    """
+    Decode, resize and hash an upload. The perceptual fingerprint is
+    only computed when the near-duplicate cache is enabled.
+    """
+    with timed("decode"):
+        image = decode_image(image_bytes)
+    with timed("resize"):
+        image = resize_image(image)
+
+    fp = None
+    if PHASH_ENABLED:
+        with timed("fingerprint"):
+            fp = fingerprint(image)
+
+    with timed("hash"):
+        img_hash = image_hash(image)
+    return image, img_hash, fp
+
+
+def same_text_in_regions(image: Image.Image, match: NearMatch, engine=None) -> bool:
+    """
+    Confirm a near-duplicate match: OCR every changed region in the new
+    image and in the cached frame and compare the text. A cursor over
+    blank space reads the same; a changed digit does not.
+    """
+    new = np.asarray(image.convert("L"), dtype=np.uint8) >> QUANT_SHIFT
+    old = match.cached.pixels()
+    for x0, y0, x1, y1 in match.regions:
+        texts = [
+            run_ocr(Image.fromarray(frame[top:bottom, x0:x1] << QUANT_SHIFT), engine).text
+            for frame, top, bottom in ((new, y0, y1), (old, y0 - match.shift, y1 - match.shift))
+        ]
+        if "".join(texts[0].split()).lower() != "".join(texts[1].split()).lower():
+            return False
+    return True
+
+
+def analyze_visa_screenshot(image: Image.Image, engine=None) -> dict:
+    """
+    OCR + validate + parse. Does not touch the cache.
+    Cheap cascade tiers (OCR_CASCADE_TIERS) are tried before the full
+    frame, see run_cascade().
+    """
+    # Obvious non-visa uploads never reach the full OCR pass; the caller
+    # caches the rejection like any other INVALID_SCREENSHOT
+    if FAST_REJECT_ENABLED:
+        with timed("fast_reject"):
+            plausible = looks_like_visa_screenshot(
+                image, engine, top_k=FAST_REJECT_TOP_K, probe_width=FAST_REJECT_PROBE_WIDTH
+            )
+        if not plausible:
+            return dict(INVALID_SCREENSHOT)
+
+    response, _ = run_cascade(image, engine)
+    # Once per upload, for the tier that answered
+    if response["success"]:
+        PARSER_CONFIDENCE.observe(response["form_data"]["meta"]["confidence"])
+    return response
+
+
+def run_cascade(image: Image.Image, engine=None, cascade: Cascade = CASCADE) -> tuple[dict, str]:
+    """
+    Try each cheap tier in order and return the first response the
+    cascade accepts, else the full frame's. Also returns the tier that
+    answered.
+    """
+    for tier in cascade.tiers:
+        with timed(f"cascade_{tier}"):
+            frame = TIERS[tier](image)
+            response = analyze_frame(frame, engine) if frame is not None else None
+
+        if response is None:
+            CASCADE_TIERS.labels(tier, "skipped").inc()
+        elif cascade.accepts(response):
+            CASCADE_TIERS.labels(tier, "accepted").inc()
+            return response, tier
+        else:
+            CASCADE_TIERS.labels(tier, "escalated").inc()
+
+    with timed(f"cascade_{FULL_TIER}"):
+        response = analyze_frame(image, engine)
+    CASCADE_TIERS.labels(FULL_TIER, "accepted").inc()
+    return response, FULL_TIER
+
+
+def analyze_frame(image: Image.Image, engine=None) -> dict:
+    with timed("preprocess"):
+        image = preprocess(image)
+    with timed("ocr"):
+        result = run_ocr(image, engine)
+    with timed("parse"):
+        return build_ocr_response(result)
+
+
+def build_ocr_response(result: OCRResult) -> dict:
+    """
+    Validate and parse one OCR result into the API response.
+    """
+    lines = clean_lines(result.text)
+    index = LineIndex(lines, layout=TableLayout.from_result(result))
+
+    # Reject non-visa screenshots
+    if not validate_visa_screenshot(lines, index):
+        return dict(INVALID_SCREENSHOT)
+
+    data = parser.parse(lines, index)
+    return {
+        "success": True,
+        "form_data": build_form_response(data)
+    }
@@ -1,15 +1,150 @@
-import cv2
 import numpy as np
 from PIL import Image
 
-def preprocess(image: Image.Image) -> Image.Image:
-    img = np.array(image)
-    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+from app.config import PREPROCESS_STAGES, PREPROCESS_TEXT_HEIGHT
+from app.utils.image import _cv2
 
-    gray = cv2.resize(
-        gray, None,
-        fx=1.2, fy=1.2,
-        interpolation=cv2.INTER_CUBIC
+# -------------------
+# Stages
+# -------------------
+# Each stage takes a uint8 array (H x W x 3 RGB, or H x W gray) and returns
+# the result. Stages that keep the shape write into the input array
+# instead of allocating a new one.
+
+MAX_DESKEW_ANGLE = 10.0
+MIN_DESKEW_ANGLE = 0.3
+
+
+def to_grayscale(img: np.ndarray) -> np.ndarray:
+    cv2 = _cv2()
+
+    if img.ndim == 2:
+        return img
+    return cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+
+
+def _ink_mask(img: np.ndarray) -> np.ndarray:
+    cv2 = _cv2()
+
+    # Dark-on-light text -> 255 where there is ink
+    _, mask = cv2.threshold(
+        to_grayscale(img), 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU
+    )
+    return mask
+
+
+def estimate_text_height(img: np.ndarray) -> float | None:
+    """
+    Median height of text lines, from runs of inked rows.
+    """
+    rows = np.count_nonzero(_ink_mask(img), axis=1) > 0
+    if not rows.any():
+        return None
+
+    # Start/end indices of consecutive inked rows
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.view(np.int8), [0]))))
+    heights = edges[1::2] - edges[::2]
+    heights = heights[heights >= 4]     # rules and specks are not text
+    return float(np.median(heights)) if heights.size else None
+
+
+def scale_to_text_height(img: np.ndarray, target: int = PREPROCESS_TEXT_HEIGHT) -> np.ndarray:
+    cv2 = _cv2()
+
+    height = estimate_text_height(img)
+    if not height:
+        return img
+
+    scale = min(2.0, max(0.5, target / height))
+    if abs(scale - 1.0) < 0.15:
+        return img
+
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def binarize(img: np.ndarray) -> np.ndarray:
+    cv2 = _cv2()
+
+    gray = to_grayscale(img)
+    cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=gray)
+    return gray
+
+
+def deskew(img: np.ndarray) -> np.ndarray:
+    cv2 = _cv2()
+
+    coords = cv2.findNonZero(_ink_mask(img))
+    if coords is None:
+        return img
+
+    angle = cv2.minAreaRect(coords)[-1]
+    # OpenCV >= 4.5 reports (0, 90]; map to (-45, 45]
+    if angle > 45:
+        angle -= 90
+    if not MIN_DESKEW_ANGLE <= abs(angle) <= MAX_DESKEW_ANGLE:
+        return img
+
+    h, w = img.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    border = 255 if img.ndim == 2 else (255, 255, 255)
+    return cv2.warpAffine(
+        img, matrix, (w, h),
+        flags=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=border,
     )
 
-    return Image.fromarray(gray).convert("RGB")
+
+def denoise(img: np.ndarray) -> np.ndarray:
+    cv2 = _cv2()
+
+    cv2.medianBlur(img, 3, dst=img)
+    return img
+
+
+STAGES = {
+    "grayscale": to_grayscale,
+    "scale": scale_to_text_height,
+    "binarize": binarize,
+    "deskew": deskew,
+    "denoise": denoise,
+}
+
+
+# -------------------
+# Pipeline
+# -------------------
+
+class PreprocessPipeline:
+    def __init__(self, stages: list[str]):
+        unknown = [s for s in stages if s not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown preprocess stages: {unknown}")
+        self.stages = list(stages)
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "PreprocessPipeline":
+        """
+        "grayscale,scale,denoise" -> pipeline running those stages in order
+        """
+        return cls([s.strip() for s in spec.split(",") if s.strip()])
+
+    def __bool__(self) -> bool:
+        return bool(self.stages)
+
+    def __call__(self, img: np.ndarray) -> np.ndarray:
+        # Own the buffer so in-place stages never touch the caller's array
+        img = np.array(img, dtype=np.uint8, copy=True)
+        for name in self.stages:
+            img = STAGES[name](img)
+        return img
+
+
+PIPELINE = PreprocessPipeline.from_spec(PREPROCESS_STAGES)
+
+
+def preprocess(image: Image.Image, pipeline: PreprocessPipeline = PIPELINE) -> Image.Image:
+    if not pipeline:
+        return image
+    return Image.fromarray(pipeline(np.asarray(image))).convert("RGB")
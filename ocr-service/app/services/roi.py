@@ -0,0 +1,107 @@
+# app/services/roi.py
+import numpy as np
+from PIL import Image
+
+from app.utils.image import _cv2
+
+# Cheap layout analysis: find the text panels of a portal screenshot so
+# only those are sent to OCR. Characters are merged into lines and lines
+# into blocks with morphological closing; thin full-width bars at the
+# very top (browser chrome, site navigation) are dropped.
+
+MIN_BLOCK_AREA_RATIO = 0.002     # ignore specks
+HEADER_BAND_RATIO = 0.12         # top share of the page treated as chrome
+NAV_BAR_MAX_HEIGHT_RATIO = 0.06
+NAV_BAR_MIN_WIDTH_RATIO = 0.7
+PANEL_PADDING = 8
+PANEL_GAP = 12
+
+
+def find_panels(gray: np.ndarray) -> list[tuple[int, int, int, int]]:
+    """
+    Return (x, y, w, h) boxes of text panels, top-to-bottom.
+    """
+    cv2 = _cv2()
+
+    h, w = gray.shape[:2]
+
+    # Strong local gradients = text strokes, regardless of theme colours
+    grad = cv2.morphologyEx(
+        gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+    )
+    _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    # Join letters into words/lines, then stacked lines into blocks
+    bw = cv2.morphologyEx(
+        bw, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (max(15, w // 40), 3))
+    )
+    bw = cv2.morphologyEx(
+        bw, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (5, max(9, h // 60)))
+    )
+
+    contours, _ = cv2.findContours(bw, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    panels = []
+    for contour in contours:
+        x, y, bw_, bh = cv2.boundingRect(contour)
+        if bw_ * bh < MIN_BLOCK_AREA_RATIO * w * h:
+            continue
+        if (
+            y < HEADER_BAND_RATIO * h
+            and bh < NAV_BAR_MAX_HEIGHT_RATIO * h
+            and bw_ > NAV_BAR_MIN_WIDTH_RATIO * w
+        ):
+            continue
+        panels.append((x, y, bw_, bh))
+
+    panels.sort(key=lambda b: (b[1], b[0]))
+    return panels
+
+
+def crop_to_panels(image: Image.Image, max_coverage: float = 0.8) -> Image.Image | None:
+    """
+    Stack the detected panels (padded, in reading order) into one image.
+    Returns None when there is nothing to gain: no panels, or panels that
+    cover more than `max_coverage` of the frame anyway.
+    """
+    cv2 = _cv2()
+
+    rgb = np.asarray(image.convert("RGB"))
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    h, w = gray.shape
+
+    panels = find_panels(gray)
+    if not panels:
+        return None
+
+    crops = padded_crops(rgb, panels)
+    area = sum(c.shape[0] * c.shape[1] for c in crops)
+    if area > max_coverage * w * h:
+        return None
+
+    return Image.fromarray(stack_crops(crops))
+
+
+def padded_crops(rgb: np.ndarray, panels: list[tuple[int, int, int, int]]) -> list[np.ndarray]:
+    h, w = rgb.shape[:2]
+    crops = []
+    for x, y, bw, bh in panels:
+        x0, y0 = max(0, x - PANEL_PADDING), max(0, y - PANEL_PADDING)
+        x1, y1 = min(w, x + bw + PANEL_PADDING), min(h, y + bh + PANEL_PADDING)
+        crops.append(rgb[y0:y1, x0:x1])
+    return crops
+
+
+def stack_crops(crops: list[np.ndarray]) -> np.ndarray:
+    """
+    Crops one under another on a white canvas, left aligned.
+    """
+    width = max(c.shape[1] for c in crops)
+    height = sum(c.shape[0] for c in crops) + PANEL_GAP * (len(crops) - 1)
+    canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    top = 0
+    for crop in crops:
+        canvas[top:top + crop.shape[0], :crop.shape[1]] = crop
+        top += crop.shape[0] + PANEL_GAP
+    return canvas
@@ -0,0 +1,367 @@
+# app/services/uploads.py
+import asyncio
+import logging
+import mimetypes
+import os
+import random
+import time
+from collections import OrderedDict
+
+from app.config import (
+    SCREENSHOT_SPOOL_DIR,
+    SCREENSHOT_SPOOL_MAX_MB,
+    SCREENSHOT_UPLOAD_QUEUE_SIZE,
+    SCREENSHOT_UPLOAD_BATCH_SIZE,
+    SCREENSHOT_UPLOAD_MAX_RETRIES,
+)
+from app.core.metrics import SCREENSHOT_UPLOADS, timed
+from app.integrations.storage import ObjectStore, build_object_store
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "screenshots/"
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+# Spool rescans after batches whose uploads all ran out of retries
+RESCAN_BASE_SECONDS = 30.0
+RESCAN_MAX_SECONDS = 15 * 60.0
+
+
+def screenshot_key(digest: str, content_type: str | None) -> str:
+    """
+    Content-addressed object key: the same bytes always map to the same
+    key, with the extension of the real type.
+    """
+    mime = (content_type or "").split(";")[0].strip()
+    ext = mimetypes.guess_extension(mime) or ".bin"
+    return f"{KEY_PREFIX}{digest}{ext}"
+
+
+class ScreenshotUploader:
+    """
+    Archives uploaded screenshots without holding up the request.
+
+    enqueue() returns at once; a background task writes the bytes to a
+    local spool directory (at most `spool_max_bytes`, counted roughly)
+    and queues the key. Archiving is best effort: a full spool or a
+    failed write drops the screenshot with a warning, never the request.
+    A worker task takes spooled keys from a bounded queue in batches,
+    skips objects the store already has, uploads the rest concurrently
+    with exponential backoff, and deletes the spool file on success.
+    Files left in the spool (worker crash, restart, queue overflow,
+    retries exhausted) are picked up again by the next rescan, which runs
+    when the worker starts and whenever the queue drains after an
+    overflow. Spool directory I/O runs in worker threads. After a
+    failed batch the rescan waits, doubling from RESCAN_BASE_SECONDS for
+    every failed batch in a row, so a store that is down (or was never
+    configured) is not hammered.
+    """
+
+    def __init__(
+        self,
+        store: ObjectStore | None = None,
+        spool_dir: str = SCREENSHOT_SPOOL_DIR,
+        spool_max_bytes: int = 1024 * 1024 * 1024,
+        queue_size: int = 1000,
+        batch_size: int = 8,
+        max_retries: int = 5,
+        recent_keys: int = 10_000,
+    ):
+        self._store = store
+        self.spool_dir = spool_dir
+        self.spool_max_bytes = spool_max_bytes
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(0, max_retries)
+
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._queued: set[str] = set()
+        self._spooling: dict[str, asyncio.Task] = {}
+        self._spool_bytes = 0
+        self._spool_full = False
+        self._rescan_needed = False
+        self._rescan_at = 0.0       # time.monotonic()
+        self._failed_batches = 0    # in a row
+
+        # Keys known to be in the store already (LRU)
+        self._stored: OrderedDict[str, None] = OrderedDict()
+        self._recent_keys = recent_keys
+
+    @property
+    def store(self) -> ObjectStore:
+        # Built on first use so importing this module needs no credentials
+        if self._store is None:
+            self._store = build_object_store()
+        return self._store
+
+    @property
+    def pending(self) -> int:
+        return len(self._queued)
+
+    # -------------------
+    # Producer side
+    # -------------------
+
+    def enqueue(self, data: bytes, content_type: str | None, digest: str) -> str:
+        """
+        Archive one screenshot in the background and return its object
+        key. Duplicates of a stored, queued or spooling screenshot are
+        skipped. Event-loop only.
+        """
+        key = screenshot_key(digest, content_type)
+        if key in self._stored or key in self._queued or key in self._spooling:
+            SCREENSHOT_UPLOADS.labels("duplicate").inc()
+            return key
+
+        if self._spool_bytes + len(data) > self.spool_max_bytes:
+            SCREENSHOT_UPLOADS.labels("dropped").inc()
+            if not self._spool_full:
+                self._spool_full = True
+                logger.warning(
+                    "Screenshot spool is full (%d MB), not archiving new screenshots",
+                    self._spool_bytes // (1024 * 1024),
+                )
+            return key
+
+        self._spool_bytes += len(data)
+        task = asyncio.get_running_loop().create_task(self._spool_and_offer(key, data))
+        self._spooling[key] = task
+        task.add_done_callback(lambda _: self._spooling.pop(key, None))
+        return key
+
+    async def _spool_and_offer(self, key: str, data: bytes) -> None:
+        try:
+            written = await asyncio.to_thread(self._spool, key, data)
+        except OSError:
+            self._spool_bytes -= len(data)
+            SCREENSHOT_UPLOADS.labels("dropped").inc()
+            logger.warning("Could not spool screenshot %s", key, exc_info=True)
+            return
+        if not written:
+            self._spool_bytes -= len(data)
+        self._offer(key)
+
+    def _spool_path(self, key: str) -> str:
+        return os.path.join(self.spool_dir, key[len(KEY_PREFIX):])
+
+    def _spool(self, key: str, data: bytes) -> bool:
+        """
+        Write one screenshot to the spool; False if it was there already.
+        """
+        path = self._spool_path(key)
+        if os.path.exists(path):
+            return False
+        os.makedirs(self.spool_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.part"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return True
+
+    @staticmethod
+    def _unlink(path: str) -> int:
+        """
+        Delete one spool file; the bytes freed (0 if it was gone).
+        """
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except FileNotFoundError:
+            return 0
+        return size
+
+    async def _unspool(self, path: str) -> None:
+        size = await asyncio.to_thread(self._unlink, path)
+        self._spool_bytes = max(0, self._spool_bytes - size)
+        if self._spool_full and self._spool_bytes < self.spool_max_bytes:
+            self._spool_full = False
+
+    def _offer(self, key: str) -> None:
+        if key in self._queued:
+            return
+        if self._queue is None:
+            # Not started (e.g. scripts): stays spooled until start()
+            return
+        try:
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            # Safe on disk; picked up by the rescan once the queue drains
+            self._rescan_needed = True
+            return
+        self._queued.add(key)
+
+    def _scan_spool(self) -> tuple[int, list[str]] | None:
+        """
+        Bytes in the spool and the names of complete files, sorted; None
+        if the spool cannot be read.
+        """
+        try:
+            entries = sorted(os.scandir(self.spool_dir), key=lambda e: e.name)
+        except FileNotFoundError:
+            return 0, []
+        except OSError:
+            logger.warning("Could not scan the screenshot spool", exc_info=True)
+            return None
+
+        size = 0
+        for entry in entries:
+            try:
+                size += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size, [e.name for e in entries if not e.name.endswith(".part")]
+
+    async def _rescan(self) -> None:
+        self._rescan_needed = False
+        scanned = await asyncio.to_thread(self._scan_spool)
+        if scanned is None:
+            return
+
+        # Also resyncs the spool size with what is really on disk (other
+        # worker processes share the directory)
+        self._spool_bytes, names = scanned
+        self._spool_full = self._spool_bytes >= self.spool_max_bytes
+
+        for name in names:
+            self._offer(KEY_PREFIX + name)
+            if self._rescan_needed:
+                break
+
+    def _rescan_delay(self) -> float | None:
+        """
+        Seconds until the pending rescan is due, None if there is none.
+        """
+        if not self._rescan_needed:
+            return None
+        return max(0.0, self._rescan_at - time.monotonic())
+
+    # -------------------
+    # Worker side
+    # -------------------
+
+    def start(self) -> None:
+        """
+        Start the upload worker on the running event loop.
+        """
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # The worker's first step: pick up what earlier runs left spooled
+        self._rescan_needed = True
+        self._rescan_at = 0.0
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Give queued uploads `timeout` seconds to finish; whatever is left
+        stays in the spool for the next start.
+        """
+        if self._worker is None:
+            return
+        if self._spooling:
+            await asyncio.wait(list(self._spooling.values()), timeout=timeout)
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%d screenshot uploads left in the spool", self.pending)
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+        self._queued.clear()
+
+    async def _run(self) -> None:
+        while True:
+            if self._queue.empty() and self._rescan_delay() == 0:
+                await self._rescan()
+
+            # Wake up for a rescan that falls due while the queue is idle
+            timeout = self._rescan_delay() if self._queue.empty() else None
+            try:
+                batch = [await asyncio.wait_for(self._queue.get(), timeout)]
+            except asyncio.TimeoutError:
+                continue
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                uploaded = await asyncio.gather(*(self._upload(key) for key in batch))
+            finally:
+                for key in batch:
+                    self._queued.discard(key)
+                    self._queue.task_done()
+
+            if any(uploaded):
+                self._failed_batches = 0
+            else:
+                self._failed_batches += 1
+                backoff = RESCAN_BASE_SECONDS * 2 ** (self._failed_batches - 1)
+                self._rescan_at = time.monotonic() + min(RESCAN_MAX_SECONDS, backoff)
+
+    async def _upload(self, key: str) -> bool:
+        """
+        Upload one spooled key; False if it ran out of retries.
+        """
+        path = self._spool_path(key)
+        for attempt in range(self.max_retries + 1):
+            try:
+                stored = await asyncio.to_thread(self._upload_sync, key, path)
+            except FileNotFoundError:
+                # Another worker process uploaded it first
+                return True
+            except Exception:
+                if attempt == self.max_retries:
+                    SCREENSHOT_UPLOADS.labels("failed").inc()
+                    logger.warning("Upload of %s failed, kept in spool", key, exc_info=True)
+                    self._rescan_needed = True
+                    return False
+                SCREENSHOT_UPLOADS.labels("retried").inc()
+                delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                continue
+
+            SCREENSHOT_UPLOADS.labels("stored" if stored else "duplicate").inc()
+            self._remember(key)
+            await self._unspool(path)
+            return True
+
+    def _upload_sync(self, key: str, path: str) -> bool:
+        """
+        Upload one spooled file; False when the store already had it.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if self.store.exists(key):
+            return False
+
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        with timed("storage_upload"):
+            self.store.put(key, data, content_type)
+        return True
+
+    def _remember(self, key: str) -> None:
+        self._stored[key] = None
+        self._stored.move_to_end(key)
+        while len(self._stored) > self._recent_keys:
+            self._stored.popitem(last=False)
+
+
+SCREENSHOT_UPLOADER = ScreenshotUploader(
+    spool_max_bytes=SCREENSHOT_SPOOL_MAX_MB * 1024 * 1024,
+    queue_size=SCREENSHOT_UPLOAD_QUEUE_SIZE,
+    batch_size=SCREENSHOT_UPLOAD_BATCH_SIZE,
+    max_retries=SCREENSHOT_UPLOAD_MAX_RETRIES,
+)
@@ -4,6 +4,7 @@ from datetime import datetime
 from app.extractors.location_extractor import LocationExtractor
 from app.extractors.table_extractor import TableAvailabilityExtractor
 from app.extractors.first_available_extractor import FirstAvailableExtractor
+from app.utils.line_index import LineIndex
 
 
 class VisaParser:
@@ -14,7 +15,12 @@ class VisaParser:
             FirstAvailableExtractor(),
         ]
 
-    def parse(self, lines: list[str]) -> dict:
+    def parse(self, lines: list[str], index: LineIndex | None = None) -> dict:
+        # Lines are classified once here (or by the caller, who may share
+        # the index with the validator); extractors only query the index.
+        if index is None:
+            index = LineIndex(lines)
+
         result = {
             "location": None,
             "available_slots": [],
@@ -30,7 +36,7 @@ class VisaParser:
         # -------------------
         # Location
         # -------------------
-        loc = self.location_extractor.extract(lines)
+        loc = self.location_extractor.extract(index)
         if loc:
             result["location"] = loc["location"]
 
@@ -39,7 +45,7 @@ class VisaParser:
         # -------------------
         best = None
         for extractor in self.availability_extractors:
-            data = extractor.extract(lines)
+            data = extractor.extract(index)
             if data and (best is None or data["confidence"] > best["confidence"]):
                 best = data
 
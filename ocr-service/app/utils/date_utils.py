@@ -1,10 +1,6 @@
 # app/utils/date_utils.py
 import re
-from datetime import datetime
-
-# app/utils/date_utils.py
-import re
-from datetime import datetime
+from functools import lru_cache
 
 MONTHS = {
     "january": "01",
@@ -21,37 +17,62 @@ MONTHS = {
     "december": "12",
 }
 
+# Three compiled patterns, tried in the order that rejects most lines
+# soonest: almost every OCR line has no year, and those return after one
+# search (like the old missing-year check). Numeric tokens tolerate the
+# usual OCR confusions: O/o -> 0, l/I/i -> 1, and a stray letter inside
+# the year ("20a26" -> 2026).
+_NUMERIC = "0-9oli"
+_YEAR_RE = re.compile(
+    rf"\b(?:2[0o][{_NUMERIC}]{{2}}|20[a-z][0-9]{{2}})\b",
+    re.IGNORECASE,
+)
+_MONTH_RE = re.compile("|".join(MONTHS))   # on the lowercased line
+_DAY_RE = re.compile(
+    rf"\b(?:[0-9][{_NUMERIC}]?|[oli][0-9])\b",
+    re.IGNORECASE,
+)
+_CONFUSABLE = str.maketrans("oOlLiI", "001111")
+
+DATE_MEMO_SIZE = 4096
 
-def normalize_date(text: str) -> str | None:
-    if not text:
-        return None
-    t = text.lower()
 
-    # Remove OCR junk punctuation (CRITICAL)
-    t = re.sub(r"[.,]", "", t)
+def _digits(token: str) -> str:
+    return token.translate(_CONFUSABLE)
 
-    # Extract year
-    year_match = re.search(r"\b(20\d{2})\b", t)
-    if not year_match:
+
+@lru_cache(maxsize=DATE_MEMO_SIZE)
+def parse_date_parts(text: str) -> tuple[str, str, str] | None:
+    """
+    (year, month, day) found anywhere in an OCR line, or None. Each part
+    is the first one in the line.
+    Memoised on the raw line: extractors ask about the same lines
+    several times per parse.
+    """
+    year = _YEAR_RE.search(text)
+    if year is None:
+        return None
+    month = _MONTH_RE.search(text.lower())
+    if month is None:
         return None
-    year = year_match.group(1)
-
-    # Extract month
-    month = None
-    for name, num in MONTHS.items():
-        if name in t:
-            month = num
-            break
-    if not month:
+    day = _DAY_RE.search(text)
+    if day is None:
         return None
 
-    # Extract day
-    day_match = re.search(r"\b(\d{1,2})\b", t)
-    if not day_match:
+    token = year.group()
+    if token[2].isalpha() and len(token) == 5:
+        token = token[:2] + token[3:]
+    return _digits(token), MONTHS[month.group()], _digits(day.group()).zfill(2)
+
+
+def normalize_date(text: str) -> str | None:
+    if not text:
         return None
-    day = day_match.group(1).zfill(2)
 
-    return f"{year}-{month}-{day}"
+    parts = parse_date_parts(text)
+    if parts is None:
+        return None
+    return "-".join(parts)
 
 
 def clean_display_date(text: str) -> str:
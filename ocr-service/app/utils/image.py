@@ -1,16 +1,55 @@
 # app/utils/image.py
 import hashlib
+from functools import lru_cache
+
 from PIL import Image
 
 MAX_WIDTH = 1024
 
-def resize_image(image: Image.Image) -> Image.Image:
-    if image.width > MAX_WIDTH:
-        ratio = MAX_WIDTH / image.width
+# Shrink by whole factors with reduce() first while the image is more than
+# this many times the target, then resample; indistinguishable from a
+# plain resize at this gap, and much cheaper for large images.
+REDUCING_GAP = 3.0
+
+# blake2b is noticeably faster than md5 on 64-bit CPUs and ships with
+# hashlib; 16 bytes is plenty for a cache key.
+DIGEST_SIZE = 16
+
+
+@lru_cache(maxsize=None)
+def _cv2():
+    """
+    OpenCV, imported on first use: it adds ~150 ms to app start-up and
+    only optional stages (preprocessing, ROI, fast reject, the ONNX
+    engine) need it.
+    """
+    import cv2
+
+    return cv2
+
+
+def resize_image(image: Image.Image, max_width: int = MAX_WIDTH) -> Image.Image:
+    if image.width > max_width:
+        ratio = max_width / image.width
         image = image.resize(
-            (MAX_WIDTH, int(image.height * ratio))
+            (max_width, int(image.height * ratio)),
+            reducing_gap=REDUCING_GAP,
         )
     return image
 
+
+def upload_hash(data: bytes) -> str:
+    """
+    Hash of the raw upload bytes (no decoding).
+    """
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
 def image_hash(image: Image.Image) -> str:
-    return hashlib.md5(image.tobytes()).hexdigest()
+    """
+    Hash of the pixel buffer, stable across re-encodes of the same image.
+    """
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    h.update(f"{image.mode}:{image.width}x{image.height}".encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
@@ -0,0 +1,27 @@
+# app/utils/keywords.py
+# Keyword lists shared by the line index, the extractors and the validators.
+
+MONTH_NAMES = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december"
+]
+
+WEEKDAY_NAMES = [
+    "monday", "tuesday", "wednesday", "thursday",
+    "friday", "saturday", "sunday"
+]
+
+VISA_KEYWORD_GROUPS = {
+    "context": ["appointment", "schedule", "ofc", "interview"],
+    "calendar": WEEKDAY_NAMES,
+    "availability": ["available", "time", "date"]
+}
+
+TRIGGER_PHRASES = [
+    "first available appointment",
+    "first available date",
+    "earliest available appointment"
+]
+
+# "iocation": common OCR misread of "Location"
+LOCATION_KEYWORDS = ["location", "iocation"]
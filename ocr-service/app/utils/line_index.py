@@ -0,0 +1,127 @@
+# app/utils/line_index.py
+import re
+
+from app.utils.date_utils import normalize_date
+from app.utils.table_layout import TableLayout
+from app.utils.keywords import (
+    LOCATION_KEYWORDS,
+    MONTH_NAMES,
+    TRIGGER_PHRASES,
+    VISA_KEYWORD_GROUPS,
+)
+
+TIME_RE = re.compile(r"^\d{1,2}:\d{2}$")
+COUNT_RE = re.compile(r"^\d+$")
+
+
+def _trie_pattern(words: list[str]) -> str:
+    """
+    Regex for a set of words, factored into a prefix trie, e.g.
+    ["june", "july"] -> "ju(?:ly|ne)". At any position the engine rejects
+    a non-keyword after one character, and finds the longest keyword
+    without backtracking through every alternative.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordAutomaton:
+    """
+    Finds every keyword in a text in one left-to-right scan, including
+    keywords that overlap ("first available appointment" also yields
+    "available" and "appointment"). Each keyword maps to a tag.
+    """
+
+    def __init__(self, tagged: dict[str, str]):
+        self.tags = tagged
+        # Zero-width lookahead so matches may overlap
+        self._re = re.compile("(?=(" + _trie_pattern(list(tagged)) + "))")
+
+    def find(self, text: str) -> list[str]:
+        """
+        Keywords in `text` (already lower-cased), in order of position.
+        """
+        return [m.group(1) for m in self._re.finditer(text)]
+
+
+def _build_automaton() -> KeywordAutomaton:
+    tagged = {}
+    for group, words in VISA_KEYWORD_GROUPS.items():
+        for word in words:
+            tagged[word] = group
+    for word in MONTH_NAMES:
+        tagged[word] = "month"
+    for word in TRIGGER_PHRASES:
+        tagged[word] = "trigger"
+    for word in LOCATION_KEYWORDS:
+        tagged[word] = "location"
+    return KeywordAutomaton(tagged)
+
+
+AUTOMATON = _build_automaton()
+
+
+class LineIndex:
+    """
+    Every line of an OCR result classified once, up front.
+
+    Per line: stripped text, keyword tags (context, calendar,
+    availability, month, trigger, location, time, count, date), the
+    normalised date and the integer count. `by_tag[tag]` lists line
+    numbers in order, so extractors jump straight to candidate lines.
+    `layout` is the row/column structure of the OCR boxes, when known.
+    """
+
+    def __init__(self, lines: list[str], layout: TableLayout | None = None):
+        self.lines = [l.strip() for l in lines]
+        self.layout = layout
+        self.tags: list[set[str]] = []
+        self.dates: list[str | None] = []
+        self.counts: list[int | None] = []
+        self.keywords: set[str] = set()
+        self.by_tag: dict[str, list[int]] = {}
+
+        for i, line in enumerate(self.lines):
+            found = AUTOMATON.find(line.lower())
+            tags = {AUTOMATON.tags[k] for k in found}
+            self.keywords.update(found)
+
+            # A date always contains a month name: skip the tokenizer otherwise
+            date = normalize_date(line) if "month" in tags else None
+            if date:
+                tags.add("date")
+
+            count = None
+            if COUNT_RE.match(line):
+                count = int(line)
+                tags.add("count")
+            elif TIME_RE.match(line):
+                tags.add("time")
+
+            self.tags.append(tags)
+            self.dates.append(date)
+            self.counts.append(count)
+            for tag in tags:
+                self.by_tag.setdefault(tag, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def lines_with(self, tag: str) -> list[int]:
+        return self.by_tag.get(tag, [])
+
+    def has_keyword_from(self, words: list[str]) -> bool:
+        return any(w in self.keywords for w in words)
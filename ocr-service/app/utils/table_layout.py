@@ -0,0 +1,69 @@
+# app/utils/table_layout.py
+import numpy as np
+
+# Rebuilds the table structure of a screenshot from OCR boxes, so slots
+# are read from cells of the same row instead of guessed from the order
+# the OCR engine happened to emit the lines in.
+#
+# Rows: box centres sorted by y, a new row wherever the gap to the next
+# centre exceeds half the median text height. Columns: the same on the
+# left edges, with a gap of 1.5 median text heights.
+
+ROW_GAP_RATIO = 0.5
+COLUMN_GAP_RATIO = 1.5
+
+
+def _cluster_1d(values: np.ndarray, gap: float) -> np.ndarray:
+    """
+    Cluster ids (0..k-1, in increasing value order) for 1-D values.
+    """
+    if values.size == 0:
+        return np.empty(0, dtype=np.int64)
+    order = np.argsort(values, kind="stable")
+    breaks = np.concatenate(([0], np.diff(values[order]) > gap)).astype(np.int64)
+    ids = np.empty_like(breaks)
+    ids[order] = np.cumsum(breaks)
+    return ids
+
+
+class TableLayout:
+    """
+    `rows[r]` lists the indices of the boxes in row r, left to right;
+    `row_of` / `col_of` give each box's row and column.
+    """
+
+    def __init__(self, boxes: np.ndarray, texts: np.ndarray):
+        self.texts = texts
+        n = len(texts)
+        if n == 0:
+            self.row_of = self.col_of = np.empty(0, dtype=np.int64)
+            self.rows: list[np.ndarray] = []
+            self.n_cols = 0
+            return
+
+        ys = boxes[:, :, 1]
+        xs = boxes[:, :, 0]
+        height = float(np.median(ys.max(axis=1) - ys.min(axis=1))) or 1.0
+
+        self.row_of = _cluster_1d(ys.mean(axis=1), ROW_GAP_RATIO * height)
+        self.col_of = _cluster_1d(xs.min(axis=1), COLUMN_GAP_RATIO * height)
+        self.n_cols = int(self.col_of.max()) + 1
+
+        # Group by row, ordered left to right within the row
+        left = xs.min(axis=1)
+        order = np.lexsort((left, self.row_of))
+        bounds = np.flatnonzero(np.diff(self.row_of[order])) + 1
+        self.rows = np.split(order, bounds)
+
+    @classmethod
+    def from_result(cls, result) -> "TableLayout":
+        return cls(result.boxes, result.texts)
+
+    def cell(self, row: int, col: int) -> str | None:
+        """
+        Text of the first box in (row, col), if any.
+        """
+        for i in self.rows[row]:
+            if self.col_of[i] == col:
+                return self.texts[i]
+        return None
@@ -1,5 +1,7 @@
 from fastapi import UploadFile, HTTPException
 from app.config import MAX_FILE_SIZE_MB, ALLOWED_TYPES
+from app.utils.keywords import VISA_KEYWORD_GROUPS
+from app.utils.line_index import LineIndex
 
 
 
@@ -15,32 +17,19 @@ def validate_file(file: UploadFile):
         raise HTTPException(400, "File too large")
 
 
-def validate_visa_screenshot(raw_text: str, lines: list[str]) -> bool:
-    text = raw_text.lower()
+def validate_visa_screenshot(lines: list[str], index: LineIndex | None = None) -> bool:
+    if index is None:
+        index = LineIndex(lines)
 
-    keyword_groups = {
-        "context": ["appointment", "schedule", "ofc", "interview"],
-        "calendar": ["monday", "tuesday", "wednesday", "thursday",
-                     "friday", "saturday", "sunday"],
-        "availability": ["available", "time", "date"]
-    }
-
-    hits = 0
-    for group in keyword_groups.values():
-        if any(k in text for k in group):
-            hits += 1
+    # Each keyword group counts once
+    hits = sum(
+        1 for group in VISA_KEYWORD_GROUPS.values()
+        if index.has_keyword_from(group)
+    )
 
     # Strong date signal
     has_full_date = any(
-        "," in l and any(m in l.lower() for m in [
-            "january", "february", "march", "april", "may", "june",
-            "july", "august", "september", "october", "november", "december"
-        ])
-        for l in lines
+        "," in index.lines[i] for i in index.lines_with("month")
     )
 
     return hits >= 2 and has_full_date
-
-
-
-
@@ -0,0 +1,110 @@
+"""
+A traffic spike against the OCR executor with and without admission
+control.
+
+Requests arrive at --rate per second for --seconds (--burst at a time),
+more than --workers can serve; each client gives up after --client-timeout. Jobs sleep for
+--job-ms instead of running OCR, so this needs no model. Between
+admission and the executor each request awaits --spool-ms, like the
+endpoint's screenshot spool write.
+
+  served   - answered before the client gave up
+  p95 ms   - latency of served requests
+  shed     - rejected up front with 503 OVERLOADED
+  timeouts - clients that gave up waiting
+  wasted   - passes that ran although their client had already given up
+
+Usage (from ocr-service/):
+    python -m benchmarks.admission --rate 60 --workers 2 --job-ms 100 --target 1
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from app.core.errors import OCRServiceError
+from app.services.admission import AdmissionController
+from app.services.executor import OCRExecutor
+
+
+async def spike(admit: bool, args) -> dict:
+    executor = OCRExecutor(mode="thread", workers=args.workers, queue_size=100_000)
+    admission = AdmissionController(args.target, args.workers, enabled=admit)
+    job_s = args.job_ms / 1000
+
+    ran = 0
+    ran_lock = threading.Lock()
+
+    def work() -> None:
+        nonlocal ran
+        time.sleep(job_s)
+        with ran_lock:
+            ran += 1
+
+    # Learn the service time before the spike
+    await executor.run(work, job=admission.admit())
+    ran = 0
+
+    async def request() -> tuple[str, float]:
+        start = time.perf_counter()
+        try:
+            admitted = admission.admit()
+            try:
+                await asyncio.sleep(args.spool_ms / 1000)
+                await executor.run(work, timeout=args.client_timeout, job=admitted)
+            finally:
+                admitted.abandon()
+            outcome = "served"
+        except OCRServiceError as e:
+            outcome = e.error_code
+        return outcome, time.perf_counter() - start
+
+    tasks = []
+    for i in range(int(args.rate * args.seconds)):
+        tasks.append(asyncio.ensure_future(request()))
+        if (i + 1) % args.burst == 0:
+            await asyncio.sleep(args.burst / args.rate)
+    results = await asyncio.gather(*tasks)
+
+    # Let passes the clients abandoned finish, then count them
+    while executor.pending or admission.in_flight:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(args.job_ms / 1000 * 2)
+    executor.shutdown()
+
+    served = [latency for outcome, latency in results if outcome == "served"]
+    return {
+        "requests": len(results),
+        "served": len(served),
+        "p95": float(np.percentile(served, 95)) * 1000 if served else float("nan"),
+        "shed": sum(outcome == "OVERLOADED" for outcome, _ in results),
+        "timeouts": sum(outcome == "OCR_TIMEOUT" for outcome, _ in results),
+        "wasted": ran - len(served),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rate", type=float, default=60, help="requests per second")
+    ap.add_argument("--seconds", type=float, default=3)
+    ap.add_argument("--burst", type=int, default=1, help="requests arriving together")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--job-ms", type=float, default=100)
+    ap.add_argument("--target", type=float, default=1.0, help="latency target, s")
+    ap.add_argument("--client-timeout", type=float, default=2.0)
+    ap.add_argument("--spool-ms", type=float, default=1, help="await between admission and executor")
+    args = ap.parse_args()
+
+    print(f"{'admission':<11}{'requests':>9}{'served':>8}{'p95 ms':>8}{'shed':>6}{'timeouts':>10}{'wasted':>8}")
+    for name, admit in (("off", False), ("on", True)):
+        r = asyncio.run(spike(admit, args))
+        print(
+            f"{name:<11}{r['requests']:>9}{r['served']:>8}{r['p95']:>8.0f}"
+            f"{r['shed']:>6}{r['timeouts']:>10}{r['wasted']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Per-stage timings of the /ocr pipeline plus parse accuracy.
+
+    pip install -r benchmarks/requirements.txt
+    pytest benchmarks/ --benchmark-autosave                 # record a run
+    pytest benchmarks/ --benchmark-compare \
+        --benchmark-compare-fail=mean:15%                   # fail on regressions
+
+Runs offline on CPU: the corpus is rendered locally (benchmarks/synthetic.py)
+and run_ocr needs the PaddleOCR models already in PADDLEOCR_HOME.
+"""
+import os
+
+from app.services.parser import clean_lines
+from app.services.pipeline import build_ocr_response, decode_image, analyze_frame
+from app.services.visa_parser import VisaParser
+from app.utils.helper import build_form_response
+from app.utils.image import resize_image, image_hash
+from app.utils.line_index import LineIndex
+from app.utils.table_layout import TableLayout
+from benchmarks.corpus import matches_truth
+
+# Floor for end-to-end accuracy with the real OCR engine
+MIN_OCR_ACCURACY = float(os.getenv("BENCH_MIN_OCR_ACCURACY", "0.9"))
+
+parser = VisaParser()
+
+
+def _accuracy(responses, truths) -> float:
+    scored = [matches_truth(r, t) for r, t in zip(responses, truths)]
+    scored = [s for s in scored if s is not None]
+    return sum(scored) / max(1, len(scored))
+
+
+# -------------------
+# Image stages
+# -------------------
+
+def bench_decode(benchmark, uploads):
+    benchmark(lambda: [decode_image(b) for b in uploads])
+
+
+def bench_resize_image(benchmark, corpus):
+    images = [image for _, image, _ in corpus]
+    benchmark(lambda: [resize_image(img) for img in images])
+
+
+def bench_image_hash(benchmark, corpus):
+    images = [resize_image(image) for _, image, _ in corpus]
+    benchmark(lambda: [image_hash(img) for img in images])
+
+
+def bench_run_ocr(benchmark, corpus, ocr_engine):
+    from app.services.ocr_engine import run_ocr
+
+    images = [resize_image(image) for _, image, _ in corpus]
+    benchmark.pedantic(
+        lambda: [run_ocr(img, ocr_engine) for img in images],
+        rounds=3,
+        warmup_rounds=0,
+    )
+
+
+# -------------------
+# Text stages (ideal OCR, no engine needed)
+# -------------------
+
+def bench_clean_lines(benchmark, ideal_ocr):
+    texts = [result.text for result, _ in ideal_ocr]
+    benchmark(lambda: [clean_lines(t) for t in texts])
+
+
+def bench_visa_parse(benchmark, ideal_ocr):
+    inputs = [
+        (clean_lines(result.text), TableLayout.from_result(result))
+        for result, _ in ideal_ocr
+    ]
+    benchmark(lambda: [parser.parse(lines, LineIndex(lines, layout)) for lines, layout in inputs])
+
+
+def bench_build_form_response(benchmark, ideal_ocr):
+    parsed = [parser.parse(clean_lines(result.text)) for result, _ in ideal_ocr]
+    benchmark(lambda: [build_form_response(p) for p in parsed])
+
+
+# -------------------
+# Accuracy
+# -------------------
+
+def bench_parse_accuracy(benchmark, ideal_ocr):
+    """
+    Validator + parser on perfect OCR must reproduce the ground truth.
+    """
+    results = [result for result, _ in ideal_ocr]
+    truths = [truth for _, truth in ideal_ocr]
+
+    responses = benchmark(lambda: [build_ocr_response(r) for r in results])
+
+    accuracy = _accuracy(responses, truths)
+    benchmark.extra_info["accuracy"] = accuracy
+    assert accuracy == 1.0
+
+
+def bench_pipeline_accuracy(benchmark, corpus, ocr_engine):
+    """
+    End to end with the real OCR engine.
+    """
+    images = [resize_image(image) for _, image, _ in corpus]
+    truths = [truth for _, _, truth in corpus]
+
+    responses = benchmark.pedantic(
+        lambda: [analyze_frame(img, ocr_engine) for img in images],
+        rounds=1,
+        warmup_rounds=0,
+    )
+
+    accuracy = _accuracy(responses, truths)
+    benchmark.extra_info["accuracy"] = accuracy
+    assert accuracy >= MIN_OCR_ACCURACY
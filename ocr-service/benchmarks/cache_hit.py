@@ -0,0 +1,65 @@
+"""
+Latency of an OCR cache hit, before and after the two-tier key.
+
+  before - decode + convert("RGB") + resize_image + md5(tobytes()) + lookup
+  after  - blake2b over the raw upload bytes + lookup
+
+Usage (from ocr-service/):
+    python -m benchmarks.cache_hit [screenshot.png ...]
+"""
+import hashlib
+import io
+import sys
+import timeit
+
+from PIL import Image
+
+from app.services.cache import raw_cache_key
+from app.utils.image import resize_image, upload_hash
+
+
+def sample_uploads(paths: list[str]) -> list[tuple[str, bytes]]:
+    if paths:
+        return [(p, open(p, "rb").read()) for p in paths]
+
+    # Typical desktop screenshot sizes, PNG encoded
+    uploads = []
+    for w, h in ((1280, 800), (1920, 1080), (2880, 1800)):
+        buf = io.BytesIO()
+        Image.new("RGB", (w, h), (240, 244, 248)).save(buf, format="PNG")
+        uploads.append((f"{w}x{h}.png", buf.getvalue()))
+    return uploads
+
+
+def hit_before(cache: dict, data: bytes):
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    image = resize_image(image)
+    return cache[hashlib.md5(image.tobytes()).hexdigest()]
+
+
+def hit_after(cache: dict, data: bytes):
+    return cache[raw_cache_key(upload_hash(data))]
+
+
+def main():
+    uploads = sample_uploads(sys.argv[1:])
+    print(f"{'upload':<24}{'KB':>8}{'before ms':>12}{'after ms':>12}{'speed-up':>10}")
+
+    for name, data in uploads:
+        image = resize_image(Image.open(io.BytesIO(data)).convert("RGB"))
+        cache = {
+            hashlib.md5(image.tobytes()).hexdigest(): {"success": True},
+            raw_cache_key(upload_hash(data)): {"success": True},
+        }
+
+        runs = 20
+        before = min(timeit.repeat(lambda: hit_before(cache, data), number=runs, repeat=3)) / runs
+        after = min(timeit.repeat(lambda: hit_after(cache, data), number=runs, repeat=3)) / runs
+        print(
+            f"{name:<24}{len(data) / 1024:>8.0f}{before * 1000:>12.2f}"
+            f"{after * 1000:>12.3f}{before / after:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Cost/accuracy of the confidence cascade across thresholds.
+
+Every tier (and the full frame) is run once per screenshot and its
+response and latency recorded; the cascade is then replayed for each
+threshold. For each threshold:
+
+  <tier> hit  - share of requests that tier answered
+  ms/request  - mean latency of the tiers a request went through
+  accuracy    - responses matching the ground truth (benchmarks/corpus.py)
+  vs full     - responses identical to the full-frame-only answer
+
+Usage (from ocr-service/):
+    python -m benchmarks.cascade --corpus DIR --tiers roi,downscale \
+        --thresholds 0.8 0.85 0.9 0.95
+"""
+import argparse
+import time
+
+from app.config import OCR_CASCADE_REQUIRED_FIELDS
+from app.services.cascade import FULL_TIER, TIERS, Cascade
+from app.services.ocr_engine import warm_ocr_engine
+from app.services.pipeline import analyze_frame
+from app.utils.image import resize_image
+from benchmarks.corpus import load_corpus, matches_truth
+
+
+def record(image, tiers: list[str]) -> dict[str, tuple[dict | None, float]]:
+    """
+    {tier: (response or None when skipped, seconds)} for one screenshot.
+    """
+    runs = {}
+    for tier in [*tiers, FULL_TIER]:
+        start = time.perf_counter()
+        frame = image if tier == FULL_TIER else TIERS[tier](image)
+        response = analyze_frame(frame) if frame is not None else None
+        runs[tier] = (response, time.perf_counter() - start)
+    return runs
+
+
+def replay(cascade: Cascade, runs: dict) -> tuple[dict, str, float]:
+    spent = 0.0
+    for tier in cascade.tiers:
+        response, seconds = runs[tier]
+        spent += seconds
+        if response is not None and cascade.accepts(response):
+            return response, tier, spent
+    response, seconds = runs[FULL_TIER]
+    return response, FULL_TIER, spent + seconds
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", required=True)
+    ap.add_argument("--limit", type=int)
+    ap.add_argument("--tiers", default="roi,downscale")
+    ap.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.85, 0.9, 0.95])
+    ap.add_argument("--required", default=OCR_CASCADE_REQUIRED_FIELDS)
+    args = ap.parse_args()
+
+    tiers = [t.strip() for t in args.tiers.split(",") if t.strip()]
+    required = [f.strip() for f in args.required.split(",") if f.strip()]
+    corpus = load_corpus(args.corpus, args.limit)
+
+    warm_ocr_engine()
+    recorded = [(record(resize_image(image), tiers), truth) for _, image, truth in corpus]
+    with_truth = sum(truth is not None for _, truth in recorded)
+
+    full_ms = sum(runs[FULL_TIER][1] for runs, _ in recorded) / len(recorded) * 1000
+    full_ok = sum(bool(matches_truth(runs[FULL_TIER][0], truth)) for runs, truth in recorded)
+    print(f"full frame only: {full_ms:.0f} ms/request, accuracy {full_ok}/{with_truth}\n")
+
+    header = "".join(f"{t + ' hit':>14}" for t in tiers)
+    print(f"{'threshold':>10}{header}{'ms/request':>12}{'accuracy':>10}{'vs full':>9}")
+    for threshold in args.thresholds:
+        cascade = Cascade(tiers, threshold=threshold, required=required)
+        hits = dict.fromkeys([*tiers, FULL_TIER], 0)
+        spent = 0.0
+        correct = same = 0
+
+        for runs, truth in recorded:
+            response, tier, seconds = replay(cascade, runs)
+            hits[tier] += 1
+            spent += seconds
+            correct += bool(matches_truth(response, truth))
+            same += response == runs[FULL_TIER][0]
+
+        n = len(recorded)
+        rates = "".join(f"{hits[t] / n:>14.0%}" for t in tiers)
+        print(
+            f"{threshold:>10.2f}{rates}{spent / n * 1000:>12.0f}"
+            f"{f'{correct}/{with_truth}':>10}{same / n:>9.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from benchmarks.corpus import load_corpus
+from benchmarks.synthetic import generate
+
+CORPUS_SIZE = int(os.getenv("BENCH_CORPUS_SIZE", "40"))
+CORPUS_SEED = int(os.getenv("BENCH_CORPUS_SEED", "0"))
+
+
+@pytest.fixture(scope="session")
+def corpus_dir(tmp_path_factory) -> Path:
+    """
+    Synthetic corpus, or BENCH_CORPUS=/path for a real one.
+    """
+    if os.getenv("BENCH_CORPUS"):
+        return Path(os.environ["BENCH_CORPUS"])
+    out = tmp_path_factory.mktemp("corpus")
+    generate(out, CORPUS_SIZE, seed=CORPUS_SEED)
+    return out
+
+
+@pytest.fixture(scope="session")
+def corpus(corpus_dir):
+    """
+    [(path, RGB image, ground truth | None), ...]
+    """
+    return load_corpus(corpus_dir)
+
+
+@pytest.fixture(scope="session")
+def uploads(corpus) -> list[bytes]:
+    """
+    Raw upload bytes, as the endpoint receives them.
+    """
+    return [path.read_bytes() for path, _, _ in corpus]
+
+
+@pytest.fixture(scope="session")
+def ideal_ocr(corpus):
+    """
+    OCRResult per screenshot built from the generator's drawn text,
+    i.e. what a perfect OCR engine would return. Skips real corpora.
+    """
+    from app.services.ocr_engine import OCRResult
+
+    results = []
+    for path, _, truth in corpus:
+        sidecar = path.with_suffix(".ocr.json")
+        if not sidecar.exists():
+            pytest.skip("corpus has no ideal-OCR sidecars")
+        data = json.loads(sidecar.read_text())
+        results.append((OCRResult.from_lists(data["boxes"], data["texts"], [1.0] * len(data["texts"])), truth))
+    return results
+
+
+@pytest.fixture(scope="session")
+def ocr_engine():
+    from app.config import OCR_ENGINE_BACKEND
+
+    pytest.importorskip("onnxruntime" if OCR_ENGINE_BACKEND == "onnx" else "paddleocr")
+    from app.services.ocr_engine import get_ocr_engine, warm_ocr_engine
+
+    warm_ocr_engine()
+    return get_ocr_engine()
@@ -0,0 +1,54 @@
+"""
+Benchmark corpus layout shared by the scripts in this package.
+
+A corpus is a directory of screenshots (.png/.jpg). A screenshot may have
+a ground-truth sidecar with the same stem, e.g. delhi_01.png + delhi_01.json:
+
+    {"consulate": "Delhi",
+     "earliest_available_date": "2026-03-16",
+     "total_slots": 236}
+
+Only the fields present in the sidecar are checked, against the
+`form_data` of the OCR response. A sidecar of {"valid": false} marks a
+screenshot that must be rejected as INVALID_SCREENSHOT.
+"""
+import json
+from pathlib import Path
+
+from PIL import Image
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+
+def load_corpus(path: str, limit: int | None = None) -> list[tuple[Path, Image.Image, dict | None]]:
+    files = sorted(
+        p for p in Path(path).iterdir()
+        if p.suffix.lower() in IMAGE_SUFFIXES
+    )[:limit]
+
+    items = []
+    for image_path in files:
+        truth_path = image_path.with_suffix(".json")
+        truth = json.loads(truth_path.read_text()) if truth_path.exists() else None
+        items.append((image_path, Image.open(image_path).convert("RGB"), truth))
+    return items
+
+
+def matches_truth(response: dict, truth: dict | None) -> bool | None:
+    """
+    True/False against the sidecar, None when there is no ground truth.
+    """
+    if truth is None:
+        return None
+
+    if truth.get("valid") is False:
+        return response.get("error_code") == "INVALID_SCREENSHOT"
+    if not response.get("success"):
+        return False
+
+    form_data = response["form_data"]
+    return all(
+        form_data.get(field) == expected
+        for field, expected in truth.items()
+        if field != "valid"
+    )
@@ -0,0 +1,113 @@
+"""
+Throughput of normalize_date over a large corpus of OCR'd lines.
+
+Compares the previous implementation (three re calls plus a scan over
+MONTHS per call) with the compiled patterns, without and with the memo.
+By default every line is distinct, as in production where LineIndex
+normalizes each line once; --unique N draws the lines from N distinct
+ones to show what the memo buys when lines repeat.
+
+Usage (from ocr-service/):
+    python -m benchmarks.date_normalize [--lines 200000] [--unique 2000]
+"""
+import argparse
+import random
+import re
+import time
+
+from app.utils.date_utils import MONTHS, normalize_date, parse_date_parts
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+NOISE = ["HYDERABAD IW", "Schedule OFC Appointment", "10:30", "236", "Select", "Location", "Available"]
+
+
+def legacy_normalize_date(text: str) -> str | None:
+    if not text:
+        return None
+    t = text.lower()
+    t = re.sub(r"[.,]", "", t)
+    year_match = re.search(r"\b(20\d{2})\b", t)
+    if not year_match:
+        return None
+    year = year_match.group(1)
+    month = None
+    for name, num in MONTHS.items():
+        if name in t:
+            month = num
+            break
+    if not month:
+        return None
+    day_match = re.search(r"\b(\d{1,2})\b", t)
+    if not day_match:
+        return None
+    return f"{year}-{month}-{day_match.group(1).zfill(2)}"
+
+
+def ocr_noise(text: str, rng: random.Random) -> str:
+    # The confusions PaddleOCR actually produces on portal screenshots
+    roll = rng.random()
+    if roll < 0.05:
+        return text.replace("0", "O", 1)
+    if roll < 0.08:
+        return text.replace("1", "l", 1)
+    if roll < 0.10:
+        return re.sub(r"20(\d\d)", lambda m: "20" + rng.choice("aoe") + m.group(1), text, count=1)
+    return text
+
+
+def make_corpus(n: int, unique: int | None = None, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    month_names = [m.title() for m in MONTHS]
+    pool = []
+    for _ in range(unique or n):
+        if rng.random() < 0.5:
+            pool.append(rng.choice(NOISE))
+            continue
+        line = f"{rng.choice(WEEKDAYS)} {rng.choice(month_names)} {rng.randint(1, 28)}, {rng.randint(2024, 2027)}"
+        if rng.random() < 0.3:
+            line += "."
+        pool.append(ocr_noise(line, rng))
+    if unique is None:
+        return pool
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def bench(fn, corpus: list[str]) -> float:
+    start = time.perf_counter()
+    for line in corpus:
+        fn(line)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--unique", type=int, help="distinct lines (default: all)")
+    args = ap.parse_args()
+
+    corpus = make_corpus(args.lines, args.unique)
+
+    # Agreement on lines the old code already understood
+    disagree = sum(
+        1 for line in set(corpus)
+        if legacy_normalize_date(line) and legacy_normalize_date(line) != normalize_date(line)
+    )
+    recovered = sum(
+        1 for line in set(corpus)
+        if normalize_date(line) and not legacy_normalize_date(line)
+    )
+
+    legacy = bench(legacy_normalize_date, corpus)
+    parse_date_parts.cache_clear()
+    cold = bench(lambda l: parse_date_parts.__wrapped__(l), corpus)
+    parse_date_parts.cache_clear()
+    memo = bench(normalize_date, corpus)
+
+    print(f"{'legacy':<22}{legacy:>12,.0f} lines/s")
+    print(f"{'patterns (no memo)':<22}{cold:>12,.0f} lines/s  {cold / legacy:.1f}x")
+    print(f"{'patterns + memo':<22}{memo:>12,.0f} lines/s  {memo / legacy:.1f}x")
+    print(f"\n{disagree} disagreements with legacy, {recovered} OCR-confused dates recovered")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Decode + resize cost per upload, full decode vs draft-mode decode.
+
+  before - Image.open().convert("RGB") at native size, then resize
+  after  - decode_image(): pixel limit from the header, JPEG draft
+           decode to 1/2..1/8 scale, then resize_image() with reducing_gap
+
+"decoded MB" is the size of the RGB buffer the decoder produced, the
+main driver of peak memory per request.
+
+Usage (from ocr-service/):
+    python -m benchmarks.decode [photo.jpg screenshot.png ...]
+"""
+import io
+import sys
+import timeit
+
+import numpy as np
+from PIL import Image
+
+from app.services.pipeline import decode_image
+from app.utils.image import MAX_WIDTH, resize_image
+
+
+def sample_uploads(paths: list[str]) -> list[tuple[str, bytes]]:
+    if paths:
+        return [(p, open(p, "rb").read()) for p in paths]
+
+    # Phone photos of a screen (JPEG) and desktop screenshots (PNG);
+    # noise keeps the encoders from compressing them to nothing
+    rng = np.random.default_rng(0)
+    uploads = []
+    for w, h, fmt in ((4032, 3024, "JPEG"), (3000, 4000, "JPEG"), (2880, 1800, "PNG"), (1920, 1080, "JPEG")):
+        pixels = rng.integers(180, 255, (h, w, 3), dtype=np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(pixels).save(buf, format=fmt, quality=90)
+        uploads.append((f"{w}x{h}.{fmt.lower()}", buf.getvalue()))
+    return uploads
+
+
+def before(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    if image.width > MAX_WIDTH:
+        image = image.resize((MAX_WIDTH, int(image.height * MAX_WIDTH / image.width)))
+    return image
+
+
+def after(data: bytes) -> Image.Image:
+    return resize_image(decode_image(data))
+
+
+def decoded_mb(data: bytes, draft: bool) -> float:
+    image = decode_image(data) if draft else Image.open(io.BytesIO(data)).convert("RGB")
+    return image.width * image.height * 3 / 1e6
+
+
+def main():
+    uploads = sample_uploads(sys.argv[1:])
+    print(f"{'upload':<24}{'decoded MB':>18}{'before ms':>12}{'after ms':>12}{'speed-up':>10}")
+
+    for name, data in uploads:
+        runs = 5
+        t_before = min(timeit.repeat(lambda: before(data), number=runs, repeat=3)) / runs
+        t_after = min(timeit.repeat(lambda: after(data), number=runs, repeat=3)) / runs
+        mb = f"{decoded_mb(data, False):.1f} -> {decoded_mb(data, True):.1f}"
+        print(
+            f"{name:<24}{mb:>18}{t_before * 1000:>12.1f}"
+            f"{t_after * 1000:>12.1f}{t_before / t_after:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
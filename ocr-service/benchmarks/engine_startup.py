@@ -0,0 +1,107 @@
+"""
+Startup time and resident memory of one worker's OCR engine(s).
+
+  before  - the old layout: app.main and ocr_engine each build a PaddleOCR
+            instance, and only the main.py one is warmed
+  after   - the shared engine from app.services.ocr_engine, built and
+            warmed once
+
+Each mode runs in a fresh interpreter so the numbers are per worker.
+
+Usage (from ocr-service/):
+    python -m benchmarks.engine_startup
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+
+def _rss_mb() -> float:
+    # Linux: current resident set size, fall back to peak RSS elsewhere
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(mode: str) -> dict:
+    import numpy as np
+
+    baseline = _rss_mb()
+    start = time.perf_counter()
+
+    if mode == "before":
+        from paddleocr import PaddleOCR
+
+        serving = PaddleOCR(lang="en", use_angle_cls=False)
+        warmed = PaddleOCR(lang="en", use_angle_cls=False)
+        warmed.ocr(np.zeros((200, 200, 3), dtype="uint8"))
+        engines = [serving, warmed]
+    else:
+        from app.services.ocr_engine import warm_ocr_engine, get_ocr_engine
+
+        warm_ocr_engine()
+        engines = [get_ocr_engine()]
+
+    startup = time.perf_counter() - start
+
+    # First real request: "before" hits the cold, un-warmed instance
+    start = time.perf_counter()
+    blank = np.zeros((200, 200, 3), dtype="uint8")
+    if mode == "before":
+        engines[0].ocr(blank)
+    else:
+        engines[0].infer([blank])
+    first_request = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "engines": len(engines),
+        "startup_s": round(startup, 3),
+        "first_request_s": round(first_request, 3),
+        "rss_mb": round(_rss_mb() - baseline, 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--child", choices=["before", "after"])
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(args.child)))
+        return
+
+    rows = []
+    for mode in ("before", "after"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.engine_startup", "--child", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8}{'engines':>8}{'startup s':>12}{'1st req s':>12}{'RSS MB':>10}")
+    for r in rows:
+        print(
+            f"{r['mode']:<8}{r['engines']:>8}{r['startup_s']:>12}"
+            f"{r['first_request_s']:>12}{r['rss_mb']:>10}"
+        )
+
+    before, after = rows
+    print(
+        f"\nsaved per worker: {before['startup_s'] - after['startup_s']:.2f} s startup, "
+        f"{before['rss_mb'] - after['rss_mb']:.0f} MB RSS"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+OCR backends compared on the same corpus: PaddleOCR, ONNX Runtime
+float32 and ONNX Runtime int8.
+
+  load      - building the engine (weights, sessions)
+  p50/p95   - one image per infer() call, as a request without batching
+  img/s     - the corpus in infer() batches of --batch images
+  accuracy  - analyze_frame() with that engine against the ground truth
+              sidecars (see benchmarks/corpus.py)
+
+The ONNX backends read OCR_ONNX_MODEL_DIR (see
+app/services/engines/onnx_engine.py); build the int8 models first with
+`python -m app.services.engines.quantize`. OCR_ONNX_THREADS applies.
+
+Usage (from ocr-service/):
+    python -m benchmarks.engines --corpus DIR --backends paddle onnx onnx-int8
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.config import OCR_ONNX_MODEL_DIR, OCR_ONNX_THREADS
+from app.services.engines import OCREngine
+from app.services.pipeline import analyze_frame
+from app.utils.image import resize_image
+from benchmarks.corpus import load_corpus, matches_truth
+
+BACKENDS = ("paddle", "onnx", "onnx-int8")
+
+
+def build(backend: str) -> OCREngine:
+    if backend == "paddle":
+        from app.services.engines.paddle_engine import PaddleEngine
+
+        return PaddleEngine()
+
+    from app.services.engines.onnx_engine import OnnxEngine
+
+    return OnnxEngine(OCR_ONNX_MODEL_DIR, quantized=backend == "onnx-int8", threads=OCR_ONNX_THREADS)
+
+
+def measure(backend: str, corpus, batch: int) -> dict:
+    start = time.perf_counter()
+    engine = build(backend)
+    load_s = time.perf_counter() - start
+
+    images = [np.asarray(image) for _, image, _ in corpus]
+    engine.infer(images[:1])     # warm-up
+
+    latencies = []
+    for img in images:
+        start = time.perf_counter()
+        engine.infer([img])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(images), batch):
+        engine.infer(images[i:i + batch])
+    throughput = len(images) / (time.perf_counter() - start)
+
+    checked = [
+        matches_truth(analyze_frame(image, engine), truth)
+        for _, image, truth in corpus
+        if truth is not None
+    ]
+    engine.close()
+
+    return {
+        "load_s": load_s,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "throughput": throughput,
+        "accuracy": sum(checked) / len(checked) if checked else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", required=True)
+    ap.add_argument("--limit", type=int)
+    ap.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    ap.add_argument("--batch", type=int, default=4, help="images per infer() call for img/s")
+    args = ap.parse_args()
+
+    corpus = [
+        (path, resize_image(image), truth)
+        for path, image, truth in load_corpus(args.corpus, args.limit)
+    ]
+
+    print(f"{'backend':<12}{'load s':>8}{'p50 ms':>10}{'p95 ms':>10}{'img/s':>8}{'accuracy':>10}")
+    for backend in args.backends:
+        r = measure(backend, corpus, args.batch)
+        accuracy = f"{r['accuracy']:.1%}" if r["accuracy"] is not None else "n/a"
+        print(
+            f"{backend:<12}{r['load_s']:>8.1f}{r['p50_ms']:>10.0f}"
+            f"{r['p95_ms']:>10.0f}{r['throughput']:>8.2f}{accuracy:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Latency of small clients while one client floods the OCR executor, first
+come first served vs the fair queue.
+
+One heavy client queues --heavy jobs at once (a big /ocr/batch); --light
+clients each send one job every --interval-ms meanwhile. Jobs sleep for
+--job-ms instead of running OCR, so this measures scheduling only and
+needs no model.
+
+  fifo  - every job charged to the same client: arrival order
+  fair  - one client per sender: weighted round-robin (FairQueue)
+
+Usage (from ocr-service/):
+    python -m benchmarks.fairness --workers 2 --heavy 60 --light 4
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.core.auth import Client
+from app.services.executor import OCRExecutor
+
+
+def job(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def scenario(fair: bool, args) -> dict:
+    executor = OCRExecutor(mode="thread", workers=args.workers, queue_size=args.heavy + args.light * 100)
+    job_s = args.job_ms / 1000
+
+    def client(name: str) -> Client:
+        return Client(name if fair else "everyone")
+
+    async def timed_run(name: str) -> float:
+        start = time.perf_counter()
+        await executor.run(job, job_s, client=client(name))
+        return time.perf_counter() - start
+
+    async def light(name: str) -> list[float]:
+        latencies = []
+        for _ in range(args.rounds):
+            latencies.append(await timed_run(name))
+            await asyncio.sleep(args.interval_ms / 1000)
+        return latencies
+
+    start = time.perf_counter()
+    heavy = [asyncio.ensure_future(timed_run("heavy")) for _ in range(args.heavy)]
+    await asyncio.sleep(0)
+    light_results = await asyncio.gather(*(light(f"light{i}") for i in range(args.light)))
+    await asyncio.gather(*heavy)
+    total = time.perf_counter() - start
+    executor.shutdown()
+
+    light_latencies = [lat for result in light_results for lat in result]
+    return {
+        "light_p50": float(np.percentile(light_latencies, 50)) * 1000,
+        "light_p95": float(np.percentile(light_latencies, 95)) * 1000,
+        "heavy_done": max(h.result() for h in heavy),
+        "total": total,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--heavy", type=int, default=60, help="jobs queued by the heavy client")
+    ap.add_argument("--light", type=int, default=4, help="light clients")
+    ap.add_argument("--rounds", type=int, default=5, help="jobs per light client")
+    ap.add_argument("--interval-ms", type=float, default=100)
+    ap.add_argument("--job-ms", type=float, default=50)
+    args = ap.parse_args()
+
+    print(f"{'queue':<8}{'light p50 ms':>14}{'light p95 ms':>14}{'heavy done s':>14}{'total s':>10}")
+    for name, fair in (("fifo", False), ("fair", True)):
+        r = asyncio.run(scenario(fair, args))
+        print(
+            f"{name:<8}{r['light_p50']:>14.0f}{r['light_p95']:>14.0f}"
+            f"{r['heavy_done']:>14.2f}{r['total']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+False-reject rate and cost of the pre-OCR rejection stage.
+
+Needs a labeled corpus (benchmarks/corpus.py): screenshots whose sidecar
+is {"valid": false} are non-visa uploads, every other screenshot with a
+sidecar is a real appointment page.
+
+Usage (from ocr-service/):
+    python -m benchmarks.fast_reject --corpus path/to/corpus [--top-k 3]
+"""
+import argparse
+import time
+
+from app.services.fast_reject import looks_like_visa_screenshot
+from app.services.ocr_engine import run_ocr, warm_ocr_engine
+from app.utils.image import resize_image
+from benchmarks.corpus import load_corpus
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", required=True)
+    ap.add_argument("--top-k", type=int, default=3)
+    ap.add_argument("--probe-width", type=int, default=512)
+    args = ap.parse_args()
+
+    corpus = [
+        (path, resize_image(image), truth.get("valid", True))
+        for path, image, truth in load_corpus(args.corpus)
+        if truth is not None
+    ]
+    warm_ocr_engine()
+
+    stats = {True: [0, 0], False: [0, 0]}     # label -> [images, rejected]
+    probe_s = {True: 0.0, False: 0.0}
+    full_s = 0.0
+    false_rejects = []
+
+    for path, image, is_visa in corpus:
+        start = time.perf_counter()
+        accepted = looks_like_visa_screenshot(
+            image, top_k=args.top_k, probe_width=args.probe_width
+        )
+        probe_s[is_visa] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_ocr(image)
+        full_s += time.perf_counter() - start
+
+        stats[is_visa][0] += 1
+        if not accepted:
+            stats[is_visa][1] += 1
+            if is_visa:
+                false_rejects.append(path.name)
+
+    visa_n, visa_rejected = stats[True]
+    other_n, other_rejected = stats[False]
+    print(f"visa screenshots:     {visa_n:>5}  false-reject rate {visa_rejected / max(1, visa_n):.1%}")
+    print(f"non-visa screenshots: {other_n:>5}  rejected          {other_rejected / max(1, other_n):.1%}")
+    print(
+        f"\nmean cost: fast-reject {sum(probe_s.values()) / max(1, len(corpus)) * 1000:.0f} ms"
+        f" (non-visa {probe_s[False] / max(1, other_n) * 1000:.0f} ms),"
+        f" full OCR {full_s / max(1, len(corpus)) * 1000:.0f} ms"
+    )
+    for name in false_rejects:
+        print(f"false reject: {name}")
+
+
+if __name__ == "__main__":
+    main()
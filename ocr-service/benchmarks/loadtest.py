@@ -0,0 +1,363 @@
+"""
+End-to-end load test of POST /ocr/ (and /auth/oauth-login).
+
+Drives the FastAPI app in-process through httpx.ASGITransport (default),
+or a running server with --url, or a uvicorn it starts itself with
+--spawn. Screenshots are archived to local disk
+(SCREENSHOT_STORAGE_BACKEND=local), so nothing touches the network.
+
+  --concurrency     requests in flight at once
+  --cache-hit-ratio share of /ocr requests re-sending an image already
+                    sent (cache hit); the rest get a unique pixel so they
+                    miss every cache tier
+  --mix             weights per screenshot kind of the synthetic corpus,
+                    e.g. table=3,calendar=1,non_visa=1
+  --login-ratio     share of requests going to /auth/oauth-login
+
+Reports throughput, a latency histogram and percentiles, and error rates
+per endpoint and status / error_code.
+
+Usage (from ocr-service/):
+    python -m benchmarks.loadtest --requests 500 --concurrency 16
+    python -m benchmarks.loadtest --corpus /tmp/visa-corpus --cache-hit-ratio 0.8
+    python -m benchmarks.loadtest --spawn --workers 2 --concurrency 32
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+from benchmarks.corpus import load_corpus
+from benchmarks.synthetic import KINDS, generate
+
+# Histogram bucket upper bounds in ms (last bucket is open ended)
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, _, weight = part.partition("=")
+        if kind not in KINDS:
+            raise SystemExit(f"unknown kind {kind!r}, expected one of {KINDS}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def kind_of(path: Path) -> str | None:
+    # Synthetic files are named <index>_<kind>.<ext>
+    _, _, kind = path.stem.partition("_")
+    return kind if kind in KINDS else None
+
+
+def encode(image: Image.Image, suffix: str) -> tuple[bytes, str]:
+    buf = io.BytesIO()
+    if suffix in (".jpg", ".jpeg"):
+        image.save(buf, format="JPEG", quality=90)
+        return buf.getvalue(), "image/jpeg"
+    image.save(buf, format="PNG")
+    return buf.getvalue(), "image/png"
+
+
+def unique_variant(image: Image.Image, n: int) -> Image.Image:
+    """
+    Copy with one corner pixel set from n: new bytes and new pixels, so
+    it misses the raw and pixel cache tiers (near-duplicate matching
+    would still see it as the same page).
+    """
+    variant = image.copy()
+    variant.putpixel((0, 0), (n % 256, (n // 256) % 256, (n // 65536) % 256))
+    return variant
+
+
+def build_plan(corpus, total: int, cache_hit_ratio: float, login_ratio: float, mix: dict, seed: int):
+    """
+    The request sequence, fully encoded up front so the clock only
+    measures the server: [("ocr", kind, filename, bytes, content_type) |
+    ("login", None, None, payload, None)].
+    """
+    rng = random.Random(seed)
+
+    pool = corpus
+    if mix:
+        pool = [item for item in corpus if kind_of(item[0]) in mix]
+        if not pool:
+            raise SystemExit("no corpus image matches --mix")
+    weights = [mix.get(kind_of(path), 0) if mix else 1 for path, _, _ in pool]
+
+    sent = []
+    plan = []
+    for n in range(total):
+        if rng.random() < login_ratio:
+            payload = {
+                "email": f"load{n}@example.com",
+                "name": "Load Test",
+                "provider": "google",
+                "provider_id": str(n),
+            }
+            plan.append(("login", None, None, payload, None))
+            continue
+
+        if sent and rng.random() < cache_hit_ratio:
+            plan.append(rng.choice(sent))
+            continue
+
+        path, image, _ = rng.choices(pool, weights=weights)[0]
+        data, content_type = encode(unique_variant(image, n), path.suffix.lower())
+        entry = ("ocr", kind_of(path), path.name, data, content_type)
+        sent.append(entry)
+        plan.append(entry)
+    return plan
+
+
+# -------------------
+# Running
+# -------------------
+
+async def send(client: httpx.AsyncClient, entry) -> tuple[str, str, float]:
+    endpoint, _, filename, payload, content_type = entry
+    start = time.perf_counter()
+    try:
+        if endpoint == "login":
+            response = await client.post("/auth/oauth-login", json=payload)
+        else:
+            response = await client.post(
+                "/ocr/", files={"file": (filename, payload, content_type)}
+            )
+    except httpx.HTTPError as e:
+        return endpoint, type(e).__name__, time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+
+    outcome = str(response.status_code)
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    # HTTPException details arrive as {"detail": {...}}
+    detail = body.get("detail", body) if isinstance(body, dict) else None
+    if isinstance(detail, dict) and detail.get("error_code"):
+        outcome += f" {detail['error_code']}"
+    return endpoint, outcome, elapsed
+
+
+async def run_load(client: httpx.AsyncClient, plan: list, concurrency: int):
+    queue = iter(plan)
+    results = []
+
+    async def worker():
+        for entry in queue:
+            results.append(await send(client, entry))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+@contextlib.asynccontextmanager
+async def in_process_client(timeout: float):
+    os.environ.setdefault("SCREENSHOT_STORAGE_BACKEND", "local")
+    # Every request comes from one client here
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    from app.main import app
+
+    # ASGITransport does not send lifespan events: run startup/shutdown
+    # (executor pool, engine warm-up) ourselves.
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            await wait_until_ready(client)
+            yield client
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 300) -> None:
+    """
+    The engine warms up in the background; start the clock once it is ready.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = await client.get("/ready")
+            if response.status_code == 200:
+                return
+            if response.json()["engine"]["state"] == "failed":
+                raise SystemExit(f"OCR engine failed to load: {response.json()['engine']['error']}")
+        except httpx.HTTPError:
+            pass
+        if time.monotonic() > deadline:
+            raise SystemExit("server did not become ready")
+        await asyncio.sleep(0.5)
+
+
+@contextlib.contextmanager
+def spawned_server(port: int, workers: int, timeout: float = 300):
+    env = {"RATE_LIMIT_ENABLED": "false", **os.environ, "SCREENSHOT_STORAGE_BACKEND": "local"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        # Wait for /health; the caller then waits for /ready
+        deadline = time.monotonic() + timeout
+        while True:
+            if server.poll() is not None:
+                raise SystemExit("uvicorn exited during startup")
+            try:
+                if httpx.get(f"{url}/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit("uvicorn did not come up")
+            time.sleep(0.5)
+        yield url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# -------------------
+# Report
+# -------------------
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return math.nan
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def histogram(latencies_ms: list[float]) -> list[tuple[str, int]]:
+    counts = Counter()
+    for ms in latencies_ms:
+        bucket = next((b for b in BUCKETS_MS if ms <= b), None)
+        counts[bucket] += 1
+
+    rows = []
+    lower = 0
+    for upper in BUCKETS_MS + [None]:
+        label = f"{lower}-{upper} ms" if upper else f">{lower} ms"
+        rows.append((label, counts[upper]))
+        lower = upper
+    return rows
+
+
+def summarize(results, elapsed: float) -> dict:
+    by_endpoint = defaultdict(list)
+    for endpoint, outcome, seconds in results:
+        by_endpoint[endpoint].append((outcome, seconds * 1000))
+
+    summary = {
+        "requests": len(results),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(results) / elapsed if elapsed else 0.0,
+        "endpoints": {},
+    }
+    for endpoint, rows in by_endpoint.items():
+        latencies = sorted(ms for _, ms in rows)
+        outcomes = Counter(outcome for outcome, _ in rows)
+        errors = sum(n for outcome, n in outcomes.items() if not outcome.startswith("2"))
+        summary["endpoints"][endpoint] = {
+            "requests": len(rows),
+            "throughput_rps": len(rows) / elapsed if elapsed else 0.0,
+            "error_rate": errors / len(rows),
+            "outcomes": dict(outcomes.most_common()),
+            "latency_ms": {
+                "mean": sum(latencies) / len(latencies),
+                **{f"p{int(q * 100)}": percentile(latencies, q) for q in (0.5, 0.9, 0.95, 0.99)},
+                "max": latencies[-1],
+            },
+            "histogram": histogram(latencies),
+        }
+    return summary
+
+
+def print_report(summary: dict) -> None:
+    print(
+        f"\n{summary['requests']} requests in {summary['elapsed_s']:.1f}s"
+        f" = {summary['throughput_rps']:.1f} req/s"
+    )
+    for endpoint, stats in summary["endpoints"].items():
+        lat = stats["latency_ms"]
+        print(f"\n== {endpoint}: {stats['requests']} requests, {stats['throughput_rps']:.1f} req/s,"
+              f" errors {stats['error_rate']:.1%}")
+        print("   latency ms  " + "  ".join(f"{k} {v:.1f}" for k, v in lat.items()))
+        print("   outcomes    " + ", ".join(f"{k}: {v}" for k, v in stats["outcomes"].items()))
+
+        widest = max(n for _, n in stats["histogram"]) or 1
+        for label, n in stats["histogram"]:
+            bar = "#" * round(40 * n / widest)
+            print(f"   {label:>16} {n:>6} {bar}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", help="base URL of a running server (default: in-process)")
+    ap.add_argument("--spawn", action="store_true", help="start uvicorn on --port and test it")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn workers with --spawn")
+    ap.add_argument("--corpus", help="screenshot directory (default: synthetic)")
+    ap.add_argument("--corpus-size", type=int, default=50)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--cache-hit-ratio", type=float, default=0.5)
+    ap.add_argument("--login-ratio", type=float, default=0.0)
+    ap.add_argument("--mix", default="", help="e.g. table=3,calendar=1,non_visa=1")
+    ap.add_argument("--timeout", type=float, default=60.0, help="client timeout per request, seconds")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", help="also write the summary to this file")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus
+        if not corpus_dir:
+            corpus_dir = tmp
+            generate(corpus_dir, args.corpus_size, seed=args.seed)
+        corpus = load_corpus(corpus_dir)
+
+        plan = build_plan(
+            corpus, args.requests, args.cache_hit_ratio,
+            args.login_ratio, parse_mix(args.mix), args.seed,
+        )
+        print(
+            f"{len(plan)} requests, concurrency {args.concurrency},"
+            f" {len({id(e) for e in plan if e[0] == 'ocr'})} distinct screenshots"
+        )
+
+        async def against(url: str | None):
+            if url is None:
+                async with in_process_client(args.timeout) as client:
+                    return await run_load(client, plan, args.concurrency)
+            async with httpx.AsyncClient(base_url=url, timeout=args.timeout) as client:
+                await wait_until_ready(client)
+                return await run_load(client, plan, args.concurrency)
+
+        if args.spawn:
+            with spawned_server(args.port, args.workers) as url:
+                results, elapsed = asyncio.run(against(url))
+        else:
+            results, elapsed = asyncio.run(against(args.url))
+
+    summary = summarize(results, elapsed)
+    print_report(summary)
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
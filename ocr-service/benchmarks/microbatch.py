@@ -0,0 +1,101 @@
+"""
+Throughput of the OCR micro-batcher against one-at-a-time inference.
+
+N client threads each OCR the same set of screenshots, first straight
+through infer_pages() (the old path), then through MicroBatcher with the
+given batch size / latency window.
+
+Usage (from ocr-service/):
+    python -m benchmarks.microbatch --corpus path/to/screenshots \
+        --clients 8 --batch-size 8 --latency-ms 10
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from app.services.batcher import MicroBatcher
+from app.services.ocr_engine import get_ocr_engine, infer_pages, warm_ocr_engine
+from app.utils.image import resize_image
+
+
+def load_corpus(path: str | None, limit: int) -> list[np.ndarray]:
+    if path:
+        files = sorted(
+            p for p in Path(path).iterdir()
+            if p.suffix.lower() in (".png", ".jpg", ".jpeg")
+        )[:limit]
+        images = [resize_image(Image.open(p).convert("RGB")) for p in files]
+    else:
+        # Fallback: blank pages of a typical screenshot size
+        images = [Image.new("RGB", (1024, 640), "white") for _ in range(limit)]
+    return [np.array(img, dtype="uint8") for img in images]
+
+
+def run_clients(fn, images: list[np.ndarray], clients: int, rounds: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+
+    def client(_):
+        for _ in range(rounds):
+            for img in images:
+                start = time.perf_counter()
+                fn(img)
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    return time.perf_counter() - start, latencies
+
+
+def report(name: str, elapsed: float, latencies: list[float]) -> float:
+    lat = np.array(latencies) * 1000
+    throughput = len(latencies) / elapsed
+    print(
+        f"{name:<12}{throughput:>10.2f} img/s"
+        f"{np.percentile(lat, 50):>10.1f} ms p50"
+        f"{np.percentile(lat, 99):>10.1f} ms p99"
+    )
+    return throughput
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", help="directory of screenshots")
+    ap.add_argument("--limit", type=int, default=16)
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--rounds", type=int, default=2)
+    ap.add_argument("--batch-size", type=int, default=8)
+    ap.add_argument("--latency-ms", type=float, default=10)
+    args = ap.parse_args()
+
+    images = load_corpus(args.corpus, args.limit)
+    warm_ocr_engine()
+    engine = get_ocr_engine()
+
+    single = report(
+        "sequential",
+        *run_clients(lambda img: infer_pages(engine, [img])[0], images, args.clients, args.rounds),
+    )
+
+    batcher = MicroBatcher(
+        lambda batch: infer_pages(engine, batch),
+        max_batch_size=args.batch_size,
+        max_latency_ms=args.latency_ms,
+    )
+    try:
+        batched = report(
+            "microbatch",
+            *run_clients(batcher.submit, images, args.clients, args.rounds),
+        )
+    finally:
+        batcher.stop()
+
+    print(f"\nspeed-up: {batched / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
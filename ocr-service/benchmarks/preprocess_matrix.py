@@ -0,0 +1,95 @@
+"""
+Accuracy vs latency for every combination of preprocessing stages.
+
+Each combination (stages kept in pipeline order) is run over a corpus
+with ground truth (see benchmarks/corpus.py). Results are sorted by total
+latency; the fastest combination that matches the best accuracy is the
+one to put in PREPROCESS_STAGES.
+
+Usage (from ocr-service/):
+    python -m benchmarks.preprocess_matrix --corpus path/to/corpus
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.services.ocr_engine import run_ocr, warm_ocr_engine
+from app.services.parser import clean_lines
+from app.services.preprocess import STAGES, PreprocessPipeline
+from app.services.visa_parser import VisaParser
+from app.utils.helper import build_form_response
+from app.utils.image import resize_image
+from app.utils.validators import validate_visa_screenshot
+from benchmarks.corpus import load_corpus, matches_truth
+
+parser = VisaParser()
+
+
+def respond(raw_text: str) -> dict:
+    # Same steps as pipeline.analyze_frame, minus preprocessing
+    lines = clean_lines(raw_text)
+    if not validate_visa_screenshot(lines):
+        return {"success": False, "error_code": "INVALID_SCREENSHOT"}
+    return {"success": True, "form_data": build_form_response(parser.parse(lines))}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", required=True)
+    ap.add_argument("--limit", type=int)
+    ap.add_argument("--stages", default=",".join(STAGES), help="stages to combine")
+    args = ap.parse_args()
+
+    corpus = [
+        (path, np.asarray(resize_image(image)), truth)
+        for path, image, truth in load_corpus(args.corpus, args.limit)
+        if truth is not None
+    ]
+    if not corpus:
+        raise SystemExit("corpus has no ground-truth sidecars")
+
+    warm_ocr_engine()
+    names = [s.strip() for s in args.stages.split(",") if s.strip()]
+
+    rows = []
+    for r in range(len(names) + 1):
+        for combo in itertools.combinations(names, r):
+            pipeline = PreprocessPipeline(list(combo))
+            pre_s = ocr_s = 0.0
+            correct = 0
+
+            for _, img, truth in corpus:
+                start = time.perf_counter()
+                out = pipeline(img)
+                pre_s += time.perf_counter() - start
+
+                start = time.perf_counter()
+                raw_text = run_ocr(Image.fromarray(out)).text
+                ocr_s += time.perf_counter() - start
+
+                correct += bool(matches_truth(respond(raw_text), truth))
+
+            n = len(corpus)
+            rows.append((",".join(combo) or "(none)", correct / n, pre_s / n, ocr_s / n))
+
+    rows.sort(key=lambda r: r[2] + r[3])
+    best_accuracy = max(r[1] for r in rows)
+
+    print(f"{'stages':<40}{'accuracy':>10}{'pre ms':>10}{'ocr ms':>10}{'total ms':>10}")
+    chosen = None
+    for stages, accuracy, pre, ocr in rows:
+        mark = ""
+        if chosen is None and accuracy == best_accuracy:
+            chosen = stages
+            mark = "  <- fastest at best accuracy"
+        print(
+            f"{stages:<40}{accuracy:>10.1%}{pre * 1000:>10.1f}"
+            f"{ocr * 1000:>10.0f}{(pre + ocr) * 1000:>10.0f}{mark}"
+        )
+
+
+if __name__ == "__main__":
+    main()
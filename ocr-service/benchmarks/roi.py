@@ -0,0 +1,86 @@
+"""
+Pixels sent to OCR and end-to-end latency, full frame vs ROI panels.
+
+For every screenshot in the corpus the full-frame path and the ROI path
+(with its full-frame fallback) are run; the parse results are compared
+so a faster ROI path that changes answers is visible.
+
+Usage (from ocr-service/):
+    python -m benchmarks.roi --corpus path/to/screenshots
+"""
+import argparse
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from app.services.ocr_engine import warm_ocr_engine
+from app.services.cascade import is_confident
+from app.services.pipeline import analyze_frame
+from app.services.roi import crop_to_panels
+from app.utils.image import resize_image
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", required=True, help="directory of screenshots")
+    ap.add_argument("--min-confidence", type=float, default=0.9)
+    args = ap.parse_args()
+
+    files = sorted(
+        p for p in Path(args.corpus).iterdir()
+        if p.suffix.lower() in (".png", ".jpg", ".jpeg")
+    )
+    warm_ocr_engine()
+
+    totals = {"full_px": 0, "roi_px": 0, "full_s": 0.0, "roi_s": 0.0}
+    fallbacks = mismatches = 0
+
+    print(f"{'image':<32}{'full px':>10}{'roi px':>10}{'full ms':>10}{'roi ms':>10}  note")
+    for path in files:
+        image = resize_image(Image.open(path).convert("RGB"))
+
+        start = time.perf_counter()
+        full = analyze_frame(image)
+        full_s = time.perf_counter() - start
+        full_px = image.width * image.height
+
+        start = time.perf_counter()
+        panels = crop_to_panels(image)
+        roi_px = 0
+        note = ""
+        result = None
+        if panels is not None:
+            roi_px = panels.width * panels.height
+            result = analyze_frame(panels)
+        if result is None or not is_confident(result, args.min_confidence):
+            fallbacks += 1
+            note = "fallback"
+            roi_px += full_px
+            result = analyze_frame(image)
+        roi_s = time.perf_counter() - start
+
+        if result != full:
+            mismatches += 1
+            note += " MISMATCH"
+
+        totals["full_px"] += full_px
+        totals["roi_px"] += roi_px
+        totals["full_s"] += full_s
+        totals["roi_s"] += roi_s
+        print(
+            f"{path.name[:31]:<32}{full_px:>10}{roi_px:>10}"
+            f"{full_s * 1000:>10.0f}{roi_s * 1000:>10.0f}  {note}"
+        )
+
+    n = max(1, len(files))
+    print(
+        f"\n{len(files)} images, {fallbacks} fallbacks, {mismatches} mismatches\n"
+        f"pixels: {totals['roi_px'] / max(1, totals['full_px']):.0%} of full frame\n"
+        f"mean latency: full {totals['full_s'] / n * 1000:.0f} ms, "
+        f"roi {totals['roi_s'] / n * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Node memory and throughput for N API workers, per-worker engines vs one
+shared inference server.
+
+  local   - N worker processes, each loading its own PaddleOCR weights
+            (OCR_INFERENCE_MODE=local, the default)
+  server  - N worker processes sending images through shared memory to
+            one `python -m app.services.inference_server`
+            (OCR_INFERENCE_MODE=server)
+
+Every worker calls run_ocr() in a loop for --seconds. Memory is PSS
+(shared pages split between the processes that map them) summed over all
+workers plus the server, i.e. what the node really pays; RSS is shown
+too.
+
+Usage (from ocr-service/):
+    python -m benchmarks.shared_model --corpus DIR --workers 1 2 4
+"""
+import argparse
+import multiprocessing
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def memory_mb(pid: int | str = "self") -> tuple[float, float]:
+    """
+    (PSS, RSS) in MB from /proc; PSS falls back to RSS off Linux.
+    """
+    values = {}
+    for path in (f"/proc/{pid}/smaps_rollup", f"/proc/{pid}/status"):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in ("Pss", "VmRSS"):
+                        values[key] = int(rest.split()[0]) / 1024
+        except OSError:
+            pass
+    rss = values.get("VmRSS", 0.0)
+    return values.get("Pss", rss), rss
+
+
+def _worker(mode: str, socket: str, paths: list[str], seconds: float, start, results) -> None:
+    # Configuration is read at import time, so set it before importing app
+    os.environ["OCR_INFERENCE_MODE"] = mode
+    os.environ["OCR_INFERENCE_SOCKET"] = socket
+
+    from PIL import Image
+
+    from app.services.ocr_engine import run_ocr, warm_ocr_engine
+    from app.utils.image import resize_image
+
+    images = [resize_image(Image.open(p).convert("RGB")) for p in paths]
+    if mode == "local":
+        warm_ocr_engine()
+    run_ocr(images[0])      # connect / warm the path once
+
+    start.wait()
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        run_ocr(images[done % len(images)])
+        done += 1
+    results.put((done, *memory_mb()))
+
+
+def start_server(socket: str, timeout: float = 300) -> subprocess.Popen:
+    env = {**os.environ, "OCR_INFERENCE_SOCKET": socket}
+    server = subprocess.Popen([sys.executable, "-m", "app.services.inference_server"], env=env)
+
+    from app.services.inference_server import InferenceClient
+
+    client = InferenceClient(socket)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit("inference server exited during startup")
+        try:
+            if client.status()["state"] == "ready":
+                return server
+        except Exception:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    sys.exit("inference server did not become ready")
+
+
+def run(mode: str, workers: int, paths: list[str], seconds: float) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    socket = os.path.join(tempfile.gettempdir(), f"ocr-bench-{os.getpid()}.sock")
+    server = start_server(socket) if mode == "server" else None
+
+    # Released once every worker is warm, so loading is not timed
+    start = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(mode, socket, paths, seconds, start, results))
+        for _ in range(workers)
+    ]
+    try:
+        for p in procs:
+            p.start()
+        start.wait(timeout=600)
+
+        rows = [results.get(timeout=seconds + 600) for _ in procs]
+        server_pss, server_rss = memory_mb(server.pid) if server else (0.0, 0.0)
+    finally:
+        for p in procs:
+            p.join(timeout=10)
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    done = sum(r[0] for r in rows)
+    return {
+        "pss": sum(r[1] for r in rows) + server_pss,
+        "rss": sum(r[2] for r in rows) + server_rss,
+        "throughput": done / seconds,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", required=True, help="directory of screenshots")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--seconds", type=float, default=30.0)
+    ap.add_argument("--limit", type=int, default=20)
+    args = ap.parse_args()
+
+    # One throwaway secret for the server and every worker of this run
+    os.environ.setdefault("OCR_INFERENCE_AUTHKEY", secrets.token_hex(32))
+
+    paths = sorted(
+        str(p) for p in Path(args.corpus).iterdir()
+        if p.suffix.lower() in (".png", ".jpg", ".jpeg")
+    )[:args.limit]
+
+    print(f"{'mode':<8}{'workers':>8}{'node PSS MB':>14}{'node RSS MB':>14}{'img/s':>10}")
+    for workers in args.workers:
+        for mode in ("local", "server"):
+            r = run(mode, workers, paths, args.seconds)
+            print(f"{mode:<8}{workers:>8}{r['pss']:>14.0f}{r['rss']:>14.0f}{r['throughput']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Start-up profile: what `import app.main` costs, and how long a fresh
+server takes to become live (/health) and ready (/ready).
+
+  imports  - `python -X importtime -c "import app.main"` in a fresh
+             interpreter: total, the slowest top-level packages, and any
+             heavy package (paddleocr, cv2, ...) that is imported eagerly
+             although it should only load in the background or on use
+  server   - with --serve, start uvicorn and poll /health and /ready
+
+--max-import-ms and --forbid turn the report into a check (exit code 1)
+so start-up regressions show up in CI.
+
+Usage (from ocr-service/):
+    python -m benchmarks.startup_profile
+    python -m benchmarks.startup_profile --max-import-ms 1500 --serve
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+# Must not be imported by `import app.main`
+HEAVY_PACKAGES = ("paddleocr", "paddle", "paddlex", "cv2", "supabase", "redis", "torch", "transformers")
+
+
+def profile_imports() -> list[tuple[str, int, int]]:
+    """
+    [(module, self_us, cumulative_us), ...] for `import app.main`.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "SCREENSHOT_STORAGE_BACKEND": "local"},
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import app.main failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def report_imports(rows, top: int) -> tuple[float, list[str]]:
+    # The last row is app.main itself, whose cumulative time is the total
+    total_ms = next(cum for name, _, cum in reversed(rows) if name == "app.main") / 1000
+
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"import app.main: {total_ms:.0f} ms\n")
+    print(f"{'package':<28}{'ms':>8}{'share':>8}")
+    for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<28}{us / 1000:>8.0f}{us / 1000 / total_ms:>8.0%}")
+
+    imported = {name.split(".")[0] for name, _, _ in rows}
+    heavy = [p for p in HEAVY_PACKAGES if p in imported]
+    print(f"\nheavy packages imported eagerly: {', '.join(heavy) or 'none'}")
+    return total_ms, heavy
+
+
+def profile_server(port: int, timeout: float) -> None:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "SCREENSHOT_STORAGE_BACKEND": "local"},
+    )
+    url = f"http://127.0.0.1:{port}"
+    live = ready = None
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                sys.exit("uvicorn exited during startup")
+            try:
+                if live is None and httpx.get(f"{url}/health").status_code == 200:
+                    live = time.perf_counter() - start
+                response = httpx.get(f"{url}/ready")
+                if response.status_code == 200:
+                    ready = time.perf_counter() - start
+                    break
+                if response.json()["engine"]["state"] == "failed":
+                    sys.exit(f"engine failed to load: {response.json()['engine']['error']}")
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\nserver live (/health): {live:.1f} s" if live else "\nserver never became live")
+    if ready:
+        engine = response.json()["engine"]
+        print(
+            f"server ready (/ready): {ready:.1f} s"
+            f"  (engine load {engine['load_seconds']:.1f} s, warm-up {engine['warmup_seconds']:.1f} s)"
+        )
+    else:
+        print(f"server not ready after {timeout:.0f} s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--top", type=int, default=15, help="packages to list")
+    ap.add_argument("--max-import-ms", type=float, help="fail if import app.main takes longer")
+    ap.add_argument("--forbid", action="store_true", help="fail if a heavy package is imported eagerly")
+    ap.add_argument("--serve", action="store_true", help="also time a real server start")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--timeout", type=float, default=300.0)
+    args = ap.parse_args()
+
+    total_ms, heavy = report_imports(profile_imports(), args.top)
+    if args.serve:
+        profile_server(args.port, args.timeout)
+
+    failed = False
+    if args.max_import_ms is not None and total_ms > args.max_import_ms:
+        print(f"\nFAIL: import took {total_ms:.0f} ms, budget {args.max_import_ms:.0f} ms")
+        failed = True
+    if args.forbid and heavy:
+        print(f"\nFAIL: imported eagerly: {', '.join(heavy)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Synthetic visa-portal screenshots with ground truth.
+
+Renders, with PIL only (no network, no real portal), the page types the
+parser handles:
+
+  table            Location block + Time | Date | Available table
+  table_date       Location block + Date | Available table (no times)
+  first_available  Location block + "First Available Appointment" panel
+  calendar         Month grid + "First Available Appointment" panel
+  non_visa         receipts / memes / near-blank pages, must be rejected
+
+For each screenshot <name>.png (or .jpg) two sidecars are written:
+  <name>.json      expected form_data fields (format: benchmarks/corpus.py)
+  <name>.ocr.json  every drawn text with its box, in reading order: an
+                   "ideal OCR" result for benchmarking parsing without OCR
+
+Usage (from ocr-service/):
+    python -m benchmarks.synthetic --out /tmp/visa-corpus --count 200
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.utils.helper import normalize_consulate
+
+KINDS = ["table", "table_date", "first_available", "calendar", "non_visa"]
+
+LOCATIONS = ["HYDERABAD IW", "NEW DELHI", "MUMBAI", "CHENNAI", "KOLKATA", "DELHI"]
+TIMES = ["08:00", "08:30", "09:15", "10:30", "11:00", "13:45", "14:30", "16:00"]
+SIZES = [(1280, 900), (1440, 960), (1920, 1080)]
+
+NAV_ITEMS = ["Home", "Appointments", "Payment", "Documents", "Help", "Sign Out"]
+RECEIPT_ITEMS = ["Coffee", "Bagel", "Orange juice", "Muffin", "Sandwich", "Water"]
+MEME_TEXT = ["WHEN THE CODE", "WORKS FIRST TRY", "ONE DOES NOT SIMPLY", "DEPLOY ON FRIDAY"]
+
+
+def _font(size: int) -> ImageFont.ImageFont:
+    for name in ("DejaVuSans.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def portal_date(d: date) -> str:
+    # "Monday September 16, 2019"
+    return f"{d:%A} {d:%B} {d.day}, {d.year}"
+
+
+class Canvas:
+    """
+    Draws text and remembers (box, text) for the ideal OCR sidecar.
+    """
+
+    def __init__(self, size: tuple[int, int], background=(255, 255, 255)):
+        self.image = Image.new("RGB", size, background)
+        self.draw = ImageDraw.Draw(self.image)
+        self.items: list[tuple[list, str]] = []
+        self.scale = size[0] / 1280
+
+    def text(self, x: float, y: float, text: str, size: int = 18, fill=(33, 37, 41)) -> tuple[int, int, int, int]:
+        font = _font(int(size * self.scale))
+        x, y = int(x * self.scale), int(y * self.scale)
+        self.draw.text((x, y), text, font=font, fill=fill)
+        x0, y0, x1, y1 = self.draw.textbbox((x, y), text, font=font)
+        self.items.append(([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text))
+        return x0, y0, x1, y1
+
+    def rect(self, x0, y0, x1, y1, fill=None, outline=None):
+        s = self.scale
+        self.draw.rectangle((x0 * s, y0 * s, x1 * s, y1 * s), fill=fill, outline=outline)
+
+    def ocr_items(self) -> dict:
+        # Reading order: top-to-bottom, then left-to-right within a line
+        items = sorted(self.items, key=lambda it: (round(it[0][0][1] / 12), it[0][0][0]))
+        return {
+            "boxes": [box for box, _ in items],
+            "texts": [text for _, text in items],
+        }
+
+
+def _portal_chrome(c: Canvas, rng: random.Random) -> None:
+    c.rect(0, 0, 1280, 56, fill=(0, 45, 98))
+    c.text(24, 16, "U.S. Visa Information Service", size=20, fill=(255, 255, 255))
+    x = 560
+    for item in NAV_ITEMS:
+        c.text(x, 20, item, size=15, fill=(220, 228, 240))
+        x += 20 + 10 * len(item)
+    c.text(40, 84, "Schedule OFC Appointment", size=28)
+
+
+def _location_block(c: Canvas, rng: random.Random, y: int) -> str:
+    location = rng.choice(LOCATIONS)
+    c.text(40, y, "Location", size=16, fill=(90, 98, 110))
+    c.text(40, y + 28, location, size=20)
+    return location
+
+
+def _random_dates(rng: random.Random, n: int) -> list[date]:
+    start = date(2026, 1, 5) + timedelta(days=rng.randint(0, 300))
+    days = sorted(rng.sample(range(0, 60), n))
+    return [start + timedelta(days=d) for d in days]
+
+
+def render_table(rng: random.Random, with_time: bool) -> tuple[Canvas, dict]:
+    c = Canvas(rng.choice(SIZES))
+    _portal_chrome(c, rng)
+    location = _location_block(c, rng, 140)
+
+    top = 230
+    c.rect(40, top - 10, 900, top + 30, fill=(233, 238, 245))
+    columns = [60, 260, 700] if with_time else [60, 600]
+    headers = ["Time", "Date", "Available"] if with_time else ["Date", "Available"]
+    for x, header in zip(columns, headers):
+        c.text(x, top, header, size=16, fill=(60, 66, 76))
+
+    n = rng.randint(2, 6)
+    dates = _random_dates(rng, n)
+    counts = [rng.randint(20, 400) for _ in range(n)]
+    for row, (d, count) in enumerate(zip(dates, counts)):
+        y = top + 50 + row * 44
+        cells = [rng.choice(TIMES), portal_date(d), str(count)] if with_time else [portal_date(d), str(count)]
+        for x, cell in zip(columns, cells):
+            c.text(x, y, cell, size=17)
+
+    truth = {
+        "consulate": normalize_consulate(location),
+        "earliest_available_date": min(dates).isoformat(),
+        "total_slots": sum(counts),
+    }
+    return c, truth
+
+
+def render_first_available(rng: random.Random) -> tuple[Canvas, dict]:
+    c = Canvas(rng.choice(SIZES))
+    _portal_chrome(c, rng)
+    location = _location_block(c, rng, 140)
+
+    d = _random_dates(rng, 1)[0]
+    c.rect(40, 230, 700, 340, outline=(180, 190, 205))
+    c.text(60, 246, "First Available Appointment", size=20)
+    c.text(60, 284, portal_date(d) + rng.choice(["", "."]), size=18)
+
+    truth = {
+        "consulate": normalize_consulate(location),
+        "earliest_available_date": d.isoformat(),
+        "total_slots": None,
+    }
+    return c, truth
+
+
+def render_calendar(rng: random.Random) -> tuple[Canvas, dict]:
+    c = Canvas(rng.choice(SIZES))
+    _portal_chrome(c, rng)
+
+    d = _random_dates(rng, 1)[0]
+    c.text(40, 140, "First Available Appointment", size=20)
+    c.text(40, 176, portal_date(d), size=18)
+    c.text(40, 212, "Times shown are local to the consulate", size=14, fill=(110, 116, 126))
+
+    month_start = d.replace(day=1)
+    c.text(40, 260, f"{month_start:%B} {month_start.year}", size=20)
+    for i, wd in enumerate(["Su", "Mo", "Tu", "We", "Th", "Fr", "Sa"]):
+        c.text(40 + i * 70, 300, wd, size=15, fill=(90, 98, 110))
+
+    offset = (month_start.weekday() + 1) % 7
+    day = month_start
+    while day.month == month_start.month:
+        slot = offset + day.day - 1
+        x, y = 40 + (slot % 7) * 70, 336 + (slot // 7) * 44
+        colour = (0, 110, 60) if day >= d else (160, 160, 160)
+        c.text(x, y, str(day.day), size=16, fill=colour)
+        day += timedelta(days=1)
+
+    truth = {
+        "consulate": None,
+        "earliest_available_date": d.isoformat(),
+        "total_slots": None,
+    }
+    return c, truth
+
+
+def render_non_visa(rng: random.Random) -> tuple[Canvas, dict]:
+    style = rng.choice(["receipt", "meme", "blank"])
+    if style == "receipt":
+        c = Canvas((720, 1100))
+        c.text(200, 40, "CORNER CAFE", size=30)
+        total = 0.0
+        for i, item in enumerate(rng.sample(RECEIPT_ITEMS, 4)):
+            price = rng.randint(150, 900) / 100
+            total += price
+            c.text(80, 140 + i * 40, item, size=20)
+            c.text(520, 140 + i * 40, f"{price:.2f}", size=20)
+        c.text(80, 340, "Total", size=22)
+        c.text(520, 340, f"{total:.2f}", size=22)
+    elif style == "meme":
+        c = Canvas((1000, 1000), background=tuple(rng.randint(40, 200) for _ in range(3)))
+        top, bottom = rng.sample(MEME_TEXT, 2)
+        c.text(120, 60, top, size=56, fill=(255, 255, 255))
+        c.text(120, 860, bottom, size=56, fill=(255, 255, 255))
+    else:
+        c = Canvas(rng.choice(SIZES), background=(250, 250, 250))
+    return c, {"valid": False}
+
+
+def generate(out: str | Path, count: int, seed: int = 0, jpeg_ratio: float = 0.3) -> list[Path]:
+    """
+    Write `count` screenshots and their sidecars into `out`.
+    Same seed, same corpus.
+    """
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    paths = []
+    for i in range(count):
+        kind = KINDS[i % len(KINDS)]
+        if kind == "table":
+            canvas, truth = render_table(rng, with_time=True)
+        elif kind == "table_date":
+            canvas, truth = render_table(rng, with_time=False)
+        elif kind == "first_available":
+            canvas, truth = render_first_available(rng)
+        elif kind == "calendar":
+            canvas, truth = render_calendar(rng)
+        else:
+            canvas, truth = render_non_visa(rng)
+
+        stem = f"{i:04d}_{kind}"
+        if rng.random() < jpeg_ratio:
+            path = out / f"{stem}.jpg"
+            canvas.image.save(path, quality=85)
+        else:
+            path = out / f"{stem}.png"
+            canvas.image.save(path)
+
+        (out / f"{stem}.json").write_text(json.dumps(truth))
+        (out / f"{stem}.ocr.json").write_text(json.dumps(canvas.ocr_items()))
+        paths.append(path)
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--count", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    paths = generate(args.out, args.count, args.seed)
+    print(f"wrote {len(paths)} screenshots to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from app.services.cache_backends import MemoryCache, RedisCache, SQLiteCache, TieredCache
+
+RESPONSE = {"success": True, "form_data": {"meta": {"confidence": 0.97}}}
+
+
+class StubRedis:
+    """
+    The slice of redis.Redis that RedisCache uses.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.closed = False
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+        self.expiry[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def close(self):
+        self.closed = True
+
+
+class BrokenCache(MemoryCache):
+    def get(self, key, default=None):
+        raise ConnectionError("L2 down")
+
+    def set(self, key, value):
+        raise ConnectionError("L2 down")
+
+
+# -------------------
+# SQLite
+# -------------------
+
+def test_sqlite_round_trip_and_delete(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set("px:a", RESPONSE)
+    assert cache.get("px:a") == RESPONSE
+    assert cache.get("px:b", "miss") == "miss"
+
+    del cache["px:a"]
+    assert "px:a" not in cache
+    cache.close()
+
+
+def test_sqlite_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer, reader = SQLiteCache(path), SQLiteCache(path)
+    writer.set("px:a", RESPONSE)
+    assert reader.get("px:a") == RESPONSE
+    writer.close()
+    reader.close()
+
+
+def test_sqlite_expired_entries_miss(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=-1)
+    cache.set("px:a", RESPONSE)
+    assert cache.get("px:a") is None
+    cache.close()
+
+
+def test_sqlite_purge_keeps_maxsize_under_concurrent_writes(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), maxsize=10)
+    cache.PURGE_EVERY = 20
+
+    def write(worker):
+        for i in range(50):
+            cache.set(f"px:{worker}:{i}", RESPONSE)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 200 writes: the 200th ran the last sweep
+    count = cache._conn().execute("SELECT count(*) FROM ocr_cache").fetchone()[0]
+    assert count == 10
+    cache.close()
+
+
+def test_sqlite_close_closes_worker_thread_connections(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+
+    async def use_from_threads():
+        await asyncio.gather(*(cache.aset(f"px:{i}", RESPONSE) for i in range(8)))
+        return await cache.aget("px:0")
+
+    assert asyncio.run(use_from_threads()) == RESPONSE
+    conns = list(cache._conns)
+    assert len(conns) > 1
+
+    cache.close()
+    for conn in conns:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    # Usable again afterwards, on fresh connections
+    assert cache.get("px:0") == RESPONSE
+    cache.close()
+
+
+# -------------------
+# Redis
+# -------------------
+
+def test_redis_round_trip_with_prefix_and_ttl():
+    client = StubRedis()
+    cache = RedisCache(ttl=90.5, prefix="t:", client=client)
+    cache.set("px:a", RESPONSE)
+
+    assert client.expiry == {"t:px:a": 90}
+    assert cache.get("px:a") == RESPONSE
+    assert cache.get("px:b", "miss") == "miss"
+
+    cache.delete("px:a")
+    assert cache.get("px:a") is None
+    cache.close()
+    assert client.closed
+
+
+def test_redis_async_access():
+    cache = RedisCache(client=StubRedis())
+
+    async def round_trip():
+        await cache.aset("px:a", RESPONSE)
+        return await cache.aget("px:a")
+
+    assert asyncio.run(round_trip()) == RESPONSE
+
+
+# -------------------
+# Tiered
+# -------------------
+
+def test_tiered_l2_hit_fills_l1():
+    l1, l2 = MemoryCache(), RedisCache(client=StubRedis())
+    l2.set("px:a", RESPONSE)
+    cache = TieredCache(l1, l2)
+
+    assert asyncio.run(cache.aget("px:a")) == RESPONSE
+    assert l1.get("px:a") == RESPONSE
+
+
+def test_tiered_writes_both_tiers():
+    l1, l2 = MemoryCache(), RedisCache(client=StubRedis())
+    cache = TieredCache(l1, l2)
+    asyncio.run(cache.aset("px:a", RESPONSE))
+    assert l1.get("px:a") == RESPONSE
+    assert l2.get("px:a") == RESPONSE
+
+
+def test_tiered_degrades_to_l1_when_l2_fails():
+    cache = TieredCache(MemoryCache(), BrokenCache())
+    cache.set("px:a", RESPONSE)
+    assert cache.get("px:a") == RESPONSE
+    assert cache.get("px:b", "miss") == "miss"
+    assert asyncio.run(cache.aget("px:b", "miss")) == "miss"
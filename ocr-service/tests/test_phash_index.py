@@ -0,0 +1,106 @@
+import io
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.services.phash_index import NearDuplicateIndex, fingerprint
+from app.utils.image import resize_image
+
+
+def _font(size: int = 25) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _page(
+    count: str = "33",
+    date: str = "Monday September 16, 2026",
+    clock: str = "10:41",
+    scroll: int = 0,
+    cursor: tuple[int, int] | None = None,
+) -> Image.Image:
+    image = Image.new("RGB", (1920, 1080), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    font = _font()
+
+    # Page content, `scroll` pixels further down the page
+    y = 130 - scroll
+    draw.rectangle((0, y, 1920, y + 84), fill=(0, 45, 98))
+    draw.text((36, y + 24), "U.S. Visa Information Service", font=font, fill=(255, 255, 255))
+    draw.text((90, y + 340), "08:30", font=font, fill=(33, 37, 41))
+    draw.text((390, y + 340), date, font=font, fill=(33, 37, 41))
+    draw.text((1050, y + 340), count, font=font, fill=(33, 37, 41))
+    draw.text((90, y + 400), "09:15", font=font, fill=(33, 37, 41))
+    draw.text((390, y + 400), "Tuesday September 17, 2026", font=font, fill=(33, 37, 41))
+    draw.text((1050, y + 400), "120", font=font, fill=(33, 37, 41))
+
+    # Browser / OS chrome that does not scroll, with a clock
+    draw.rectangle((0, 0, 1920, 44), fill=(222, 226, 230))
+    draw.text((1800, 10), clock, font=_font(20), fill=(33, 37, 41))
+
+    if cursor is not None:
+        x, y = cursor
+        draw.polygon(
+            [(x, y), (x, y + 30), (x + 8, y + 23), (x + 14, y + 36), (x + 19, y + 34), (x + 13, y + 21), (x + 23, y + 21)],
+            fill=(255, 255, 255), outline=(0, 0, 0),
+        )
+    return image
+
+
+def _upload(image: Image.Image, **save) -> Image.Image:
+    # What prepare_image() fingerprints: the decoded, resized upload
+    buf = io.BytesIO()
+    image.save(buf, **save)
+    return resize_image(Image.open(io.BytesIO(buf.getvalue())).convert("RGB"))
+
+
+def _index() -> NearDuplicateIndex:
+    index = NearDuplicateIndex()
+    index.add(fingerprint(_upload(_page(), format="PNG")), "px:original")
+    return index
+
+
+def test_recompressed_copy_hits():
+    index = _index()
+    for quality in (90, 75, 60):
+        match = index.lookup(fingerprint(_upload(_page(), format="JPEG", quality=quality)))
+        assert match is not None and match.key == "px:original"
+        assert match.regions == []
+
+
+def test_recapture_with_other_clock_or_scroll_hits():
+    index = _index()
+    # The 1920 px page is resized to 1024 px: 15 and 30 page pixels are
+    # whole frame rows (8 and 16)
+    for page in (_page(clock="10:42"), _page(scroll=15), _page(scroll=-30, clock="11:07")):
+        match = index.lookup(fingerprint(_upload(page, format="PNG")))
+        assert match is not None and match.key == "px:original"
+        assert match.regions == []
+
+
+def test_recapture_with_cursor_needs_only_its_region_confirmed():
+    index = _index()
+    match = index.lookup(fingerprint(_upload(_page(cursor=(1500, 700)), format="PNG")))
+    assert match is not None and match.key == "px:original"
+    assert len(match.regions) == 1
+    x0, y0, x1, y1 = match.regions[0]
+    # 1500, 700 on the 1920-wide page is 800, 373 on the 1024-wide frame
+    assert x0 <= 800 < x1 and y0 <= 373 < y1
+    assert (x1 - x0) * (y1 - y0) < 64 * 64
+
+
+def test_one_digit_change_is_never_served_unconfirmed():
+    index = _index()
+    changed = [
+        _page(count="38"),
+        _page(count="88"),
+        _page(count="333"),
+        _page(date="Monday September 18, 2026"),
+        _page(date="Monday September 16, 2027"),
+    ]
+    for page in changed:
+        for save in ({"format": "PNG"}, {"format": "JPEG", "quality": 75}):
+            match = index.lookup(fingerprint(_upload(page, **save)))
+            # Either no match, or one whose changed region OCR must read
+            assert match is None or match.regions